@@ -3,6 +3,7 @@ Application configuration management.
 """
 
 from pathlib import Path
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -22,6 +23,84 @@ class Settings(BaseSettings):
     # Path Settings
     content_root: Path = Path("/app/content")
     static_root: Path = Path("/app/static")
+    data_root: Path = Path("/app/data")  # 服務內部資料 (索引等)
+    
+    # Markdown Settings
+    post_url_template: str = "/blog/{category}/{post_id}/"  # 站內文章連結格式
+    
+    # Search Settings
+    search_journal_compact_threshold: int = 500
+    search_max_page_size: int = 100
+    
+    # Export Settings
+    export_chunk_size: int = 1024 * 1024
+    export_snapshot_max_age: int = 6 * 60 * 60  # 秒, 超過視為中斷的匯出並清除
+    
+    # Change Feed Settings
+    changes_compact_threshold: int = 5000  # 上次壓縮後新增的紀錄數達此值 (且不少於壓縮後大小) 時壓縮
+    changes_tombstone_retention: int = 30 * 24 * 60 * 60  # 秒, 刪除紀錄保留時間
+    changes_max_page_size: int = 1000
+    
+    # Upload Settings
+    upload_max_size: int = 4 * 1024 * 1024 * 1024
+    upload_session_ttl: int = 24 * 60 * 60  # 秒, 閒置超過即過期
+    upload_cleanup_interval: int = 10 * 60  # 秒
+    
+    # Attachment Settings
+    attachment_write_workers: int = 8  # 同時解碼/寫入附件的執行緒數 (所有請求共用)
+    
+    # Write Journal Settings
+    journal_durability: str = "batched"  # none | batched | full
+    journal_group_commit_window: float = 0.002  # 秒, 等待同批次寫入的時間
+    journal_checkpoint_bytes: int = 4 * 1024 * 1024
+    
+    # Bulk Category Settings
+    category_rewrite_workers: int = 16
+    category_batch_size: int = 256  # 每個日誌交易處理的文章數
+    category_job_retention: int = 60 * 60  # 秒, 完成後保留進度資訊的時間
+    
+    # Media Storage Settings
+    media_storage_backend: str = "local"  # local | memory | s3
+    s3_endpoint_url: Optional[str] = None  # 例如 MinIO: http://minio:9000
+    s3_bucket: str = "obsidian-sync"
+    s3_prefix: str = ""
+    s3_region: Optional[str] = None
+    s3_access_key: Optional[str] = None
+    s3_secret_key: Optional[str] = None
+    s3_max_pool_connections: int = 32
+    
+    # Admission Control Settings
+    max_body_size: int = 256 * 1024 * 1024  # 單一請求本文上限
+    inflight_body_budget: int = 1024 * 1024 * 1024  # 同時處理中的請求本文總量上限
+    body_memory_factor: float = 3.0  # 本文在記憶體中的放大倍數 (JSON、模型、解碼後附件)
+    admission_wait_timeout: float = 5.0  # 秒, 超過預算時的排隊等待時間
+    admission_exempt_paths: List[str] = ["/api/uploads"]  # 串流寫入磁碟, 不佔用記憶體
+    
+    # Rate Limit Settings
+    rate_limit_enabled: bool = True
+    rate_limit_client_header: str = "X-API-Key"  # 未提供時以來源位址識別
+    rate_limit_requests_per_second: float = 20.0
+    rate_limit_request_burst: int = 100
+    rate_limit_bytes_per_second: float = 32 * 1024 * 1024
+    rate_limit_byte_burst: int = 512 * 1024 * 1024
+    rate_limit_max_concurrency: int = 32  # 同時執行的請求數, 超過時依客戶端輪流排程
+    rate_limit_max_queued_per_client: int = 64
+    rate_limit_exempt_paths: List[str] = ["/health"]
+    
+    # Vault Watcher Settings
+    watcher_enabled: bool = True
+    watcher_backend: str = "auto"  # auto | inotify | polling
+    watcher_debounce: float = 0.5  # 秒, 事件靜止多久後處理一批
+    watcher_max_delay: float = 5.0  # 秒, 持續有事件時的最長等待
+    watcher_poll_interval: float = 5.0  # 秒, polling 模式的掃描間隔
+    
+    # Profiling Settings
+    profiling_enabled: bool = False
+    profiling_header: str = "X-Profile"  # 帶此標頭的請求一律分析
+    profiling_sample_rate: float = 0.0  # 0~1, 隨機抽樣分析的比例
+    profiling_mode: str = "sampling"  # sampling | deterministic
+    profiling_sample_interval: float = 0.001  # 秒
+    profiling_max_profiles: int = 50  # 保留的分析檔數量, 超過時刪除最舊的
     
     # Logging
     log_level: str = "DEBUG"
@@ -5,6 +5,21 @@ Global dependencies for the FastAPI application.
 import sys
 from loguru import logger
 from .config import settings
+from .services.post_catalog import PostCatalog
+from .services.search_service import SearchIndex
+from .services.post_service import PostService
+from .services.export_service import ExportService
+from .services.change_log import ChangeLog
+from .services.upload_service import UploadService
+from .services.write_journal import WriteJournal
+from .services.category_service import CategoryService
+from .services.link_rewriter import LinkRewriter
+from .services.profiling_service import ProfilingService
+from .services.vault_watcher import VaultWatcher
+from .storage.factory import create_storage
+from .utils.concurrency import ReadWriteLock
+from .middleware.admission import MemoryBudget
+from .middleware.rate_limit import RateLimiter
 
 
 def setup_logging() -> None:
@@ -14,4 +29,57 @@ def setup_logging() -> None:
 
 
 # Initialize logging when module is imported
-setup_logging() 
\ No newline at end of file
+setup_logging()
+
+
+# Shared service instances
+memory_budget = MemoryBudget(settings.inflight_body_budget)
+rate_limiter = RateLimiter(
+    requests_per_second=settings.rate_limit_requests_per_second,
+    request_burst=settings.rate_limit_request_burst,
+    bytes_per_second=settings.rate_limit_bytes_per_second,
+    byte_burst=settings.rate_limit_byte_burst,
+    max_concurrency=settings.rate_limit_max_concurrency,
+    max_queued_per_client=settings.rate_limit_max_queued_per_client
+)
+vault_lock = ReadWriteLock()
+post_catalog = PostCatalog()
+search_index = SearchIndex()
+change_log = ChangeLog()
+upload_service = UploadService()
+media_storage = create_storage(settings.media_storage_backend, settings.static_root)
+write_journal = WriteJournal()
+link_rewriter = LinkRewriter(
+    vault_lock=vault_lock,
+    catalog=post_catalog,
+    change_log=change_log,
+    journal=write_journal
+)
+post_service = PostService(
+    catalog=post_catalog,
+    search_index=search_index,
+    vault_lock=vault_lock,
+    change_log=change_log,
+    upload_service=upload_service,
+    journal=write_journal,
+    media_storage=media_storage,
+    link_rewriter=link_rewriter
+)
+vault_watcher = VaultWatcher(
+    vault_lock=vault_lock,
+    catalog=post_catalog,
+    search_index=search_index,
+    change_log=change_log,
+    watch_media=media_storage.is_local,
+    journal=write_journal
+)
+profiling_service = ProfilingService()
+export_service = ExportService(vault_lock=vault_lock)
+category_service = CategoryService(
+    vault_lock=vault_lock,
+    catalog=post_catalog,
+    search_index=search_index,
+    change_log=change_log,
+    journal=write_journal,
+    link_rewriter=link_rewriter
+)
@@ -20,6 +20,11 @@ class InvalidAttachmentPathError(ObsidianSyncException):
     pass
 
 
+class AttachmentNotFoundError(ObsidianSyncException):
+    """Raised when an attachment is not found."""
+    pass
+
+
 class MissingRequiredFieldError(ObsidianSyncException):
     """Raised when required frontmatter field is missing."""
     pass
@@ -30,6 +35,69 @@ class FileOperationError(ObsidianSyncException):
     pass
 
 
+class CategoryNotFoundError(ObsidianSyncException):
+    """Raised when a category directory does not exist."""
+    pass
+
+
+class InvalidCategoryNameError(ObsidianSyncException):
+    """Raised when a category name does not map to a directory inside content_root."""
+    pass
+
+
+class CategoryJobNotFoundError(ObsidianSyncException):
+    """Raised when a bulk category job is not found."""
+    pass
+
+
+class UploadNotFoundError(ObsidianSyncException):
+    """Raised when an upload session does not exist or has expired."""
+    pass
+
+
+class UploadConflictError(ObsidianSyncException):
+    """Raised when an upload operation conflicts with the session state."""
+    pass
+
+
+class UploadChecksumError(ObsidianSyncException):
+    """Raised when an upload's checksum does not match."""
+    pass
+
+
+class CursorExpiredError(ObsidianSyncException):
+    """Raised when a change feed cursor predates the compacted change log."""
+    pass
+
+
+class UnsupportedCompressionError(ObsidianSyncException):
+    """Raised when a requested compression format is not available."""
+    pass
+
+
+class ProfileNotFoundError(ObsidianSyncException):
+    """Raised when a stored profile does not exist."""
+    pass
+
+
+class PatchConflictError(ObsidianSyncException):
+    """Raised when a content patch cannot be applied to the stored post."""
+    pass
+
+
+class ContentHashMismatchError(ObsidianSyncException):
+    """Raised when a patch was made against a different version of the content."""
+    pass
+
+
+class AttachmentWriteError(ObsidianSyncException):
+    """Raised when one or more attachments of a post could not be saved."""
+
+    def __init__(self, message: str, results: list):
+        super().__init__(message)
+        self.results = results
+
+
 # HTTP Exception factories
 def post_not_found_http_exception(post_id: str) -> HTTPException:
     """Create HTTP exception for post not found."""
@@ -47,6 +115,14 @@ def invalid_attachment_path_http_exception(path: str) -> HTTPException:
     )
 
 
+def attachment_not_found_http_exception(path: str) -> HTTPException:
+    """Create HTTP exception for attachment not found."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No attachment found at: {path}"
+    )
+
+
 def missing_required_field_http_exception(field: str) -> HTTPException:
     """Create HTTP exception for missing required field."""
     return HTTPException(
@@ -2,17 +2,47 @@
 Obsidian Sync API - FastAPI Application Entry Point
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from loguru import logger
 import uvicorn
 
 from .config import settings
-from .dependencies import setup_logging
-from .routers import posts, health
+from .dependencies import (
+    setup_logging,
+    upload_service,
+    search_index,
+    write_journal,
+    vault_watcher,
+    media_storage,
+    memory_budget,
+    rate_limiter
+)
+from .middleware.admission import AdmissionControlMiddleware
+from .middleware.rate_limit import RateLimitMiddleware
+from .routers import posts, health, search, export, attachments, changes, uploads, categories, profiles
 from .schemas.responses import ErrorResponse
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Recover interrupted writes, then start and stop background maintenance tasks."""
+    await asyncio.to_thread(write_journal.recover)
+    upload_cleanup = asyncio.create_task(upload_service.run_cleanup_loop())
+    if settings.watcher_enabled:
+        await asyncio.to_thread(vault_watcher.start)
+    try:
+        yield
+    finally:
+        upload_cleanup.cancel()
+        if settings.watcher_enabled:
+            await asyncio.to_thread(vault_watcher.stop)
+        await asyncio.to_thread(search_index.shutdown)
+        await asyncio.to_thread(media_storage.shutdown)
+
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application."""
     
@@ -21,12 +51,40 @@ def create_app() -> FastAPI:
         version=settings.version,
         description=settings.description,
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan
+    )
+    
+    # Reject or queue request bodies before they are read into memory
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        budget=memory_budget,
+        max_body_size=settings.max_body_size,
+        memory_factor=settings.body_memory_factor,
+        wait_timeout=settings.admission_wait_timeout,
+        exempt_paths=settings.admission_exempt_paths
     )
     
+    # Added last so it runs first: throttle and schedule per client before admission
+    if settings.rate_limit_enabled:
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=rate_limiter,
+            client_header=settings.rate_limit_client_header,
+            exempt_paths=settings.rate_limit_exempt_paths
+        )
+    
     # Include routers
     app.include_router(health.router)
     app.include_router(posts.router)
+    app.include_router(search.router)
+    app.include_router(export.router)
+    app.include_router(attachments.router)
+    app.include_router(changes.router)
+    app.include_router(uploads.router)
+    app.include_router(categories.router)
+    if settings.profiling_enabled:
+        app.include_router(profiles.router)
     
     # Global exception handler
     @app.exception_handler(Exception)
@@ -0,0 +1,3 @@
+"""
+ASGI middleware package.
+"""
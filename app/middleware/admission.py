@@ -0,0 +1,255 @@
+"""
+Request body admission control.
+
+Large post upserts are held in memory several times over (the raw JSON, the
+parsed model, its dict copy and the decoded attachments). Before a body is
+read, its declared size is checked against a maximum and reserved from a
+process-wide budget of in-flight bytes; requests that do not fit wait
+briefly for capacity and are otherwise rejected, instead of letting
+concurrent uploads push the process into an OOM kill.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Sequence, Tuple
+from fastapi import status
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+
+class BodyTooLargeError(Exception):
+    """Raised when a streamed body exceeds the maximum body size."""
+    pass
+
+
+class BudgetExhaustedError(Exception):
+    """Raised when a streamed body cannot be admitted into the memory budget."""
+    pass
+
+
+@dataclass
+class BudgetStats:
+    """Snapshot of memory budget usage."""
+    limit: int
+    in_use: int
+    peak: int
+    waiting: int
+    admitted: int
+    rejected_too_large: int
+    rejected_busy: int
+
+
+class MemoryBudget:
+    """
+    Process-wide budget of bytes held by in-flight request bodies.
+
+    Waiters are served in arrival order: once any are queued, new requests
+    queue behind them instead of taking freed capacity first, so a large
+    upload cannot be starved by a stream of small ones. Not thread-safe;
+    used from the event loop only.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self.admitted = 0
+        self.rejected_too_large = 0
+        self.rejected_busy = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _take(self, amount: int) -> None:
+        self.in_use += amount
+        self.peak = max(self.peak, self.in_use)
+
+    def try_acquire(self, amount: int) -> bool:
+        """Reserve without waiting (never ahead of queued waiters)."""
+        if self._waiters or self.in_use + amount > self.limit:
+            return False
+        self._take(amount)
+        return True
+
+    async def acquire(self, amount: int, timeout: float) -> bool:
+        """
+        Reserve bytes, waiting up to timeout seconds for capacity.
+
+        Callers should cap ``amount`` at ``limit``; larger requests can never
+        be admitted.
+        """
+        if amount > self.limit:
+            return False
+        if self.try_acquire(amount):
+            return True
+        waiter = (amount, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter[1],), timeout=timeout)
+        except asyncio.CancelledError:
+            self._withdraw(waiter)
+            raise
+        if waiter[1].done():
+            return True
+        self._withdraw(waiter)
+        return False
+
+    def _withdraw(self, waiter: Tuple[int, asyncio.Future]) -> None:
+        amount, future = waiter
+        if future.done():
+            # Capacity was handed over just as we gave up: pass it on
+            self.in_use -= amount
+        else:
+            self._waiters.remove(waiter)
+            future.cancel()
+        # Whoever queued behind this waiter may fit now
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use + self._waiters[0][0] <= self.limit:
+            amount, future = self._waiters.popleft()
+            self._take(amount)
+            future.set_result(None)
+
+    async def release(self, amount: int) -> None:
+        """Return reserved bytes and hand them to waiters in arrival order."""
+        if amount <= 0:
+            return
+        self.in_use = max(0, self.in_use - amount)
+        self._wake()
+
+    def stats(self) -> BudgetStats:
+        return BudgetStats(
+            limit=self.limit,
+            in_use=self.in_use,
+            peak=self.peak,
+            waiting=self.waiting,
+            admitted=self.admitted,
+            rejected_too_large=self.rejected_too_large,
+            rejected_busy=self.rejected_busy,
+        )
+
+
+class AdmissionControlMiddleware:
+    """Reject or queue request bodies that do not fit the memory budget."""
+
+    BODY_METHODS = ("POST", "PUT", "PATCH")
+
+    def __init__(
+        self,
+        app,
+        budget: MemoryBudget,
+        max_body_size: int,
+        memory_factor: float = 1.0,
+        wait_timeout: float = 5.0,
+        exempt_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.budget = budget
+        self.max_body_size = max_body_size
+        self.memory_factor = memory_factor
+        self.wait_timeout = wait_timeout
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.BODY_METHODS
+            or scope["path"].startswith(self.exempt_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    pass
+                break
+
+        if content_length is not None:
+            await self._admit_sized(scope, receive, send, content_length)
+        else:
+            await self._admit_streamed(scope, receive, send)
+
+    async def _reject(self, scope, receive, send, status_code: int, detail: str, retry_after: bool = False):
+        headers = {"Retry-After": str(max(1, int(self.wait_timeout)))} if retry_after else None
+        response = JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+        await response(scope, receive, send)
+
+    async def _admit_sized(self, scope, receive, send, content_length: int):
+        if content_length > self.max_body_size:
+            self.budget.rejected_too_large += 1
+            await self._reject(
+                scope, receive, send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"Request body of {content_length} bytes exceeds the limit of {self.max_body_size} bytes"
+            )
+            return
+
+        # A body that alone exceeds the budget is admitted only when nothing else is in flight
+        reservation = min(int(content_length * self.memory_factor), self.budget.limit)
+        if not await self.budget.acquire(reservation, self.wait_timeout):
+            self.budget.rejected_busy += 1
+            logger.warning(f"[admission] Rejected {scope['path']} ({content_length} bytes): memory budget exhausted")
+            await self._reject(
+                scope, receive, send, status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Server is busy processing other uploads, retry later", retry_after=True
+            )
+            return
+
+        self.budget.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await self.budget.release(reservation)
+
+    async def _admit_streamed(self, scope, receive, send):
+        """Chunked bodies: account for bytes as they arrive."""
+        reserved = 0
+        received = 0
+        response_started = False
+
+        async def counting_receive():
+            nonlocal reserved, received
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk_size = len(message.get("body", b""))
+                received += chunk_size
+                if received > self.max_body_size:
+                    raise BodyTooLargeError()
+                amount = int(chunk_size * self.memory_factor)
+                if not self.budget.try_acquire(amount):
+                    raise BudgetExhaustedError()
+                reserved += amount
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        self.budget.admitted += 1
+        try:
+            await self.app(scope, counting_receive, tracking_send)
+        except BodyTooLargeError:
+            self.budget.rejected_too_large += 1
+            if not response_started:
+                await self._reject(
+                    scope, receive, send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    f"Request body exceeds the limit of {self.max_body_size} bytes"
+                )
+        except BudgetExhaustedError:
+            self.budget.rejected_busy += 1
+            if not response_started:
+                await self._reject(
+                    scope, receive, send, status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Server is busy processing other uploads, retry later", retry_after=True
+                )
+        finally:
+            await self.budget.release(reserved)
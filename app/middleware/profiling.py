@@ -0,0 +1,47 @@
+"""
+Route class that profiles selected requests.
+"""
+
+from typing import Callable, Type
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from ..services.profiling_service import ProfilingService
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute that runs selected requests under the profiler.
+
+    Wraps the whole route handler, so request parsing, validation and
+    response serialization are included. The profiler observes the event
+    loop thread, so coroutines of other requests that interleave at an
+    ``await`` show up as well; post handlers run the service in the
+    threadpool through ProfilingService.follow(), which moves sampling to
+    the worker thread for the duration of the call.
+    """
+
+    profiling_service: ProfilingService
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        service = self.profiling_service
+        endpoint = self.name
+
+        async def profiled_handler(request: Request) -> Response:
+            if not service.should_profile(request.headers.get(service.header)):
+                return await handler(request)
+            with service.capture(endpoint) as profile_id:
+                response = await handler(request)
+            if profile_id:
+                response.headers["X-Profile-Id"] = profile_id
+            return response
+
+        return profiled_handler
+
+
+def profiled_route_class(service: ProfilingService) -> Type[APIRoute]:
+    """Route class for a router; the plain APIRoute when profiling is disabled."""
+    if not service.enabled:
+        return APIRoute
+    return type("ProfiledRoute", (ProfiledRoute,), {"profiling_service": service})
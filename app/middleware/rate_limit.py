@@ -0,0 +1,303 @@
+"""
+Per-client rate limiting and fair scheduling.
+
+Each client (identified by its API key header, or its remote address) has
+two token buckets: one for requests and one for uploaded body bytes. A
+request that finds either bucket empty is rejected with 429 and a
+Retry-After hint. Admitted requests then compete for a bounded number of
+execution slots; waiting requests are queued per client and slots are
+handed out round-robin across clients, so a device stuck in a sync loop
+only ever delays its own queue.
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Sequence, Tuple
+from fastapi import status
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def level(self, now: float) -> float:
+        """Current balance, without updating the bucket."""
+        return min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+
+    def _refill(self, now: float) -> None:
+        self.tokens = self.level(now)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def consume(self, amount: float, now: float) -> None:
+        """Take tokens; the balance may go negative (debt is repaid by refill)."""
+        self._refill(now)
+        self.tokens -= amount
+
+    def retry_after(self) -> float:
+        """Seconds until at least one token is available again."""
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        return self.level(now) >= self.capacity
+
+
+@dataclass
+class ClientState:
+    """Rate limiting state and counters of one client."""
+    requests: TokenBucket
+    body_bytes: TokenBucket
+    queue: Deque[asyncio.Future] = field(default_factory=deque)
+    running: int = 0
+    admitted: int = 0
+    limited: int = 0
+    queued: int = 0
+    last_seen: float = 0.0
+
+
+class FairScheduler:
+    """
+    Bounded pool of execution slots shared round-robin between clients.
+
+    Not thread-safe; used from the event loop only.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.in_use = 0
+        # Clients with waiting requests, in service order
+        self._ring: "OrderedDict[str, ClientState]" = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(state.queue) for state in self._ring.values())
+
+    async def acquire(self, client_id: str, state: ClientState) -> None:
+        if self.in_use < self.slots and not self._ring:
+            self.in_use += 1
+            state.running += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        state.queue.append(future)
+        state.queued += 1
+        if client_id not in self._ring:
+            self._ring[client_id] = state
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled: pass it on
+                state.running += 1
+                self.release(state)
+            else:
+                self._remove_waiter(client_id, state, future)
+            raise
+        state.running += 1
+
+    def _remove_waiter(self, client_id: str, state: ClientState, future: asyncio.Future) -> None:
+        try:
+            state.queue.remove(future)
+        except ValueError:
+            pass
+        if not state.queue:
+            self._ring.pop(client_id, None)
+
+    def release(self, state: ClientState) -> None:
+        state.running -= 1
+        while self._ring:
+            client_id, next_state = self._ring.popitem(last=False)
+            future = next_state.queue.popleft()
+            if next_state.queue:
+                # Back of the line: other clients get the next slots first
+                self._ring[client_id] = next_state
+            if not future.done():
+                # The slot moves directly to the waiter; in_use is unchanged
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class RateLimiter:
+    """Per-client token buckets plus the fair scheduler."""
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        request_burst: int,
+        bytes_per_second: float,
+        byte_burst: int,
+        max_concurrency: int,
+        max_queued_per_client: int,
+        max_clients: int = 10000
+    ):
+        self.requests_per_second = requests_per_second
+        self.request_burst = request_burst
+        self.bytes_per_second = bytes_per_second
+        self.byte_burst = byte_burst
+        self.max_queued_per_client = max_queued_per_client
+        self.max_clients = max_clients
+        self.scheduler = FairScheduler(max_concurrency)
+        self.clients: Dict[str, ClientState] = {}
+        self.admitted = 0
+        self.limited = 0
+
+    def client(self, client_id: str, now: float) -> ClientState:
+        state = self.clients.get(client_id)
+        if state is None:
+            if len(self.clients) >= self.max_clients:
+                self._evict_idle(now)
+            state = ClientState(
+                requests=TokenBucket(self.requests_per_second, self.request_burst),
+                body_bytes=TokenBucket(self.bytes_per_second, self.byte_burst),
+            )
+            self.clients[client_id] = state
+        state.last_seen = now
+        return state
+
+    def _evict_idle(self, now: float) -> None:
+        """Forget clients with nothing in flight and full buckets (their state is the default)."""
+        for client_id, state in list(self.clients.items()):
+            if (
+                not state.running
+                and not state.queue
+                and state.requests.is_full(now)
+                and state.body_bytes.is_full(now)
+            ):
+                del self.clients[client_id]
+
+    def check(self, state: ClientState, body_size: int, now: float) -> Optional[float]:
+        """
+        Charge a request against the client's buckets.
+
+        Returns None if admitted, otherwise the number of seconds to wait.
+        """
+        if len(state.queue) >= self.max_queued_per_client:
+            return 1.0
+        if not state.requests.available(now):
+            return state.requests.retry_after()
+        if body_size and not state.body_bytes.available(now):
+            return state.body_bytes.retry_after()
+        state.requests.consume(1, now)
+        if body_size:
+            state.body_bytes.consume(body_size, now)
+        return None
+
+    def stats(self) -> Tuple[dict, list]:
+        totals = {
+            "clients": len(self.clients),
+            "admitted": self.admitted,
+            "limited": self.limited,
+            "running": self.scheduler.in_use,
+            "waiting": self.scheduler.waiting,
+            "maxConcurrency": self.scheduler.slots,
+        }
+        now = time.monotonic()
+        clients = [
+            {
+                "client": client_id,
+                "admitted": state.admitted,
+                "limited": state.limited,
+                "queued": state.queued,
+                "running": state.running,
+                "waiting": len(state.queue),
+                "requestTokens": round(state.requests.level(now), 2),
+                "byteTokens": int(state.body_bytes.level(now)),
+            }
+            for client_id, state in self.clients.items()
+        ]
+        return totals, clients
+
+
+class RateLimitMiddleware:
+    """Apply per-client rate limits and fair scheduling to HTTP requests."""
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        client_header: str = "X-API-Key",
+        exempt_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.client_header = client_header.lower().encode("latin-1")
+        self.exempt_paths = tuple(exempt_paths)
+
+    def _identify(self, scope) -> Tuple[str, int]:
+        api_key = None
+        body_size = 0
+        for name, value in scope["headers"]:
+            if name == self.client_header:
+                api_key = value
+            elif name == b"content-length":
+                try:
+                    body_size = int(value)
+                except ValueError:
+                    pass
+        if api_key:
+            # Never keep raw keys in memory or expose them in the stats endpoint
+            return "key:" + hashlib.sha256(api_key).hexdigest()[:16], body_size
+        client = scope.get("client")
+        return "addr:" + (client[0] if client else "unknown"), body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        client_id, body_size = self._identify(scope)
+        now = time.monotonic()
+        state = limiter.client(client_id, now)
+
+        retry_after = limiter.check(state, body_size, now)
+        if retry_after is not None:
+            limiter.limited += 1
+            state.limited += 1
+            logger.debug(f"[rate-limit] Throttled {client_id} on {scope['path']}, retry in {retry_after:.1f}s")
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        if body_size == 0:
+            receive = self._charge_streamed(state, receive)
+
+        await limiter.scheduler.acquire(client_id, state)
+        limiter.admitted += 1
+        state.admitted += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.scheduler.release(state)
+
+    def _charge_streamed(self, state: ClientState, receive):
+        """Charge bodies without Content-Length as they arrive."""
+        async def charging_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state.body_bytes.consume(len(message.get("body", b"")), time.monotonic())
+            return message
+        return charging_receive
@@ -0,0 +1,170 @@
+"""
+Attachment download endpoints.
+"""
+
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from loguru import logger
+
+from ..dependencies import post_service
+from ..utils.file_utils import generate_etag
+from ..exceptions import (
+    InvalidAttachmentPathError,
+    AttachmentNotFoundError,
+    invalid_attachment_path_http_exception,
+    attachment_not_found_http_exception
+)
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Attachments"]
+)
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current file."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def requested_range(request: Request, size: int, etag: str, mtime: float) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=`` header into an inclusive (start, end).
+
+    Returns None when the whole object should be sent: no Range, an If-Range
+    validator that no longer matches, or a multi-range request. Raises
+    ValueError when the range cannot be satisfied.
+    """
+    range_header = request.headers.get("range")
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != etag and if_range != formatdate(mtime, usegmt=True):
+        return None
+    start, sep, end = range_header[len("bytes="):].strip().partition("-")
+    if not sep or not (start or end) or not all(part.isdigit() for part in (start, end) if part):
+        return None  # Malformed ranges are ignored
+    if not start:
+        # Suffix range: the last N bytes
+        if int(end) == 0 or size == 0:
+            raise ValueError(range_header)
+        return max(0, size - int(end)), size - 1
+    first = int(start)
+    if end and int(end) < first:
+        return None
+    if first >= size:
+        raise ValueError(range_header)
+    return first, min(int(end) if end else size - 1, size - 1)
+
+
+@router.get("/attachments/{att_path:path}")
+async def get_attachment(att_path: str, request: Request):
+    """
+    Download a stored attachment.
+    
+    - **att_path**: Attachment path in media/{ext}/{postId}/{postId}-{13digit}.{ext} format
+    
+    Supports `Range` requests for partial/resumable downloads and
+    conditional requests (`If-None-Match` / `If-Modified-Since`).
+    """
+    attachment_service = post_service.attachment_service
+    if not attachment_service.media_storage.is_local:
+        return await get_remote_attachment(att_path, request)
+    
+    try:
+        file_path = attachment_service.get_attachment_file(att_path)
+        stat_result = file_path.stat()
+    except InvalidAttachmentPathError as e:
+        raise invalid_attachment_path_http_exception(str(e))
+    except (AttachmentNotFoundError, FileNotFoundError):
+        raise attachment_not_found_http_exception(att_path)
+    except Exception as e:
+        logger.error(f"Unexpected error resolving attachment {att_path}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    etag = generate_etag(stat_result)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+    
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # FileResponse handles Range/If-Range and uses zero-copy send when the server supports it
+    return FileResponse(file_path, headers=headers, stat_result=stat_result)
+
+
+
+async def get_remote_attachment(att_path: str, request: Request) -> Response:
+    """
+    Serve an attachment from remote media storage.
+
+    The body is streamed from the backend in chunks, and Range requests are
+    forwarded to it so only the requested bytes are fetched.
+    """
+    storage = post_service.attachment_service.media_storage
+    try:
+        key = post_service.attachment_service.get_attachment_key(att_path)
+        stat = await storage.run(storage.stat(key))
+        if stat is None:
+            raise AttachmentNotFoundError(att_path)
+    except InvalidAttachmentPathError as e:
+        raise invalid_attachment_path_http_exception(str(e))
+    except AttachmentNotFoundError:
+        raise attachment_not_found_http_exception(att_path)
+    except Exception as e:
+        logger.error(f"Unexpected error reading remote attachment {att_path}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    headers = {
+        "ETag": stat.etag,
+        "Last-Modified": formatdate(stat.mtime, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Accept-Ranges": "bytes"
+    }
+    if is_not_modified(request, stat.etag, stat.mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    try:
+        byte_range = requested_range(request, stat.size, stat.etag, stat.mtime)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{stat.size}"}
+        )
+    
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    if byte_range is None:
+        headers["Content-Length"] = str(stat.size)
+        return StreamingResponse(storage.stream(key), media_type=media_type, headers=headers)
+    
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{stat.size}"
+    headers["Content-Length"] = str(last - first + 1)
+    return StreamingResponse(
+        storage.stream(key, first, last - first + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,75 @@
+"""
+Bulk category management endpoints.
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from loguru import logger
+
+from ..dependencies import category_service
+from ..services.category_service import CategoryJob
+from ..schemas.category import CategoryRenameRequest, CategoryJobResponse
+from ..exceptions import CategoryNotFoundError, CategoryJobNotFoundError, InvalidCategoryNameError
+
+router = APIRouter(
+    prefix="/api/categories",
+    tags=["Categories"]
+)
+
+
+def to_job_response(job: CategoryJob) -> CategoryJobResponse:
+    """Convert a category job to its API representation."""
+    return CategoryJobResponse(
+        jobId=job.job_id,
+        source=job.source,
+        target=job.target,
+        status=job.status,
+        total=job.total,
+        done=job.done,
+        failed=job.failed,
+        merged=job.merged,
+        errors=job.errors,
+        startedAt=job.started_at,
+        finishedAt=job.finished_at
+    )
+
+
+@router.post("/rename", response_model=CategoryJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def rename_category(request_data: CategoryRenameRequest):
+    """
+    Rename a category, or merge it into an existing one.
+    
+    Affected posts are moved with their `categories` frontmatter rewritten
+    in parallel, in crash-safe journaled batches. Poll
+    `GET /api/categories/jobs/{jobId}` for progress.
+    """
+    try:
+        job = category_service.start_rename(request_data.source, request_data.target)
+    except CategoryNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No category found: {e}"
+        )
+    except InvalidCategoryNameError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid category name: {e}"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error starting category rename: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    return to_job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=CategoryJobResponse)
+async def get_category_job(job_id: str):
+    """Get the progress of a bulk category job."""
+    try:
+        return to_job_response(category_service.get_job(job_id))
+    except CategoryJobNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No category job found: {e}"
+        )
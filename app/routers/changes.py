@@ -0,0 +1,57 @@
+"""
+Change feed and sync manifest endpoints.
+"""
+
+from dataclasses import asdict
+from fastapi import APIRouter, HTTPException, Query, status
+
+from ..config import settings
+from ..dependencies import change_log
+from ..schemas.changes import ChangesResponse, ChangeSchema, ManifestResponse
+from ..exceptions import CursorExpiredError
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Sync"]
+)
+
+
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Cursor from a previous response (0 for everything)"),
+    limit: int = Query(500, ge=1, description="Maximum number of changes to return")
+):
+    """
+    Get changes made after a cursor.
+    
+    Returns **410 Gone** when the cursor is older than the compacted log;
+    the device should then bootstrap again from `/api/manifest`.
+    """
+    limit = min(limit, settings.changes_max_page_size)
+    try:
+        entries, cursor, has_more = change_log.changes_since(since, limit)
+    except CursorExpiredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
+    
+    return ChangesResponse(
+        changes=[ChangeSchema(**asdict(entry)) for entry in entries],
+        cursor=cursor,
+        hasMore=has_more
+    )
+
+
+@router.get("/manifest", response_model=ManifestResponse)
+async def get_manifest():
+    """
+    Get every file currently in the vault with its content hash.
+    
+    Devices bootstrap from the manifest, then follow `/api/changes?since=<cursor>`.
+    """
+    entries, cursor = change_log.manifest()
+    return ManifestResponse(
+        cursor=cursor,
+        files=[ChangeSchema(**asdict(entry)) for entry in entries]
+    )
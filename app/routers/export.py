@@ -0,0 +1,63 @@
+"""
+Vault export endpoints.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from loguru import logger
+
+from ..dependencies import export_service
+from ..services.export_service import COMPRESSION_MEDIA_TYPES
+from ..exceptions import UnsupportedCompressionError, FileOperationError
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Export"]
+)
+
+
+@router.get("/export")
+async def export_vault(
+    since: Optional[float] = Query(None, description="Only include files modified after this cursor (unix timestamp)"),
+    compression: str = Query("none", pattern="^(none|gzip|zstd)$", description="Archive compression")
+):
+    """
+    Stream a tar archive of content_root and static_root/media.
+    
+    - **since**: Incremental export; pass the `X-Export-Cursor` of a previous export
+    - **compression**: `none`, `gzip` or `zstd`
+    
+    The archive reflects a single point in time relative to in-flight upserts.
+    `.export-manifest.json` at the archive root lists every file in the vault.
+    """
+    try:
+        snapshot = await run_in_threadpool(export_service.create_snapshot, since, compression)
+    except UnsupportedCompressionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except FileOperationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Export snapshot failed: {e}"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error creating export snapshot: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    media_type, suffix = COMPRESSION_MEDIA_TYPES[compression]
+    filename = f"vault-{int(snapshot.cursor)}{suffix}"
+    return StreamingResponse(
+        export_service.stream_archive(snapshot, compression),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Cursor": repr(snapshot.cursor)
+        }
+    )
@@ -2,9 +2,12 @@
 Health check endpoints.
 """
 
+from typing import List
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from ..dependencies import memory_budget, rate_limiter
+
 router = APIRouter(
     prefix="/health",
     tags=["Health"]
@@ -25,4 +28,60 @@ async def health_check():
         status="healthy",
         service="Obsidian Sync API",
         version="0.1.0"
-    ) 
\ No newline at end of file
+    )
+
+
+class AdmissionResponse(BaseModel):
+    """In-flight request body memory usage."""
+    budgetBytes: int
+    inUseBytes: int
+    peakBytes: int
+    waiting: int
+    admitted: int
+    rejectedTooLarge: int
+    rejectedBusy: int
+
+
+@router.get("/admission", response_model=AdmissionResponse)
+async def admission_status():
+    """Current usage of the in-flight request body budget."""
+    stats = memory_budget.stats()
+    return AdmissionResponse(
+        budgetBytes=stats.limit,
+        inUseBytes=stats.in_use,
+        peakBytes=stats.peak,
+        waiting=stats.waiting,
+        admitted=stats.admitted,
+        rejectedTooLarge=stats.rejected_too_large,
+        rejectedBusy=stats.rejected_busy
+    )
+
+
+class ClientRateLimitStats(BaseModel):
+    """Rate limiting counters of one client."""
+    client: str
+    admitted: int
+    limited: int
+    queued: int
+    running: int
+    waiting: int
+    requestTokens: float
+    byteTokens: int
+
+
+class RateLimitResponse(BaseModel):
+    """Rate limiting and scheduling counters."""
+    clients: int
+    admitted: int
+    limited: int
+    running: int
+    waiting: int
+    maxConcurrency: int
+    perClient: List[ClientRateLimitStats]
+
+
+@router.get("/rate-limits", response_model=RateLimitResponse)
+async def rate_limit_status():
+    """Current rate limiting state per client."""
+    totals, clients = rate_limiter.stats()
+    return RateLimitResponse(**totals, perClient=[ClientRateLimitStats(**c) for c in clients])
@@ -2,32 +2,52 @@
 Post management endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, status
+import json
+from typing import Any, Callable
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from loguru import logger
+from pydantic import ValidationError
 
-from ..schemas.post import PostRequestSchema
+from ..schemas.post import PostPatchSchema
+from ..schemas.post_record import decode_post_request, post_request_openapi
 from ..schemas.responses import PostUpsertResponse, PostDeleteResponse, ErrorResponse
-from ..services.post_service import PostService
+from ..dependencies import post_service, profiling_service
+from ..middleware.profiling import profiled_route_class
 from ..exceptions import (
     ObsidianSyncException,
     InvalidAttachmentPathError,
     MissingRequiredFieldError,
+    PatchConflictError,
+    ContentHashMismatchError,
+    AttachmentWriteError,
     invalid_attachment_path_http_exception,
     missing_required_field_http_exception
 )
 
 router = APIRouter(
     prefix="/api",
-    tags=["Posts"]
+    tags=["Posts"],
+    route_class=profiled_route_class(profiling_service)
 )
 
-# Initialize service
-post_service = PostService()
 
+async def run_post_service(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking post_service call in the threadpool.
 
-@router.post("/posts", response_model=PostUpsertResponse)
-async def upsert_post(post_data: PostRequestSchema):
+    The service waits on the vault lock and the journal's group commit, so
+    on the event loop it would stall every other request (and concurrent
+    upserts could never share a group commit). Request profiling follows
+    the call onto its worker thread.
+    """
+    return await run_in_threadpool(profiling_service.follow(func), *args)
+
+
+@router.post("/posts", response_model=PostUpsertResponse, openapi_extra=post_request_openapi())
+async def upsert_post(request: Request):
     """
     Create or update a post.
     
@@ -36,13 +56,42 @@ async def upsert_post(post_data: PostRequestSchema):
     - **description**: Post description (required)
     - **content**: Post content in Markdown format
     - **attachments**: List of attachments with base64 encoded data
+    
+    The body (a PostRequestSchema) is decoded by the fast path in
+    schemas.post_record, so attachment data is not copied or re-validated.
     """
+    body = await request.body()
+    try:
+        post_data = decode_post_request(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": e.msg}}],
+            body=body
+        )
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
+    
     try:
-        return post_service.upsert_post(post_data)
+        return await run_post_service(post_service.upsert_post, post_data)
     except InvalidAttachmentPathError as e:
         raise invalid_attachment_path_http_exception(str(e))
     except MissingRequiredFieldError as e:
         raise missing_required_field_http_exception(str(e))
+    except AttachmentWriteError as e:
+        logger.error(f"Post upsert error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": str(e),
+                "attachments": [
+                    {"path": result.path, "error": result.error}
+                    for result in e.results if not result.ok
+                ]
+            }
+        )
     except ObsidianSyncException as e:
         logger.error(f"Post upsert error: {e}")
         raise HTTPException(
@@ -57,6 +106,47 @@ async def upsert_post(post_data: PostRequestSchema):
         )
 
 
+@router.patch("/posts/{post_id}", response_model=PostUpsertResponse)
+async def patch_post(post_id: str, patch: PostPatchSchema):
+    """
+    Update part of a post without re-uploading it.
+    
+    - **baseHash**: `contentHash` returned by the last upsert/patch (required with a content delta)
+    - **diff**: Unified diff against that content, or
+    - **ops**: Splice operations `{offset, delete, insert}` against that content
+    - **frontmatter**: Frontmatter fields to change
+    
+    Returns 422 if both `diff` and `ops` are sent, 412 if the content changed
+    since `baseHash` and 409 if the delta does not apply.
+    """
+    try:
+        return await run_post_service(post_service.patch_post, post_id, patch)
+    except HTTPException:
+        raise
+    except ContentHashMismatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(e)
+        )
+    except PatchConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ObsidianSyncException as e:
+        logger.error(f"Post patch error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in post patch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.delete("/posts/{post_id}", response_model=PostDeleteResponse)
 async def delete_post(post_id: str):
     """
@@ -65,7 +155,7 @@ async def delete_post(post_id: str):
     - **post_id**: The ID of the post to delete
     """
     try:
-        result = post_service.delete_post(post_id)
+        result = await run_post_service(post_service.delete_post, post_id)
         
         if not result.deleted:
             return JSONResponse(
@@ -0,0 +1,58 @@
+"""
+Profile admin endpoints (registered only when profiling is enabled).
+"""
+
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from ..dependencies import profiling_service
+from ..exceptions import ProfileNotFoundError
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Admin"]
+)
+
+
+class ProfileSchema(BaseModel):
+    """A stored request profile."""
+    profileId: str
+    endpoint: str
+    createdAt: float
+    size: int
+    format: str
+
+
+@router.get("/profiles", response_model=List[ProfileSchema])
+async def list_profiles():
+    """List stored request profiles, newest first."""
+    return [
+        ProfileSchema(
+            profileId=profile.profile_id,
+            endpoint=profile.endpoint,
+            createdAt=profile.created_at,
+            size=profile.size,
+            format=profile.format
+        )
+        for profile in profiling_service.list_profiles()
+    ]
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """
+    Download a stored profile.
+    
+    `sampling` profiles are collapsed stacks (flamegraph.pl, speedscope);
+    `deterministic` profiles are cProfile stats files (snakeviz, flameprof).
+    """
+    try:
+        path = profiling_service.get_profile_file(profile_id)
+    except ProfileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No profile found: {profile_id}"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
@@ -0,0 +1,47 @@
+"""
+Full-text search endpoints.
+"""
+
+from fastapi import APIRouter, Query
+
+from ..config import settings
+from ..dependencies import search_index
+from ..schemas.search import SearchResponse, SearchResultSchema
+
+router = APIRouter(
+    prefix="/api",
+    tags=["Search"]
+)
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_posts(
+    q: str = Query(..., min_length=1, description="Search query"),
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: int = Query(20, ge=1, alias="pageSize", description="Results per page")
+):
+    """
+    Search posts by title, tags and content.
+    
+    - **q**: Search terms (any term may match, ranked by relevance)
+    - **page** / **pageSize**: Pagination
+    """
+    page_size = min(page_size, settings.search_max_page_size)
+    total, hits = search_index.search(q, offset=(page - 1) * page_size, limit=page_size)
+    
+    return SearchResponse(
+        query=q,
+        total=total,
+        page=page,
+        pageSize=page_size,
+        results=[
+            SearchResultSchema(
+                postId=hit.post_id,
+                title=hit.title,
+                category=hit.category,
+                tags=hit.tags,
+                score=hit.score
+            )
+            for hit in hits
+        ]
+    )
@@ -0,0 +1,122 @@
+"""
+Resumable upload endpoints.
+"""
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+
+from ..dependencies import upload_service
+from ..services.upload_service import UploadSession
+from ..schemas.upload import UploadCreateRequest, UploadFinalizeRequest, UploadStatusResponse
+from ..exceptions import (
+    InvalidAttachmentPathError,
+    UploadNotFoundError,
+    UploadConflictError,
+    UploadChecksumError,
+    invalid_attachment_path_http_exception
+)
+
+router = APIRouter(
+    prefix="/api/uploads",
+    tags=["Uploads"]
+)
+
+
+def to_status_response(session: UploadSession) -> UploadStatusResponse:
+    """Convert an upload session to its API representation."""
+    return UploadStatusResponse(
+        uploadId=session.upload_id,
+        path=session.path,
+        size=session.size,
+        offset=session.offset,
+        completed=session.completed,
+        expiresAt=session.expires_at
+    )
+
+
+def upload_http_exception(exc: Exception) -> HTTPException:
+    """Map upload errors to HTTP exceptions."""
+    if isinstance(exc, InvalidAttachmentPathError):
+        return invalid_attachment_path_http_exception(str(exc))
+    if isinstance(exc, UploadNotFoundError):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No upload session found: {exc}"
+        )
+    if isinstance(exc, UploadConflictError):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if isinstance(exc, UploadChecksumError):
+        return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+    logger.error(f"Unexpected error in upload: {exc}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Internal server error"
+    )
+
+
+@router.post("", response_model=UploadStatusResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(request_data: UploadCreateRequest):
+    """
+    Create a resumable upload session for a large attachment.
+    
+    Then `PUT` chunks, `POST .../finalize`, and reference the returned
+    **uploadId** from the attachment in `POST /api/posts`.
+    """
+    try:
+        session = upload_service.create_session(request_data.path, request_data.size, request_data.sha256)
+    except Exception as e:
+        raise upload_http_exception(e)
+    return to_status_response(session)
+
+
+@router.get("/{upload_id}", response_model=UploadStatusResponse)
+async def get_upload(upload_id: str, response: Response):
+    """Get the current offset of an upload session (to resume after an interruption)."""
+    try:
+        session = upload_service.get_session(upload_id)
+    except Exception as e:
+        raise upload_http_exception(e)
+    response.headers["Upload-Offset"] = str(session.offset)
+    return to_status_response(session)
+
+
+@router.put("/{upload_id}", response_model=UploadStatusResponse)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0)
+):
+    """
+    Append a chunk of raw bytes (request body) at `Upload-Offset`.
+    
+    Returns **409** with the expected offset in the detail when the offset
+    does not match the bytes already received.
+    """
+    try:
+        session = await upload_service.append_chunk(upload_id, upload_offset, request.stream())
+    except Exception as e:
+        raise upload_http_exception(e)
+    response.headers["Upload-Offset"] = str(session.offset)
+    return to_status_response(session)
+
+
+@router.post("/{upload_id}/finalize", response_model=UploadStatusResponse)
+async def finalize_upload(upload_id: str, request_data: UploadFinalizeRequest):
+    """Verify the uploaded size and sha256 checksum and mark the upload as complete."""
+    try:
+        # Hashing a large file should not block the event loop
+        session = await run_in_threadpool(upload_service.finalize, upload_id, request_data.sha256)
+    except Exception as e:
+        raise upload_http_exception(e)
+    return to_status_response(session)
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(upload_id: str):
+    """Abort an upload session and delete the received data."""
+    try:
+        upload_service.cancel(upload_id)
+    except Exception as e:
+        raise upload_http_exception(e)
@@ -10,7 +10,8 @@ class AttachmentSchema(BaseModel):
     """Schema for attachment data validation."""
     name: str = Field(..., description="Attachment filename")
     path: str = Field(..., description="Attachment path in media/ext/postId/postId-timestamp.ext format")
-    data: str = Field(..., description="Base64 encoded file data")
+    data: Optional[str] = Field(None, description="Base64 encoded file data")
+    uploadId: Optional[str] = Field(None, description="ID of a finalized resumable upload (instead of data)")
     
     class Config:
         json_schema_extra = {
@@ -0,0 +1,35 @@
+"""
+Bulk category operation schemas.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class CategoryRenameRequest(BaseModel):
+    """Schema for renaming or merging a category."""
+    source: str = Field(..., description="Existing category name")
+    target: str = Field(..., description="New category name (merged if it already exists)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "source": "Dev Notes",
+                "target": "Engineering"
+            }
+        }
+
+
+class CategoryJobResponse(BaseModel):
+    """Response schema describing a bulk category job."""
+    jobId: str = Field(..., description="Job ID")
+    source: str = Field(..., description="Source category")
+    target: str = Field(..., description="Target category")
+    status: str = Field(..., description="pending, running, completed or failed")
+    total: int = Field(..., description="Number of affected posts")
+    done: int = Field(..., description="Posts rewritten so far")
+    failed: int = Field(..., description="Posts that could not be rewritten")
+    merged: bool = Field(..., description="Whether posts were merged into an existing category")
+    errors: List[str] = Field([], description="Error messages")
+    startedAt: Optional[float] = Field(None, description="Unix timestamp the job started")
+    finishedAt: Optional[float] = Field(None, description="Unix timestamp the job finished")
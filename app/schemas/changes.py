@@ -0,0 +1,52 @@
+"""
+Change feed schemas for API responses.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ChangeSchema(BaseModel):
+    """A single change to a vault file."""
+    seq: int = Field(..., description="Change sequence number")
+    ts: float = Field(..., description="Unix timestamp of the change")
+    kind: str = Field(..., description="post or attachment")
+    op: str = Field(..., description="add, modify, move or delete")
+    postId: str = Field(..., description="Post ID the file belongs to")
+    path: str = Field(..., description="File path, prefixed with content/ or static/")
+    hash: Optional[str] = Field(None, description="sha256 of the file content (absent for deletes)")
+    size: Optional[int] = Field(None, description="File size in bytes (absent for deletes)")
+    oldPath: Optional[str] = Field(None, description="Previous path for moves")
+
+
+class ChangesResponse(BaseModel):
+    """Response schema for the change feed."""
+    changes: List[ChangeSchema] = Field([], description="Changes ordered by seq")
+    cursor: int = Field(..., description="Cursor to pass as `since` for the next page")
+    hasMore: bool = Field(..., description="Whether more changes are available right away")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "changes": [
+                    {
+                        "seq": 42,
+                        "ts": 1704038400.0,
+                        "kind": "post",
+                        "op": "modify",
+                        "postId": "12345678-1234-1234-1234-123456789012",
+                        "path": "content/blog/12345678-1234-1234-1234-123456789012.md",
+                        "hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                        "size": 1024
+                    }
+                ],
+                "cursor": 42,
+                "hasMore": False
+            }
+        }
+
+
+class ManifestResponse(BaseModel):
+    """Response schema for the full vault manifest."""
+    cursor: int = Field(..., description="Cursor the manifest is valid at; use as `since` afterwards")
+    files: List[ChangeSchema] = Field([], description="Latest entry for every file in the vault")
@@ -2,8 +2,8 @@
 Post schemas for API validation.
 """
 
-from pydantic import BaseModel, Field
-from typing import Any, List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Optional
 from .attachment import AttachmentSchema
 
 
@@ -51,4 +51,35 @@ class PostRequestSchema(BaseModel):
                 "tags": ["example", "tutorial"],
                 "author": "Author Name"
             }
-        } 
\ No newline at end of file
+        } 
+
+
+class SpliceOpSchema(BaseModel):
+    """Replace `delete` characters at `offset` of the base content with `insert`."""
+    offset: int = Field(..., ge=0, description="Code point offset in the base content")
+    delete: int = Field(0, ge=0, description="Number of code points to remove")
+    insert: str = Field("", description="Text to insert")
+
+
+class PostPatchSchema(BaseModel):
+    """Schema for a partial post update."""
+    baseHash: Optional[str] = Field(None, description="sha256 of the content the diff was made against (required with diff/ops)")
+    diff: Optional[str] = Field(None, description="Unified diff against the base content (not together with ops)")
+    ops: Optional[List[SpliceOpSchema]] = Field(None, description="Splice operations against the base content (sorted, non-overlapping; not together with diff)")
+    frontmatter: Dict[str, Any] = Field({}, description="Frontmatter fields to change")
+    
+    @model_validator(mode="after")
+    def check_single_delta(self) -> "PostPatchSchema":
+        # Both are positions in the base content, so they cannot be combined
+        if self.diff is not None and self.ops:
+            raise ValueError("Send either diff or ops, not both")
+        return self
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "baseHash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "diff": "@@ -3 +3 @@\n-This is my first post!\n+This is my first post, edited.\n",
+                "frontmatter": {"tags": ["example", "edited"]}
+            }
+        }
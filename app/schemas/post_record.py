@@ -0,0 +1,183 @@
+"""
+Fast-path decoding of post upsert requests.
+
+The request body is decoded once into slotted records that mirror
+PostRequestSchema. Attachment data stays a view of the request body (see
+``utils.json_views``) and each attachment path is parsed once, at decode
+time, into the AttachmentPath used by every later stage. Bodies the fast
+path does not accept as-is (type coercions, unusual JSON) go through
+pydantic validation of the schema, so the accepted input and the errors
+are the same as for the schema.
+"""
+
+import json
+import typing
+from typing import Any, Callable, Dict, Optional, Union
+
+from .post import PostRequestSchema
+from ..utils.frontmatter import EXCLUDED_FIELDS
+from ..utils.json_views import loads_with_views
+from ..utils.validation import AttachmentPath, parse_attachment_path
+
+# Attachment payloads large enough are kept as views of the body
+_VIEW_KEY = "data"
+
+
+class _NotFast(Exception):
+    """The body needs full schema validation."""
+
+
+class AttachmentRecord:
+    """One attachment of a post upsert request."""
+
+    __slots__ = ("name", "path", "data", "uploadId", "location")
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        data: Union[str, memoryview, None] = None,
+        uploadId: Optional[str] = None
+    ):
+        self.name = name
+        self.path = path
+        self.data = data  # base64, possibly a view of the request body
+        self.uploadId = uploadId
+        self.location: Optional[AttachmentPath] = parse_attachment_path(path)
+
+
+class PostRecord:
+    """A decoded post upsert request, with the fields of PostRequestSchema."""
+
+    __slots__ = tuple(PostRequestSchema.model_fields)
+
+    def frontmatter(self) -> Dict[str, Any]:
+        """The frontmatter fields (content and attachments are left out, not copied)."""
+        return {name: getattr(self, name) for name in _FRONTMATTER_FIELDS}
+
+    @classmethod
+    def from_schema(cls, post: PostRequestSchema) -> "PostRecord":
+        record = cls()
+        for name in PostRequestSchema.model_fields:
+            setattr(record, name, getattr(post, name))
+        record.attachments = [
+            AttachmentRecord(att.name, att.path, att.data, att.uploadId)
+            for att in post.attachments
+        ]
+        return record
+
+
+_FRONTMATTER_FIELDS = tuple(name for name in PostRequestSchema.model_fields if name not in EXCLUDED_FIELDS)
+
+
+def _is_str(value: Any) -> bool:
+    return type(value) is str
+
+
+def _is_bool(value: Any) -> bool:
+    return type(value) is bool
+
+
+def _is_str_list(value: Any) -> bool:
+    return type(value) is list and all(type(item) is str for item in value)
+
+
+def _checker_for(annotation: Any) -> Callable[[Any], bool]:
+    optional = False
+    if typing.get_origin(annotation) is Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        optional = len(args) == 1
+        annotation = args[0] if optional else annotation
+    if annotation is str:
+        check = _is_str
+    elif annotation is bool:
+        check = _is_bool
+    elif typing.get_origin(annotation) is list and typing.get_args(annotation) == (str,):
+        check = _is_str_list
+    else:
+        raise TypeError(f"No fast-path check for {annotation}")
+    if optional:
+        return lambda value: value is None or check(value)
+    return check
+
+
+# (name, required, default, check) for the scalar fields, in declaration order
+_FIELDS = tuple(
+    (name, field.is_required(), field.default, _checker_for(field.annotation))
+    for name, field in PostRequestSchema.model_fields.items()
+    if name != "attachments"
+)
+
+
+def _decode_attachment(raw: Any) -> AttachmentRecord:
+    if type(raw) is not dict:
+        raise _NotFast
+    name = raw.get("name")
+    path = raw.get("path")
+    data = raw.get("data")
+    upload_id = raw.get("uploadId")
+    if (
+        type(name) is not str
+        or type(path) is not str
+        or not (data is None or type(data) is str or type(data) is memoryview)
+        or not (upload_id is None or type(upload_id) is str)
+    ):
+        raise _NotFast
+    return AttachmentRecord(name, path, data, upload_id)
+
+
+def _decode_fast(raw: Any) -> PostRecord:
+    if type(raw) is not dict:
+        raise _NotFast
+    record = PostRecord()
+    for name, required, default, check in _FIELDS:
+        if name in raw:
+            value = raw[name]
+            if not check(value):
+                raise _NotFast
+        elif required:
+            raise _NotFast
+        else:
+            value = default
+        setattr(record, name, value)
+    attachments = raw.get("attachments", [])
+    if type(attachments) is not list:
+        raise _NotFast
+    record.attachments = [_decode_attachment(att) for att in attachments]
+    return record
+
+
+def decode_post_request(body: bytes) -> PostRecord:
+    """
+    Decode a post upsert request body.
+
+    Raises json.JSONDecodeError for malformed JSON and pydantic's
+    ValidationError for bodies that do not match PostRequestSchema.
+    """
+    try:
+        return _decode_fast(loads_with_views(body, _VIEW_KEY))
+    except (ValueError, _NotFast):
+        pass
+    # json.loads is the authority on malformed JSON, pydantic on everything else
+    return PostRecord.from_schema(PostRequestSchema.model_validate(json.loads(body)))
+
+
+def _inline_refs(schema: Any, definitions: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in schema.items() if key != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_refs(item, definitions) for item in schema]
+    return schema
+
+
+def post_request_openapi() -> Dict[str, Any]:
+    """OpenAPI request body of endpoints that decode PostRequestSchema themselves."""
+    schema = PostRequestSchema.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_refs(schema, schema.get("$defs", {}))}},
+        }
+    }
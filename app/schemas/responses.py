@@ -10,12 +10,14 @@ class PostUpsertResponse(BaseModel):
     """Response schema for post upsert operation."""
     postId: str = Field(..., description="Post ID")
     status: str = Field(..., description="Operation status")
+    contentHash: Optional[str] = Field(None, description="sha256 of the stored content (base hash for PATCH)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "postId": "12345678-1234-1234-1234-123456789012",
-                "status": "success"
+                "status": "success",
+                "contentHash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
             }
         }
 
@@ -0,0 +1,43 @@
+"""
+Search schemas for API responses.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class SearchResultSchema(BaseModel):
+    """A single search result."""
+    postId: str = Field(..., description="Post ID")
+    title: str = Field(..., description="Post title")
+    category: str = Field(..., description="Category directory")
+    tags: List[str] = Field([], description="Post tags")
+    score: float = Field(..., description="Relevance score")
+
+
+class SearchResponse(BaseModel):
+    """Response schema for full-text search."""
+    query: str = Field(..., description="Search query")
+    total: int = Field(..., description="Total number of matching posts")
+    page: int = Field(..., description="Current page (1-based)")
+    pageSize: int = Field(..., description="Results per page")
+    results: List[SearchResultSchema] = Field([], description="Ranked results")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "hugo",
+                "total": 1,
+                "page": 1,
+                "pageSize": 20,
+                "results": [
+                    {
+                        "postId": "12345678-1234-1234-1234-123456789012",
+                        "title": "Deploying Hugo",
+                        "category": "blog",
+                        "tags": ["hugo"],
+                        "score": 2.3512
+                    }
+                ]
+            }
+        }
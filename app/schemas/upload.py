@@ -0,0 +1,37 @@
+"""
+Resumable upload schemas for API validation.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class UploadCreateRequest(BaseModel):
+    """Schema for creating an upload session."""
+    path: str = Field(..., description="Attachment path in media/ext/postId/postId-timestamp.ext format")
+    size: int = Field(..., ge=0, description="Total size of the file in bytes")
+    sha256: Optional[str] = Field(None, description="Expected sha256 of the complete file")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "path": "media/mp4/my-post/my-post-1234567890123.mp4",
+                "size": 314572800,
+                "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+            }
+        }
+
+
+class UploadFinalizeRequest(BaseModel):
+    """Schema for finalizing an upload session."""
+    sha256: Optional[str] = Field(None, description="sha256 of the complete file (if not given at creation)")
+
+
+class UploadStatusResponse(BaseModel):
+    """Response schema describing an upload session."""
+    uploadId: str = Field(..., description="Upload session ID")
+    path: str = Field(..., description="Target attachment path")
+    size: int = Field(..., description="Declared total size in bytes")
+    offset: int = Field(..., description="Bytes received so far; send the next chunk at this offset")
+    completed: bool = Field(..., description="Whether the upload has been finalized")
+    expiresAt: Optional[float] = Field(None, description="Unix timestamp after which an idle session expires; null once finalized (kept until used or cancelled)")
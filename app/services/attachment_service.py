@@ -2,125 +2,304 @@
 Attachment processing service.
 """
 
-import re
-from typing import List, Dict, Tuple
+import asyncio
+import binascii
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Union
 from pathlib import Path
 from loguru import logger
 
 from ..models.attachment import Attachment
 from ..config import settings
-from ..utils.file_utils import decode_base64_and_write, delete_directory
-from ..utils.validation import validate_attachment_path_format, extract_attachment_path_components
-from ..exceptions import InvalidAttachmentPathError
+from ..schemas.post_record import AttachmentRecord
+from ..utils.file_utils import delete_directory
+from ..utils.validation import validate_attachment_path_format
+from ..exceptions import (
+    InvalidAttachmentPathError,
+    AttachmentNotFoundError,
+    UploadConflictError,
+    FileOperationError,
+    AttachmentWriteError,
+    ObsidianSyncException
+)
+from ..storage.base import StorageBackend
+from ..storage.local import LocalStorage
+from .upload_service import UploadService
+from .write_journal import Transaction
+
+
+@dataclass
+class AttachmentResult:
+    """Outcome of staging one attachment."""
+    path: str
+    key: str
+    target: Optional[Path] = None  # Local file written on commit (local storage only)
+    size: int = 0
+    sha256: Optional[str] = None  # Content hash of remotely stored attachments
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class AttachmentService:
     """Service for handling attachment operations."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        upload_service: Optional[UploadService] = None,
+        media_storage: Optional[StorageBackend] = None
+    ):
         self.static_root = settings.static_root
+        self.upload_service = upload_service or UploadService()
+        # Keys are relative to static_root (media/{ext}/{postId}/...)
+        self.media_storage = media_storage or LocalStorage(self.static_root)
+        # Shared by all requests, so concurrent upserts cannot oversubscribe the disk
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.attachment_write_workers,
+            thread_name_prefix="attachment-write"
+        )
     
-    def validate_attachments(self, attachments: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+    def validate_attachments(self, attachments: List[AttachmentRecord]) -> List[AttachmentRecord]:
         """
-        Validate attachments and return list of (path, data) tuples.
+        Validate attachments and return those to be stored.
+        Each attachment carries either base64 data or the ID of a finalized upload.
         """
         validated_attachments = []
         
         for att in attachments:
-            att_path = att.get("path")
-            att_data = att.get("data")
-            att_name = att.get("name")
-            
-            if not att_path or not att_data or not att_name:
+            if not att.path or not (att.data or att.uploadId) or not att.name:
                 continue
                 
-            # Validate path format
-            if not validate_attachment_path_format(att_path):
-                logger.error(f"[validate_attachments] Invalid attachment path format: {att_path}")
-                raise InvalidAttachmentPathError(att_path)
+            # Validate path format (parsed once when the request was decoded)
+            if att.location is None:
+                logger.error(f"[validate_attachments] Invalid attachment path format: {att.path}")
+                raise InvalidAttachmentPathError(att.path)
             
-            # Extract components and generate normalized path
-            components = extract_attachment_path_components(att_path)
-            timestamp = components["timestamp"]
-            ext = components["ext"]
-            file_ext = components["file_ext"]
+            # Referenced uploads must be finalized for this path before anything is written
+            if att.uploadId and not att.data:
+                session = self.upload_service.get_session(att.uploadId)
+                if not session.completed or session.path != att.location.path:
+                    raise UploadConflictError(f"Upload {att.uploadId} is not a finalized upload for {att.path}")
             
-            validated_attachments.append((att_path.lower(), att_data))
+            validated_attachments.append(att)
         
         return validated_attachments
     
-    def create_attachment_mapping(self, attachments: List[Dict[str, str]], post_id: str) -> Dict[str, str]:
+    def create_attachment_mapping(self, attachments: List[AttachmentRecord], post_id: str) -> Dict[str, str]:
         """
         Create mapping from attachment name to blog URL path.
         """
         attachment_map = {}
         
         for att in attachments:
-            att_path = att.get("path", "")
-            att_name = att.get("name", "")
-            
-            if not att_path or not att_name:
+            if not att.path or not att.name:
                 continue
-                
-            try:
-                components = extract_attachment_path_components(att_path)
-                logger.debug(f"[create_attachment_mapping] Components: {components}")
-                ext = components["ext"]
-                timestamp = components["timestamp"]
-                file_ext = components["file_ext"]
-                
-                blog_path = f"/blog/media/{ext}/{post_id}/{post_id}-{timestamp}.{file_ext}"
-                attachment_map[att_name] = blog_path
-            except Exception as e:
-                logger.warning(f"Failed to process attachment {att_name}: {e}")
+            if att.location is None:
+                logger.warning(f"Failed to process attachment {att.name}: invalid path {att.path}")
                 continue
+            attachment_map[att.name] = att.location.blog_path(post_id)
         
         return attachment_map
     
-    def save_attachments(self, validated_attachments: List[Tuple[str, str]], post_id: str) -> None:
+    def _decode(self, att_path: str, att_data: Union[str, memoryview]) -> bytes:
+        try:
+            # Reads views of the request body in place (base64.b64decode copies them first)
+            return binascii.a2b_base64(att_data)
+        except (binascii.Error, ValueError) as e:
+            raise FileOperationError(f"Failed to decode attachment {att_path}: {e}")
+    
+    def stage_attachments(
+        self,
+        tx: Transaction,
+        validated_attachments: List[AttachmentRecord],
+        post_id: str
+    ) -> List[AttachmentResult]:
+        """
+        Stage validated attachments into a write transaction.
+
+        Attachments are decoded and staged in parallel on a bounded pool, so a
+        post with many attachments waits about as long as its largest one.
+        Any failure aborts the whole upsert, so a post never points at missing
+        media; AttachmentWriteError carries the result of every attachment.
+        """
+        if not self.media_storage.is_local:
+            results = self._store_remote(tx, validated_attachments, post_id)
+        elif len(validated_attachments) <= 1:
+            results = [self._stage_one(tx, attachment, post_id) for attachment in validated_attachments]
+        else:
+            results = list(self._executor.map(
+                lambda attachment: self._stage_one(tx, attachment, post_id),
+                validated_attachments
+            ))
+        
+        failed = [result for result in results if not result.ok]
+        if failed:
+            for result in failed:
+                logger.warning(f"Failed to stage attachment {result.path}: {result.error}")
+            raise AttachmentWriteError(
+                f"{len(failed)} of {len(results)} attachments of {post_id} could not be saved",
+                results
+            )
+        return results
+    
+    def _stage_one(
+        self,
+        tx: Transaction,
+        att: AttachmentRecord,
+        post_id: str
+    ) -> AttachmentResult:
+        att_path, upload_id = att.location.path, att.uploadId
+        result = AttachmentResult(path=att_path, key=att.location.storage_key(post_id))
+        full_path = self.media_storage.local_path(result.key)
+        try:
+            if att.data:
+                data = self._decode(att_path, att.data)
+                tx.write(full_path, data)
+                result.size = len(data)
+            else:
+                # Finished resumable upload: renamed into place on commit, no copy
+                staged = self.upload_service.staged_file(upload_id, att_path)
+                result.size = staged.stat().st_size
+                tx.adopt(staged, full_path)
+                tx.after_commit(lambda upload_id=upload_id: self.upload_service.release(upload_id))
+            result.target = full_path
+        except (ObsidianSyncException, OSError) as e:
+            result.error = str(e)
+        return result
+    
+    def _store_remote(
+        self,
+        tx: Transaction,
+        validated_attachments: List[AttachmentRecord],
+        post_id: str
+    ) -> List[AttachmentResult]:
         """
-        Save validated attachments to static directory.
+        Upload attachments to remote media storage before the post is committed.
+        Uploads run concurrently over the backend's connection pool; the
+        calling thread waits for them, so this must not run on the event loop.
         """
-        for att_path, att_data in validated_attachments:
+        storage = self.media_storage
+        results = []
+        items = []
+        for att in validated_attachments:
+            att_path, upload_id = att.location.path, att.uploadId
+            result = AttachmentResult(path=att_path, key=att.location.storage_key(post_id))
+            results.append(result)
             try:
-                components = extract_attachment_path_components(att_path)
-                ext = components["ext"]
-                timestamp = components["timestamp"]
-                file_ext = components["file_ext"]
-                
-                # Generate actual storage path
-                storage_path = f"media/{ext}/{post_id}/{post_id}-{timestamp}.{file_ext}"
-                full_path = self.static_root / storage_path
-                
-                decode_base64_and_write(full_path, att_data)
-                
-            except Exception as e:
-                logger.error(f"Failed to save attachment {att_path}: {e}")
+                if att.data:
+                    data = self._decode(att_path, att.data)
+                    result.size = len(data)
+                    result.sha256 = hashlib.sha256(data).hexdigest()
+                    items.append((result, data, None))
+                else:
+                    source = self.upload_service.staged_file(upload_id, att_path)
+                    result.size = source.stat().st_size
+                    # Verified against the uploaded bytes when the upload was finalized
+                    result.sha256 = self.upload_service.get_session(upload_id).sha256
+                    items.append((result, None, source))
+                    tx.after_commit(lambda upload_id=upload_id: self.upload_service.release(upload_id))
+            except (ObsidianSyncException, OSError) as e:
+                result.error = str(e)
+        
+        async def upload_all():
+            return await asyncio.gather(*(
+                storage.replace(result.key, data) if source is None else storage.put_file(result.key, source)
+                for result, data, source in items
+            ), return_exceptions=True)
+        
+        try:
+            outcomes = storage.blocking(upload_all())
+        except Exception as e:
+            raise FileOperationError(f"Failed to store attachments of {post_id}: {e}")
+        for (result, _, _), outcome in zip(items, outcomes):
+            if isinstance(outcome, BaseException):
+                result.error = str(outcome) or type(outcome).__name__
+        return results
     
-    def delete_attachments(self, post_id: str) -> None:
+    def stage_attachment_deletion(self, tx: Transaction, post_id: str, keys: Optional[List[str]] = None) -> None:
         """
-        Delete all attachments for a post.
+        Delete all attachments of a post when the transaction commits.
+
+        With remote storage ``keys`` are the attachments known for the post
+        (from the change log manifest).
+        """
+        if self.media_storage.is_local:
+            for attachment_dir in self.get_attachment_dirs(post_id):
+                tx.delete_tree(attachment_dir)
+        else:
+            tx.after_commit(lambda: self.delete_attachments(post_id, keys))
+    
+    def get_attachment_dirs(self, post_id: str) -> List[Path]:
+        """
+        Get all local attachment directories (one per extension) of a post.
         """
         media_dir = self.static_root / "media"
         if not media_dir.exists():
+            return []
+        
+        return [
+            ext_dir / post_id
+            for ext_dir in media_dir.iterdir()
+            if ext_dir.is_dir() and (ext_dir / post_id).is_dir()
+        ]
+    
+    def delete_attachments(self, post_id: str, keys: Optional[List[str]] = None) -> None:
+        """
+        Delete all attachments for a post.
+
+        Remote storage cannot be listed by post, so only the media/{ext}/{postId}/
+        prefixes of the extensions in ``keys`` are listed; that also catches
+        objects of those extensions missing from the manifest.
+        """
+        if self.media_storage.is_local:
+            for post_dir in self.get_attachment_dirs(post_id):
+                delete_directory(post_dir)
             return
-            
-        for ext_dir in media_dir.iterdir():
-            if ext_dir.is_dir():
-                post_dir = ext_dir / post_id
-                if post_dir.exists() and post_dir.is_dir():
-                    delete_directory(post_dir)
+        
+        storage = self.media_storage
+        
+        known = set(keys or [])
+        prefixes = sorted({f"media/{key.split('/')[1]}/{post_id}/" for key in known if key.count("/") >= 2})
+        
+        async def delete_all():
+            listings = await asyncio.gather(*(storage.list(prefix) for prefix in prefixes))
+            targets = known.union(obj.key for objects in listings for obj in objects)
+            await asyncio.gather(*(storage.delete(key) for key in targets))
+            return len(targets)
+        
+        try:
+            deleted = storage.blocking(delete_all())
+            logger.info(f"Deleted {deleted} remote attachments of {post_id}")
+        except Exception as e:
+            logger.error(f"Failed to delete remote attachments of {post_id}: {e}")
     
-    def process_obsidian_image_syntax(self, content: str, attachment_map: Dict[str, str]) -> str:
+    def get_attachment_key(self, att_path: str) -> str:
         """
-        Replace Obsidian image syntax with markdown image syntax.
+        Validate a stored attachment path (media/{ext}/{postId}/...) and return its storage key.
         """
-        def replace_obsidian_img(match):
-            fname = match.group(1)
-            path = attachment_map.get(fname)
-            if path:
-                return f"![]({path})"
-            else:
-                return match.group(0)
+        normalized_path = att_path.lower()
+        if not validate_attachment_path_format(normalized_path) or ".." in normalized_path.split("/"):
+            raise InvalidAttachmentPathError(att_path)
+        return normalized_path
+    
+    def get_attachment_file(self, att_path: str) -> Path:
+        """
+        Resolve a stored attachment path (media/{ext}/{postId}/...) to its local file.
+        """
+        key = self.get_attachment_key(att_path)
+        
+        media_dir = (self.static_root / "media").resolve()
+        full_path = (self.static_root / key).resolve()
+        
+        # Reject anything escaping the media directory (e.g. ".." segments)
+        if not full_path.is_relative_to(media_dir):
+            raise InvalidAttachmentPathError(att_path)
+        
+        if not full_path.is_file():
+            raise AttachmentNotFoundError(att_path)
         
-        return re.sub(r"!\[\[([^\]]+)\]\]", replace_obsidian_img, content) 
\ No newline at end of file
+        return full_path
@@ -0,0 +1,210 @@
+"""
+Bulk category operations.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import CategoryNotFoundError, CategoryJobNotFoundError, InvalidCategoryNameError
+from ..utils.concurrency import ReadWriteLock
+from ..utils.frontmatter import replace_frontmatter_field
+from ..utils.path_utils import get_category_directory_name
+from .change_log import ChangeLog
+from .link_rewriter import LinkRewriter, post_url
+from .post_catalog import PostCatalog
+from .search_service import SearchIndex
+from .write_journal import Transaction, WriteJournal
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class CategoryJob:
+    """Progress of a bulk category rename/merge."""
+    job_id: str
+    source: str
+    target: str
+    status: str = JOB_PENDING
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    merged: bool = False
+    errors: List[str] = field(default_factory=list)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class CategoryService:
+    """Service for renaming and merging categories across many posts."""
+
+    def __init__(
+        self,
+        vault_lock: ReadWriteLock,
+        catalog: PostCatalog,
+        search_index: SearchIndex,
+        change_log: ChangeLog,
+        journal: WriteJournal,
+        link_rewriter: Optional[LinkRewriter] = None
+    ):
+        self.content_root = settings.content_root
+        self.vault_lock = vault_lock
+        self.catalog = catalog
+        self.search_index = search_index
+        self.change_log = change_log
+        self.journal = journal
+        self.link_rewriter = link_rewriter or LinkRewriter(vault_lock, catalog, change_log, journal)
+        self._jobs: Dict[str, CategoryJob] = {}
+        self._progress_lock = threading.Lock()
+
+    def get_job(self, job_id: str) -> CategoryJob:
+        """Get a job by ID."""
+        job = self._jobs.get(job_id)
+        if not job:
+            raise CategoryJobNotFoundError(job_id)
+        return job
+
+    def start_rename(self, source: str, target: str) -> CategoryJob:
+        """
+        Rename ``source`` to ``target`` (merging if target already exists).
+
+        Runs in a background thread; poll get_job() for progress.
+        """
+        source_dir = self._category_dir(source)
+        self._category_dir(target)
+        if not source_dir.is_dir():
+            raise CategoryNotFoundError(source)
+
+        job = CategoryJob(job_id=uuid.uuid4().hex, source=source, target=target)
+        self._prune_jobs()
+        self._jobs[job.job_id] = job
+        threading.Thread(target=self._run, args=(job,), name=f"category-{job.job_id[:8]}", daemon=True).start()
+        return job
+
+    def _category_dir(self, name: str) -> Path:
+        """Directory of a category; rejects names that would leave content_root."""
+        dirname = get_category_directory_name(name)
+        if (
+            not name.strip()
+            or "/" in dirname
+            or "\\" in dirname
+            or dirname.startswith(".")
+        ):
+            raise InvalidCategoryNameError(name)
+        category_dir = self.content_root / dirname
+        if category_dir.resolve().parent != self.content_root.resolve():
+            raise InvalidCategoryNameError(name)
+        return category_dir
+
+    def _prune_jobs(self) -> None:
+        cutoff = time.time() - settings.category_job_retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def _run(self, job: CategoryJob) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            self._move_and_rewrite(job)
+            job.status = JOB_COMPLETED if not job.failed else JOB_FAILED
+        except Exception as e:
+            logger.error(f"[category] Job {job.job_id} failed: {e}")
+            job.errors.append(str(e))
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            logger.info(
+                f"[category] Job {job.job_id} {job.source} -> {job.target}: "
+                f"{job.done}/{job.total} done, {job.failed} failed in {job.finished_at - job.started_at:.2f}s"
+            )
+
+    def _move_and_rewrite(self, job: CategoryJob) -> None:
+        """
+        Move posts to the target directory with their categories field rewritten.
+
+        Posts are processed in journaled batches: each rewritten file is
+        staged in the target directory and the old file deleted in the same
+        transaction, so after a crash every post is either untouched or
+        fully moved and rewritten. The vault lock is held exclusively per
+        batch, not per job, so upserts and progress polls are served between
+        batches; the source directory is listed again for every batch, which
+        also picks up posts upserted into it meanwhile. Once all posts have
+        moved, links to them in other posts are rewritten to the new URLs.
+        """
+        source_dir = self._category_dir(job.source)
+        target_dir = self._category_dir(job.target)
+        job.merged = source_dir != target_dir and target_dir.exists()
+
+        batch_size = settings.category_batch_size
+        attempted: Set[Path] = set()
+        moved_urls: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=settings.category_rewrite_workers) as executor:
+            while True:
+                # Exclusive: a concurrent upsert of an affected post could otherwise
+                # be overwritten by the frontmatter rewrite below
+                with self.vault_lock.exclusive():
+                    remaining = [path for path in sorted(source_dir.glob("*.md")) if path not in attempted]
+                    job.total = len(attempted) + len(remaining)
+                    if not remaining:
+                        break
+                    batch = remaining[:batch_size]
+                    attempted.update(batch)
+                    with self.journal.transaction() as tx:
+                        moves = [
+                            move for move in executor.map(lambda path: self._stage_post(tx, job, path, target_dir), batch)
+                            if move is not None
+                        ]
+                    # Indexes are updated while still exclusive, so the vault
+                    # watcher sees them already current
+                    self._update_indexes(job, moves)
+                    moved_urls.update(
+                        (post_url(old.parent.name, old.stem), post_url(new.parent.name, new.stem))
+                        for old, new in moves
+                    )
+
+        if source_dir != target_dir:
+            with self.vault_lock.exclusive():
+                try:
+                    source_dir.rmdir()
+                except OSError:
+                    logger.warning(f"[category] Source directory {source_dir} not empty after move, keeping it")
+        self.link_rewriter.rewrite(moved_urls)
+
+    def _stage_post(self, tx: Transaction, job: CategoryJob, path: Path, target_dir: Path) -> Optional[Tuple[Path, Path]]:
+        """Stage one post's move and rewrite; returns (old, new) or None if it failed."""
+        new_path = target_dir / path.name
+        try:
+            text = path.read_text(encoding="utf-8")
+            tx.write(new_path, replace_frontmatter_field(text, "categories", job.target).encode("utf-8"))
+            if new_path != path:
+                tx.delete(path)
+        except Exception as e:
+            with self._progress_lock:
+                job.failed += 1
+                job.errors.append(f"{path.name}: {e}")
+            return None
+        with self._progress_lock:
+            job.done += 1
+        return path, new_path
+
+    def _update_indexes(self, job: CategoryJob, moves: List[Tuple[Path, Path]]) -> None:
+        category = get_category_directory_name(job.target)
+        for old_path, new_path in moves:
+            post_id = new_path.stem
+            entry = self.catalog.get(post_id)
+            self.catalog.update(post_id, entry.title if entry else post_id, category)
+            self.search_index.set_category(post_id, category)
+            if old_path != new_path:
+                self.change_log.record_post_move(post_id, old_path, new_path)
+            else:
+                self.change_log.record_post_write(post_id, new_path)
@@ -0,0 +1,358 @@
+"""
+Change log service.
+
+Every write made by the service is recorded as an entry with a monotonically
+increasing sequence number, so devices can ask for "everything after cursor
+N" instead of resyncing the whole vault. The log is an append-only JSONL file
+under data_root that is compacted by keeping only the latest entry for each
+path; delete tombstones are kept for a retention period, after which cursors
+older than the dropped tombstones must re-bootstrap from the manifest.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import CursorExpiredError
+from ..utils.file_utils import ensure_directory_exists, hash_file
+
+LOG_FILENAME = "changes.log"
+
+KIND_POST = "post"
+KIND_ATTACHMENT = "attachment"
+
+OP_ADD = "add"
+OP_MODIFY = "modify"
+OP_MOVE = "move"
+OP_DELETE = "delete"
+
+
+@dataclass
+class ChangeEntry:
+    """A single change to a vault file."""
+    seq: int
+    ts: float
+    kind: str
+    op: str
+    postId: str
+    path: str
+    hash: Optional[str] = None
+    size: Optional[int] = None
+    oldPath: Optional[str] = None
+
+
+class ChangeLog:
+    """Persistent, compactable change log plus the current vault manifest."""
+
+    def __init__(self, log_dir: Optional[Path] = None):
+        self.log_dir = log_dir or settings.data_root / "changes"
+        self.content_root = settings.content_root
+        self.static_root = settings.static_root
+        self.compact_threshold = settings.changes_compact_threshold
+        self.tombstone_retention = settings.changes_tombstone_retention
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._entries: List[ChangeEntry] = []
+        self._manifest: Dict[str, ChangeEntry] = {}
+        self._seq = 0
+        self._floor = 0  # cursors below this have missed dropped tombstones
+        self._compacted_size = 0  # entries in the log after the last compaction or load
+
+    @property
+    def log_path(self) -> Path:
+        return self.log_dir / LOG_FILENAME
+
+    # ------------------------------------------------------------------
+    # Path helpers
+    # ------------------------------------------------------------------
+
+    def relative_path(self, file_path: Path) -> str:
+        """Map an absolute vault path to its namespaced manifest path."""
+        if file_path.is_relative_to(self.content_root):
+            return f"content/{file_path.relative_to(self.content_root).as_posix()}"
+        return f"static/{file_path.relative_to(self.static_root).as_posix()}"
+
+    def absolute_path(self, rel_path: str) -> Path:
+        """Map a manifest path back to the file on disk."""
+        prefix, _, rest = rel_path.partition("/")
+        root = self.content_root if prefix == "content" else self.static_root
+        return root / rest
+
+    # ------------------------------------------------------------------
+    # Loading and persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.log_path.exists():
+                self._load()
+            else:
+                self._bootstrap()
+            self._compacted_size = len(self._entries)
+            self._loaded = True
+
+    def _load(self) -> None:
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("[changes] Ignoring truncated log entry")
+                    break
+                if "floor" in record:
+                    self._floor = record["floor"]
+                    self._seq = max(self._seq, record.get("seq", 0))
+                    continue
+                self._apply(ChangeEntry(**record))
+        logger.info(f"[changes] Loaded change log at seq {self._seq} ({len(self._manifest)} files)")
+
+    def _bootstrap(self) -> None:
+        """Seed the log with an add entry for every file already in the vault."""
+        roots = [(KIND_POST, self.content_root), (KIND_ATTACHMENT, self.static_root / "media")]
+        for kind, root in roots:
+            if not root.exists():
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                for filename in sorted(filenames):
+                    if filename.startswith("."):
+                        continue
+                    file_path = Path(dirpath) / filename
+                    post_id = file_path.stem if kind == KIND_POST else file_path.parent.name
+                    self._record(kind, OP_ADD, post_id, file_path, persist=False)
+        self._rewrite_log()
+        logger.info(f"[changes] Bootstrapped change log with {len(self._manifest)} files")
+
+    def _apply(self, entry: ChangeEntry) -> None:
+        self._seq = max(self._seq, entry.seq)
+        self._entries.append(entry)
+        if entry.op == OP_MOVE and entry.oldPath:
+            self._manifest.pop(entry.oldPath, None)
+        if entry.op == OP_DELETE:
+            self._manifest.pop(entry.path, None)
+        else:
+            self._manifest[entry.path] = entry
+
+    def _append_to_log(self, entry: ChangeEntry) -> None:
+        ensure_directory_exists(self.log_dir)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+
+    def _rewrite_log(self) -> None:
+        ensure_directory_exists(self.log_dir)
+        tmp_path = self.log_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"floor": self._floor, "seq": self._seq}) + "\n")
+            for entry in self._entries:
+                f.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.log_path)
+
+    def compact(self) -> None:
+        """Drop superseded entries and expired delete tombstones."""
+        with self._lock:
+            latest: Dict[str, ChangeEntry] = {}
+            moves: Dict[int, ChangeEntry] = {}
+            for entry in self._entries:
+                if entry.op == OP_MOVE and entry.oldPath:
+                    # If the move itself is superseded later, devices still
+                    # need to learn that the old path is gone
+                    moves[entry.seq] = entry
+                    latest[entry.oldPath] = replace(
+                        entry, op=OP_DELETE, path=entry.oldPath, oldPath=None, hash=None, size=None
+                    )
+                latest[entry.path] = entry
+            for path, entry in list(latest.items()):
+                move = moves.get(entry.seq)
+                if move and entry.op == OP_DELETE and latest.get(move.path) is move:
+                    del latest[path]
+            cutoff = time.time() - self.tombstone_retention
+            kept = []
+            for entry in sorted(latest.values(), key=lambda e: e.seq):
+                if entry.op == OP_DELETE and entry.ts < cutoff:
+                    self._floor = max(self._floor, entry.seq)
+                    continue
+                kept.append(entry)
+            before = len(self._entries)
+            self._entries = kept
+            self._compacted_size = len(kept)
+            self._rewrite_log()
+            logger.info(f"[changes] Compacted change log {before} -> {len(kept)} entries (floor {self._floor})")
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _record(
+        self,
+        kind: str,
+        op: str,
+        post_id: str,
+        file_path: Path,
+        old_path: Optional[Path] = None,
+        persist: bool = True,
+        file_hash: Optional[str] = None,
+        size: Optional[int] = None
+    ) -> Optional[ChangeEntry]:
+        rel_path = self.relative_path(file_path)
+        if op != OP_DELETE:
+            # Remote attachments have no local file, their hash comes with the call
+            if file_hash is None:
+                try:
+                    file_hash, size = hash_file(file_path)
+                except OSError as e:
+                    logger.warning(f"[changes] Cannot hash {file_path}: {e}")
+                    return None
+            previous = self._manifest.get(rel_path)
+            if (
+                op == OP_MOVE and previous is not None and previous.hash == file_hash
+                and self.relative_path(old_path) not in self._manifest
+            ):
+                return None  # Move already recorded (e.g. by the vault watcher)
+            if op == OP_MODIFY and previous is None:
+                op = OP_ADD
+            elif op in (OP_ADD, OP_MODIFY) and previous is not None:
+                if previous.hash == file_hash:
+                    return None  # Content unchanged, nothing for devices to fetch
+                op = OP_MODIFY
+        elif rel_path not in self._manifest:
+            return None
+
+        entry = ChangeEntry(
+            seq=self._seq + 1,
+            ts=time.time(),
+            kind=kind,
+            op=op,
+            postId=post_id,
+            path=rel_path,
+            hash=file_hash,
+            size=size,
+            oldPath=self.relative_path(old_path) if old_path else None,
+        )
+        self._apply(entry)
+        if persist:
+            self._append_to_log(entry)
+            # Compaction keeps an entry per live file, so trigger on growth since the
+            # last one (at least the compacted size, keeping rewrites amortized O(1))
+            appended = len(self._entries) - self._compacted_size
+            if appended >= max(self.compact_threshold, self._compacted_size):
+                self.compact()
+        return entry
+
+    def record_post_write(self, post_id: str, file_path: Path) -> None:
+        """Record a created or updated post file."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_POST, OP_MODIFY, post_id, file_path)
+
+    def record_post_move(self, post_id: str, old_path: Path, new_path: Path) -> None:
+        """Record a post moved to another category directory."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_POST, OP_MOVE, post_id, new_path, old_path=old_path)
+
+    def record_post_delete(self, post_id: str, file_path: Path) -> None:
+        """Record a deleted post file."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_POST, OP_DELETE, post_id, file_path)
+
+    def record_attachment_write(self, post_id: str, file_path: Path) -> None:
+        """Record a created or updated attachment file."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_ATTACHMENT, OP_MODIFY, post_id, file_path)
+
+    def record_attachment_stored(self, post_id: str, key: str, file_hash: str, size: int) -> None:
+        """Record an attachment written to remote media storage (by key, with its known hash)."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_ATTACHMENT, OP_MODIFY, post_id, self.static_root / key, file_hash=file_hash, size=size)
+
+    def record_attachment_delete(self, post_id: str, file_path: Path) -> None:
+        """Record a single deleted attachment file."""
+        self._ensure_loaded()
+        with self._lock:
+            self._record(KIND_ATTACHMENT, OP_DELETE, post_id, file_path)
+
+    def record_attachments_deleted(self, post_id: str) -> None:
+        """Record deletion of every attachment belonging to a post."""
+        self._ensure_loaded()
+        with self._lock:
+            paths = [
+                entry.path for entry in self._manifest.values()
+                if entry.kind == KIND_ATTACHMENT and entry.postId == post_id
+            ]
+            for rel_path in paths:
+                self._record(KIND_ATTACHMENT, OP_DELETE, post_id, self.absolute_path(rel_path))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the latest change."""
+        self._ensure_loaded()
+        return self._seq
+
+    def changes_since(self, since: int, limit: int) -> Tuple[List[ChangeEntry], int, bool]:
+        """
+        Get changes after ``since``.
+
+        Returns (entries, next_cursor, has_more). Raises CursorExpiredError when
+        compaction has dropped changes the caller has not seen.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if since < self._floor:
+                raise CursorExpiredError(f"Cursor {since} is older than the change log floor {self._floor}")
+            # Entries are ordered by seq, binary search for the first unseen one
+            lo, hi = 0, len(self._entries)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._entries[mid].seq <= since:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            page = self._entries[lo:lo + limit]
+            has_more = lo + limit < len(self._entries)
+            next_cursor = page[-1].seq if page else max(since, self._seq)
+            return page, next_cursor, has_more
+
+    def known_hash(self, file_path: Path) -> Optional[str]:
+        """Content hash the log currently has for a vault file (None if unknown)."""
+        self._ensure_loaded()
+        entry = self._manifest.get(self.relative_path(file_path))
+        return entry.hash if entry else None
+
+    def attachment_keys(self, post_id: str) -> List[str]:
+        """Storage keys (media/...) of every attachment the log knows of for a post."""
+        self._ensure_loaded()
+        with self._lock:
+            return [
+                entry.path.partition("/")[2] for entry in self._manifest.values()
+                if entry.kind == KIND_ATTACHMENT and entry.postId == post_id
+            ]
+
+    def known_paths_under(self, directory: Path) -> List[Path]:
+        """Every file the log knows of below a vault directory."""
+        self._ensure_loaded()
+        prefix = self.relative_path(directory).rstrip("/") + "/"
+        with self._lock:
+            return [self.absolute_path(path) for path in self._manifest if path.startswith(prefix)]
+
+    def manifest(self) -> Tuple[List[ChangeEntry], int]:
+        """Get every file currently in the vault and the cursor it is valid at."""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._manifest.values(), key=lambda e: e.path), self._seq
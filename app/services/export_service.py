@@ -0,0 +1,301 @@
+"""
+Vault export service.
+
+An export first takes a point-in-time snapshot of content_root and
+static_root/media by hard-linking every file into a private directory under
+data_root. Hard links cannot cross filesystems, so data_root has to live on
+the same filesystem as both roots (as in the default /app layout); when it
+does not, exports fail with an error instead of copying the vault.
+
+The vault lock is held exclusively only while the roots are walked and
+stat'ed. Linking happens afterwards without the lock. Because all writes go
+through atomic replace, a file replaced in between shows up as a link whose
+inode no longer matches the scan. In that case the lock is taken once more,
+the roots are re-scanned, and only the changed, added and removed files are
+fixed up, so the snapshot still reflects a single point in time. The
+archive is then streamed from the snapshot in fixed-size chunks without
+holding the lock.
+"""
+
+import json
+import os
+import tarfile
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import UnsupportedCompressionError, FileOperationError
+from ..utils.concurrency import ReadWriteLock
+from ..utils.file_utils import delete_directory, ensure_directory_exists
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+TAR_BLOCK_SIZE = 512
+MANIFEST_NAME = ".export-manifest.json"
+
+COMPRESSION_MEDIA_TYPES = {
+    "none": ("application/x-tar", ".tar"),
+    "gzip": ("application/gzip", ".tar.gz"),
+    "zstd": ("application/zstd", ".tar.zst"),
+}
+
+
+@dataclass
+class SnapshotEntry:
+    """A file captured in an export snapshot."""
+    arcname: str
+    path: Optional[Path]  # None when excluded by an incremental export
+    size: int
+    mtime: float
+
+
+@dataclass
+class ExportSnapshot:
+    """Point-in-time view of the vault backing one export."""
+    snapshot_id: str
+    directory: Path
+    cursor: float
+    since: Optional[float]
+    entries: List[SnapshotEntry] = field(default_factory=list)
+
+    @property
+    def included(self) -> List[SnapshotEntry]:
+        return [entry for entry in self.entries if entry.path is not None]
+
+    def cleanup(self) -> None:
+        delete_directory(self.directory)
+
+
+def _create_compressor(compression: str):
+    if compression == "none":
+        return None
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        if zstandard is None:
+            raise UnsupportedCompressionError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    raise UnsupportedCompressionError(f"Unsupported compression: {compression}")
+
+
+class ExportService:
+    """Service for streaming vault exports."""
+
+    def __init__(self, vault_lock: ReadWriteLock):
+        self.vault_lock = vault_lock
+        self.content_root = settings.content_root
+        self.media_root = settings.static_root / "media"
+        self.chunk_size = settings.export_chunk_size
+        self._link_failure_logged = False
+
+    def _sources(self) -> List[Tuple[str, Path]]:
+        """(archive prefix, root)"""
+        return [("content", self.content_root), ("static/media", self.media_root)]
+
+    @property
+    def snapshot_root(self) -> Path:
+        return settings.data_root / "snapshots"
+
+    def cleanup_stale_snapshots(self) -> None:
+        """Remove snapshot directories left behind by interrupted exports."""
+        if not self.snapshot_root.exists():
+            return
+        cutoff = time.time() - settings.export_snapshot_max_age
+        for snapshot_dir in self.snapshot_root.iterdir():
+            if snapshot_dir.is_dir() and snapshot_dir.stat().st_mtime < cutoff:
+                logger.info(f"[export] Removing stale snapshot {snapshot_dir}")
+                delete_directory(snapshot_dir)
+
+    def _link(self, source: Path, target: Path) -> None:
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            # Deleted since the scan, handled by the caller
+            raise
+        except OSError as e:
+            if not self._link_failure_logged:
+                self._link_failure_logged = True
+                logger.error(
+                    f"[export] Cannot hard-link {source} into {self.snapshot_root} "
+                    f"(data_root must be on the same filesystem as the vault), exports are unavailable: {e}"
+                )
+            raise FileOperationError(f"Cannot snapshot {source}: {e}")
+
+    def create_snapshot(self, since: Optional[float] = None, compression: str = "none") -> ExportSnapshot:
+        """
+        Capture a consistent snapshot of the vault.
+
+        With ``since`` only files modified after that timestamp are included
+        in the archive; the manifest still lists every file so deletions can
+        be detected. The returned cursor can be passed as ``since`` next time.
+        """
+        # Fail fast before doing any work for an unusable compression
+        _create_compressor(compression)
+        self.cleanup_stale_snapshots()
+
+        snapshot_id = uuid.uuid4().hex
+        snapshot = ExportSnapshot(
+            snapshot_id=snapshot_id,
+            directory=self.snapshot_root / snapshot_id,
+            cursor=0.0,
+            since=since
+        )
+        try:
+            self._capture(snapshot)
+        except Exception:
+            snapshot.cleanup()
+            raise
+
+        logger.info(
+            f"[export] Snapshot {snapshot_id}: {len(snapshot.included)}/{len(snapshot.entries)} files"
+        )
+        return snapshot
+
+    def _scan(self) -> Dict[str, Tuple[Path, os.stat_result]]:
+        """Stat every exported file, keyed by archive name."""
+        files: Dict[str, Tuple[Path, os.stat_result]] = {}
+        for prefix, root in self._sources():
+            if not root.exists():
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                for filename in sorted(filenames):
+                    # Skip hidden and in-flight temporary files
+                    if filename.startswith("."):
+                        continue
+                    source = Path(dirpath) / filename
+                    try:
+                        stat = source.stat()
+                    except FileNotFoundError:
+                        continue
+                    files[f"{prefix}/{source.relative_to(root).as_posix()}"] = (source, stat)
+        return files
+
+    def _sync_links(
+        self,
+        snapshot: ExportSnapshot,
+        scanned: Dict[str, Tuple[Path, os.stat_result]],
+        linked: Dict[str, Tuple[int, int, int]],
+    ) -> bool:
+        """
+        Make the snapshot directory match ``scanned``.
+
+        ``linked`` maps archive names to the (inode, mtime, size) of the file
+        each link points at and is updated in place. Returns False when some
+        file changed or disappeared after it was scanned.
+        """
+        consistent = True
+        for arcname in [name for name in linked if name not in scanned]:
+            (snapshot.directory / arcname).unlink(missing_ok=True)
+            del linked[arcname]
+
+        for arcname, (source, stat) in scanned.items():
+            if snapshot.since is not None and stat.st_mtime <= snapshot.since:
+                continue
+            expected = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if linked.get(arcname) == expected:
+                continue
+            target = snapshot.directory / arcname
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.unlink(missing_ok=True)
+            linked.pop(arcname, None)
+            try:
+                self._link(source, target)
+            except FileNotFoundError:
+                consistent = False
+                continue
+            current = target.stat()
+            linked[arcname] = (current.st_ino, current.st_mtime_ns, current.st_size)
+            if linked[arcname] != expected:
+                consistent = False
+        return consistent
+
+    def _capture(self, snapshot: ExportSnapshot) -> None:
+        ensure_directory_exists(snapshot.directory)
+        with self.vault_lock.exclusive():
+            snapshot.cursor = time.time()
+            scanned = self._scan()
+
+        linked: Dict[str, Tuple[int, int, int]] = {}
+        if not self._sync_links(snapshot, scanned, linked):
+            # Writes landed while linking; fix up just those files under the lock
+            with self.vault_lock.exclusive():
+                snapshot.cursor = time.time()
+                scanned = self._scan()
+                self._sync_links(snapshot, scanned, linked)
+
+        since = snapshot.since
+        for arcname, (_, stat) in scanned.items():
+            included = since is None or stat.st_mtime > since
+            snapshot.entries.append(SnapshotEntry(
+                arcname=arcname,
+                path=snapshot.directory / arcname if included else None,
+                size=stat.st_size,
+                mtime=stat.st_mtime
+            ))
+
+    def _manifest_bytes(self, snapshot: ExportSnapshot) -> bytes:
+        manifest = {
+            "cursor": snapshot.cursor,
+            "since": snapshot.since,
+            "files": [
+                {"path": entry.arcname, "size": entry.size, "mtime": entry.mtime, "included": entry.path is not None}
+                for entry in snapshot.entries
+            ],
+        }
+        return json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+
+    def _tar_header(self, arcname: str, size: int, mtime: float) -> bytes:
+        info = tarfile.TarInfo(name=arcname)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        return info.tobuf(format=tarfile.PAX_FORMAT, encoding="utf-8")
+
+    def _iter_tar(self, snapshot: ExportSnapshot) -> Iterator[bytes]:
+        manifest = self._manifest_bytes(snapshot)
+        yield self._tar_header(MANIFEST_NAME, len(manifest), snapshot.cursor)
+        yield manifest + b"\0" * (-len(manifest) % TAR_BLOCK_SIZE)
+
+        for entry in snapshot.included:
+            with open(entry.path, "rb") as f:
+                # Size from the snapshot file itself, which can no longer change
+                size = os.fstat(f.fileno()).st_size
+                yield self._tar_header(entry.arcname, size, entry.mtime)
+                remaining = size
+                while remaining > 0:
+                    chunk = f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+            padding = -size % TAR_BLOCK_SIZE
+            if padding:
+                yield b"\0" * padding
+
+        # End-of-archive marker
+        yield b"\0" * (TAR_BLOCK_SIZE * 2)
+
+    def stream_archive(self, snapshot: ExportSnapshot, compression: str = "none") -> Iterator[bytes]:
+        """Stream the snapshot as a (optionally compressed) tar; removes the snapshot afterwards."""
+        try:
+            compressor = _create_compressor(compression)
+            for chunk in self._iter_tar(snapshot):
+                if compressor is None:
+                    yield chunk
+                    continue
+                compressed = compressor.compress(chunk)
+                if compressed:
+                    yield compressed
+            if compressor is not None:
+                yield compressor.flush()
+        finally:
+            snapshot.cleanup()
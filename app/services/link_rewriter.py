@@ -0,0 +1,126 @@
+"""
+Rewriting of links to posts that changed category.
+
+Wikilinks are resolved to published URLs when a post is rendered, and the
+URL contains the post's category (see ``post_url_template``). When a post
+moves to another category, the posts linking to it are re-rendered so their
+links follow it.
+
+The vault is searched for the old URLs without holding the vault lock. Only
+the posts that contain one are then re-read and rewritten in one journaled
+transaction while holding the lock exclusively, so a concurrent upsert of a
+referring post is never overwritten.
+"""
+
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from ..config import settings
+from ..utils.concurrency import ReadWriteLock
+from ..utils.frontmatter import split_frontmatter
+from ..utils.markdown_utils import render_obsidian_markdown
+from .change_log import ChangeLog
+from .post_catalog import PostCatalog
+from .post_source_store import PostSourceStore, content_hash
+from .write_journal import Transaction, WriteJournal
+
+# Target of a rendered markdown link, with an optional heading anchor
+_LINK_TARGET_PATTERN = re.compile(r"\]\(([^()\s#]+)(#[^()\s]*)?\)")
+
+
+def post_url(category: str, post_id: str) -> str:
+    """Published URL of a post in a category directory."""
+    return settings.post_url_template.format(category=category, post_id=post_id)
+
+
+class LinkRewriter:
+    """Re-renders posts whose links point at the old URL of a moved post."""
+
+    def __init__(
+        self,
+        vault_lock: ReadWriteLock,
+        catalog: PostCatalog,
+        change_log: ChangeLog,
+        journal: WriteJournal,
+        sources: Optional[PostSourceStore] = None
+    ):
+        self.content_root = settings.content_root
+        self.vault_lock = vault_lock
+        self.catalog = catalog
+        self.change_log = change_log
+        self.journal = journal
+        self.sources = sources or PostSourceStore()
+        # One rewrite at a time, off the request that moved the post
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="link-rewriter")
+
+    def schedule(self, moved: Dict[str, str]) -> Future:
+        """Rewrite links in the background; ``moved`` maps old URLs to new ones."""
+        return self._executor.submit(self.rewrite, moved)
+
+    def rewrite(self, moved: Dict[str, str]) -> int:
+        """Rewrite links to the old URLs in ``moved``; returns the number of posts rewritten."""
+        moved = {old: new for old, new in moved.items() if old != new}
+        if not moved:
+            return 0
+        candidates = self._find_referring(moved)
+        if not candidates:
+            return 0
+
+        rewritten: List[Path] = []
+        with self.vault_lock.exclusive():
+            with self.journal.transaction() as tx:
+                for path in candidates:
+                    try:
+                        text = path.read_text(encoding="utf-8")
+                    except OSError:
+                        continue  # Deleted or moved since the scan
+                    new_text = self._relink(tx, path.stem, text, moved)
+                    if new_text is None:
+                        continue
+                    tx.write(path, new_text.encode("utf-8"))
+                    rewritten.append(path)
+                tx.after_commit(lambda: self._record(rewritten))
+        logger.info(f"[links] Rewrote links to {len(moved)} moved posts in {len(rewritten)} posts")
+        return len(rewritten)
+
+    def _find_referring(self, moved: Dict[str, str]) -> List[Path]:
+        candidates = []
+        for dirpath, dirnames, filenames in os.walk(self.content_root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.startswith(".") or not filename.endswith(".md"):
+                    continue
+                path = Path(dirpath) / filename
+                try:
+                    text = path.read_text(encoding="utf-8")
+                except OSError:
+                    continue
+                if any(match.group(1) in moved for match in _LINK_TARGET_PATTERN.finditer(text)):
+                    candidates.append(path)
+        return candidates
+
+    def _relink(self, tx: Transaction, post_id: str, text: str, moved: Dict[str, str]) -> Optional[str]:
+        """New text of a post with its links updated, or None if nothing changed."""
+        _, body = split_frontmatter(text)
+        prefix = text[:len(text) - len(body)]
+        source = self.sources.load(post_id)
+        if source is not None and source.rendered_hash == content_hash(body):
+            # Render again from the Obsidian source, as an upsert would
+            new_body = render_obsidian_markdown(source.content, source.attachment_map, self.catalog.resolve_post_url)
+            if new_body != body:
+                # Keeps PATCH working: it checks the file against rendered_hash
+                self.sources.stage(tx, post_id, source.content, source.attachment_map, new_body)
+        else:
+            # No (matching) source: rewrite the link targets themselves
+            new_body = _LINK_TARGET_PATTERN.sub(
+                lambda match: f"]({moved.get(match.group(1), match.group(1))}{match.group(2) or ''})", body
+            )
+        return prefix + new_body if new_body != body else None
+
+    def _record(self, paths: List[Path]) -> None:
+        for path in paths:
+            self.change_log.record_post_write(path.stem, path)
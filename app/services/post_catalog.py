@@ -0,0 +1,128 @@
+"""
+In-memory catalog of published posts.
+"""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from ..config import settings
+from ..utils.frontmatter import parse_frontmatter_header
+from ..utils.path_utils import get_category_from_path
+
+
+@dataclass
+class CatalogEntry:
+    """Catalog entry for a single post."""
+    post_id: str
+    title: str
+    category: str
+
+
+def read_frontmatter_title(file_path: Path) -> Optional[str]:
+    """Read the title field from a post's frontmatter without reading the body."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            if f.readline().strip() != "---":
+                return None
+            header = []
+            for line in f:
+                if line.rstrip("\n").strip() == "---":
+                    break
+                header.append(line.rstrip("\n"))
+    except OSError as e:
+        logger.warning(f"[catalog] Failed to read frontmatter of {file_path}: {e}")
+        return None
+    title = parse_frontmatter_header("\n".join(header)).get("title")
+    return str(title) if title else None
+
+
+class PostCatalog:
+    """
+    Maps post IDs and titles to their location under content_root.
+
+    The catalog is built lazily by scanning content_root once and is then kept
+    current by PostService on every upsert/delete.
+    """
+
+    def __init__(self, content_root: Optional[Path] = None):
+        self.content_root = content_root or settings.content_root
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._by_id: Dict[str, CatalogEntry] = {}
+        self._by_title: Dict[str, str] = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._scan()
+            self._loaded = True
+
+    def _scan(self) -> None:
+        self._by_id.clear()
+        self._by_title.clear()
+        if not self.content_root.exists():
+            return
+        for md_path in self.content_root.glob("*/*.md"):
+            title = read_frontmatter_title(md_path) or md_path.stem
+            category = get_category_from_path(md_path, self.content_root) or ""
+            self._put(CatalogEntry(post_id=md_path.stem, title=title, category=category))
+        logger.info(f"[catalog] Loaded {len(self._by_id)} posts from {self.content_root}")
+
+    def _put(self, entry: CatalogEntry) -> None:
+        previous = self._by_id.get(entry.post_id)
+        if previous and self._by_title.get(previous.title.lower()) == entry.post_id:
+            del self._by_title[previous.title.lower()]
+        self._by_id[entry.post_id] = entry
+        self._by_title[entry.title.lower()] = entry.post_id
+
+    def reload(self) -> None:
+        """Discard cached state and rescan content_root."""
+        with self._lock:
+            self._scan()
+            self._loaded = True
+
+    def update(self, post_id: str, title: str, category: str) -> None:
+        """Record a created or updated post."""
+        self._ensure_loaded()
+        with self._lock:
+            self._put(CatalogEntry(post_id=post_id, title=title, category=category))
+
+    def remove(self, post_id: str) -> None:
+        """Forget a deleted post."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._by_id.pop(post_id, None)
+            if entry and self._by_title.get(entry.title.lower()) == post_id:
+                del self._by_title[entry.title.lower()]
+
+    def get(self, post_id: str) -> Optional[CatalogEntry]:
+        """Get a catalog entry by post ID."""
+        self._ensure_loaded()
+        return self._by_id.get(post_id)
+
+    def find_by_title(self, title: str) -> Optional[CatalogEntry]:
+        """Find a post by its title (case-insensitive), falling back to post ID."""
+        self._ensure_loaded()
+        post_id = self._by_title.get(title.strip().lower())
+        if post_id:
+            return self._by_id.get(post_id)
+        return self._by_id.get(title.strip())
+
+    def entries(self) -> List[CatalogEntry]:
+        """Get a snapshot of all catalog entries."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._by_id.values())
+
+    def resolve_post_url(self, title: str) -> Optional[str]:
+        """Resolve a wikilink target to the published URL of the post."""
+        entry = self.find_by_title(title)
+        if not entry:
+            return None
+        return settings.post_url_template.format(category=entry.category, post_id=entry.post_id)
@@ -3,33 +3,81 @@ Post processing service.
 """
 
 import uuid
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence, Union
 from loguru import logger
 
-from ..schemas.post import PostRequestSchema
+from pydantic import ValidationError
+
+from ..schemas.post import PostRequestSchema, PostPatchSchema
+from ..schemas.post_record import PostRecord
 from ..schemas.responses import PostUpsertResponse, PostDeleteResponse
-from ..exceptions import PostNotFoundError, post_not_found_http_exception
+from ..exceptions import (
+    PostNotFoundError,
+    PatchConflictError,
+    ContentHashMismatchError,
+    ObsidianSyncException,
+    post_not_found_http_exception
+)
 from .file_service import FileService
-from .attachment_service import AttachmentService
+from .attachment_service import AttachmentResult, AttachmentService
+from .post_catalog import PostCatalog
+from .search_service import SearchIndex
+from .change_log import ChangeLog
+from .upload_service import UploadService
+from .write_journal import WriteJournal
+from .post_source_store import PostSourceStore, content_hash
+from .link_rewriter import LinkRewriter, post_url
+from ..storage.base import StorageBackend
+from ..utils.markdown_utils import render_obsidian_markdown
+from ..utils.frontmatter import parse_frontmatter, EXCLUDED_FIELDS
+from ..utils.text_patch import apply_splices, apply_unified_diff
+from ..utils.path_utils import get_category_directory_name
+from ..utils.concurrency import ReadWriteLock
 
 
 class PostService:
     """Service for post processing operations."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        catalog: Optional[PostCatalog] = None,
+        search_index: Optional[SearchIndex] = None,
+        vault_lock: Optional[ReadWriteLock] = None,
+        change_log: Optional[ChangeLog] = None,
+        upload_service: Optional[UploadService] = None,
+        journal: Optional[WriteJournal] = None,
+        media_storage: Optional[StorageBackend] = None,
+        link_rewriter: Optional[LinkRewriter] = None
+    ):
         self.file_service = FileService()
-        self.attachment_service = AttachmentService()
+        self.attachment_service = AttachmentService(upload_service=upload_service, media_storage=media_storage)
+        self.catalog = catalog or PostCatalog()
+        self.search_index = search_index or SearchIndex()
+        self.vault_lock = vault_lock or ReadWriteLock()
+        self.change_log = change_log or ChangeLog()
+        self.journal = journal or WriteJournal()
+        self.sources = PostSourceStore()
+        self.link_rewriter = link_rewriter or LinkRewriter(
+            self.vault_lock, self.catalog, self.change_log, self.journal, self.sources
+        )
     
-    def upsert_post(self, post_data: PostRequestSchema) -> PostUpsertResponse:
+    def upsert_post(self, post_data: PostRecord) -> PostUpsertResponse:
         """
         Create or update a post.
         """
+        # Shared hold: upserts run concurrently, vault snapshots wait for them
+        with self.vault_lock.shared():
+            return self._upsert_post(post_data)
+    
+    def _upsert_post(self, post_data: PostRecord) -> PostUpsertResponse:
         logger.info(f"[upsert] Processing post: {post_data.title}")
         
         # Determine if this is a new post or update
         post_id = post_data.postId
         is_new = not post_id or not str(post_id).strip()
         
+        current_path = None
         if is_new:
             # Generate new post ID
             post_id = str(uuid.uuid4())
@@ -39,67 +87,211 @@ class PostService:
             if not self.file_service.post_exists(post_id):
                 raise post_not_found_http_exception(post_id)
             logger.info(f"[upsert] Updating existing post: {post_id}")
-            
-            # Check if post needs to be moved to different category
             current_path = self.file_service.get_post_path(post_id)
-            new_categories = post_data.categories
-            
-            if current_path and self.file_service.should_move_post(current_path, new_categories):
-                logger.info(f"[upsert] Post {post_id} needs category migration")
-                try:
-                    # Move post to new category directory
-                    new_path = self.file_service.move_post_to_new_category(
-                        post_id, current_path, new_categories
-                    )
-                    logger.info(f"[upsert] Post {post_id} successfully moved to new category")
-                except Exception as e:
-                    logger.error(f"[upsert] Failed to move post {post_id}: {str(e)}")
-                    # Continue with update even if move fails
-        
-        # Convert request data to dict for processing
-        data_dict = post_data.dict()
-        data_dict["postId"] = post_id
+        
+        # Frontmatter fields only: content and attachment payloads are not copied
+        frontmatter_data = post_data.frontmatter()
+        frontmatter_data["postId"] = post_id
         
         # Process attachments
         logger.debug("[upsert] Processing attachments")
-        attachments = data_dict.get("attachments", [])
+        attachments = post_data.attachments
         validated_attachments = self.attachment_service.validate_attachments(attachments)
         logger.debug("[upsert] Validated attachments successfully")
         attachment_map = self.attachment_service.create_attachment_mapping(attachments, post_id)
         logger.debug(f"[upsert] Attachment map successfully created: {attachment_map}")
         
-        # Process content with image syntax conversion
+        # Process content with Obsidian syntax conversion (embeds, wikilinks, anchors)
         logger.debug("[upsert] Processing content")
-        content = data_dict.get("content", "")
-        processed_content = self.attachment_service.process_obsidian_image_syntax(content, attachment_map)
+        content = post_data.content
+        processed_content = render_obsidian_markdown(
+            content, attachment_map, self.catalog.resolve_post_url
+        )
         
-        # Save post content
-        logger.debug("[upsert] Saving post content")
-        self.file_service.save_post_content(
+        # Render post file
+        post_path, md_content = self.file_service.render_post(
             post_id=post_id,
-            frontmatter_data=data_dict,
+            frontmatter_data=frontmatter_data,
             content=processed_content,
-            categories=data_dict.get("categories", "")
+            categories=post_data.categories
         )
         
-        # Save attachments
-        logger.debug("[upsert] Saving attachments")
-        self.attachment_service.save_attachments(validated_attachments, post_id)
+        # Check if post needs to be moved to different category
+        moved = bool(current_path) and self.file_service.should_move_post(current_path, post_data.categories)
+        if moved:
+            logger.info(f"[upsert] Post {post_id} needs category migration")
+        
+        # Post file, old path and attachments are committed as one journaled transaction
+        logger.debug("[upsert] Saving post content and attachments")
+        with self.journal.transaction() as tx:
+            tx.write(post_path, md_content.encode("utf-8"))
+            if moved:
+                tx.delete(current_path)
+            saved_attachments = self.attachment_service.stage_attachments(tx, validated_attachments, post_id)
+            source = self.sources.stage(tx, post_id, content, attachment_map, processed_content)
+            tx.after_commit(lambda: self._record_write(
+                post_id, post_path, current_path if moved else None, saved_attachments
+            ))
+        
+        # Keep title lookup and search index current (only this post is re-tokenized)
+        self._update_indexes(post_id, post_data, processed_content)
+        if moved:
+            self._relink_moved(post_id, current_path, post_path)
         
         logger.info(f"[upsert] Successfully processed post: {post_id}")
-        return PostUpsertResponse(postId=post_id, status="success")
+        return PostUpsertResponse(postId=post_id, status="success", contentHash=source.content_hash)
+    
+    def _record_write(
+        self,
+        post_id: str,
+        post_path: Path,
+        old_path: Optional[Path] = None,
+        attachments: Sequence[AttachmentResult] = ()
+    ) -> None:
+        """
+        Record a committed write for the sync feed.
+
+        Runs as an after-commit hook, while the journal still lists the paths
+        as pending, so the vault watcher leaves them to us.
+        """
+        if old_path:
+            self.change_log.record_post_move(post_id, old_path, post_path)
+        self.change_log.record_post_write(post_id, post_path)
+        for attachment in attachments:
+            if attachment.target:
+                self.change_log.record_attachment_write(post_id, attachment.target)
+            elif attachment.sha256:
+                self.change_log.record_attachment_stored(post_id, attachment.key, attachment.sha256, attachment.size)
+    
+    def _record_delete(self, post_id: str, post_path: Optional[Path]) -> None:
+        """Record a committed delete for the sync feed (after-commit hook, see _record_write)."""
+        if post_path:
+            self.change_log.record_post_delete(post_id, post_path)
+        self.change_log.record_attachments_deleted(post_id)
+    
+    def _relink_moved(self, post_id: str, old_path: Path, new_path: Path) -> None:
+        """Have posts linking to a post that changed category follow it (in the background)."""
+        self.link_rewriter.schedule({
+            post_url(old_path.parent.name, post_id): post_url(new_path.parent.name, post_id)
+        })
+    
+    def _update_indexes(self, post_id: str, post_data: Union[PostRecord, PostRequestSchema], body: str) -> None:
+        category = get_category_directory_name(post_data.categories or "")
+        self.catalog.update(post_id, post_data.title, category)
+        if post_data.draft or post_data.searchHidden:
+            self.search_index.remove_post(post_id)
+        else:
+            self.search_index.index_post(
+                post_id=post_id,
+                title=post_data.title,
+                category=category,
+                tags=post_data.tags or [],
+                body=body
+            )
+    
+    def patch_post(self, post_id: str, patch: PostPatchSchema) -> PostUpsertResponse:
+        """
+        Apply frontmatter changes and/or a content delta to an existing post.
+        """
+        with self.vault_lock.shared():
+            return self._patch_post(post_id, patch)
+    
+    def _patch_post(self, post_id: str, patch: PostPatchSchema) -> PostUpsertResponse:
+        logger.info(f"[patch] Patching post: {post_id}")
+        
+        current_path = self.file_service.get_post_path(post_id) if "/" not in post_id else None
+        if not current_path:
+            raise post_not_found_http_exception(post_id)
+        fields, body = parse_frontmatter(current_path.read_text(encoding="utf-8"))
+        source = self.sources.load(post_id)
+        
+        # Content delta: applied to the stored Obsidian source, then re-rendered
+        content_changed = patch.diff is not None or bool(patch.ops)
+        if content_changed:
+            if source is None:
+                raise PatchConflictError(f"No stored source for post {post_id}, upload the full content with POST /api/posts")
+            if patch.baseHash != source.content_hash:
+                raise ContentHashMismatchError(
+                    f"Base hash {patch.baseHash} does not match the current content hash {source.content_hash}"
+                )
+            if content_hash(body) != source.rendered_hash:
+                raise PatchConflictError(f"Post {post_id} was modified outside the API, upload the full content with POST /api/posts")
+            if patch.diff is not None:
+                content = apply_unified_diff(source.content, patch.diff)
+            else:
+                content = apply_splices(source.content, [(op.offset, op.delete, op.insert) for op in patch.ops])
+            body = render_obsidian_markdown(content, source.attachment_map, self.catalog.resolve_post_url)
+        
+        # Frontmatter: current fields overlaid with the changes, validated like an upsert
+        patchable = set(PostRequestSchema.model_fields) - set(EXCLUDED_FIELDS) - {"postId"}
+        unknown = set(patch.frontmatter) - patchable
+        if unknown:
+            raise ObsidianSyncException(f"Cannot patch fields: {', '.join(sorted(unknown))}")
+        merged = {
+            # Hand-edited frontmatter may hold YAML timestamps
+            name: value.isoformat() if hasattr(value, "isoformat") else value
+            for name, value in fields.items() if name in patchable
+        }
+        merged.update(patch.frontmatter)
+        merged["postId"] = post_id
+        try:
+            post_data = PostRequestSchema(**merged)
+        except ValidationError as e:
+            raise ObsidianSyncException(f"Invalid frontmatter: {e}")
+        
+        post_path, md_content = self.file_service.render_post(
+            post_id=post_id,
+            frontmatter_data=post_data.model_dump(exclude=set(EXCLUDED_FIELDS)),
+            content=body,
+            categories=post_data.categories or ""
+        )
+        moved = post_path != current_path
+        
+        with self.journal.transaction() as tx:
+            tx.write(post_path, md_content.encode("utf-8"))
+            if moved:
+                tx.delete(current_path)
+            if content_changed:
+                source = self.sources.stage(tx, post_id, content, source.attachment_map, body)
+            tx.after_commit(lambda: self._record_write(post_id, post_path, current_path if moved else None))
+        
+        # Re-index only if something the catalog or search index holds changed
+        indexed_fields = {"title", "tags", "categories", "draft", "searchHidden"}
+        if content_changed or moved or indexed_fields & set(patch.frontmatter):
+            self._update_indexes(post_id, post_data, body)
+        if moved:
+            self._relink_moved(post_id, current_path, post_path)
+        
+        logger.info(f"[patch] Successfully patched post: {post_id}")
+        return PostUpsertResponse(
+            postId=post_id,
+            status="success",
+            contentHash=source.content_hash if source else None
+        )
     
     def delete_post(self, post_id: str) -> PostDeleteResponse:
         """
         Delete a post and its attachments.
         """
+        with self.vault_lock.shared():
+            return self._delete_post(post_id)
+    
+    def _delete_post(self, post_id: str) -> PostDeleteResponse:
         logger.info(f"[delete] Deleting post: {post_id}")
         
-        # Delete post file
-        post_deleted = self.file_service.delete_post(post_id)
+        post_path = self.file_service.get_post_path(post_id)
+        post_deleted = post_path is not None
+        
+        # Delete post file and attachments in one journaled transaction
+        with self.journal.transaction() as tx:
+            if post_path:
+                tx.delete(post_path)
+            self.sources.stage_delete(tx, post_id)
+            self.attachment_service.stage_attachment_deletion(tx, post_id, self.change_log.attachment_keys(post_id))
+            tx.after_commit(lambda: self._record_delete(post_id, post_path))
         
-        # Delete attachments
-        self.attachment_service.delete_attachments(post_id)
+        self.catalog.remove(post_id)
+        self.search_index.remove_post(post_id)
         
         if not post_deleted:
             return PostDeleteResponse(
@@ -0,0 +1,77 @@
+"""
+Obsidian source of published posts.
+
+The post file under content_root holds rendered markdown (embeds and
+wikilinks already converted), so content deltas cannot be applied to it.
+For every upsert the original content and the attachment map used to render
+it are kept as a JSON sidecar under data_root, written in the same journaled
+transaction as the post file. PATCH requests apply their diff to this source
+and re-render the post.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+
+from ..config import settings
+from .write_journal import Transaction
+
+
+def content_hash(text: str) -> str:
+    """sha256 hex digest of text (the base hash clients send with a patch)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PostSource:
+    """Source content of a post and what it rendered to."""
+    content: str
+    content_hash: str
+    attachment_map: Dict[str, str]
+    rendered_hash: str
+
+
+class PostSourceStore:
+    """Stores one source sidecar per post."""
+
+    def __init__(self, sources_dir: Optional[Path] = None):
+        self.sources_dir = sources_dir or settings.data_root / "sources"
+
+    def _path(self, post_id: str) -> Path:
+        return self.sources_dir / f"{post_id}.json"
+
+    def load(self, post_id: str) -> Optional[PostSource]:
+        """Load a post's source, or None if it was never stored (or is unreadable)."""
+        try:
+            data = json.loads(self._path(post_id).read_text(encoding="utf-8"))
+            return PostSource(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"[sources] Ignoring unreadable source of {post_id}: {e}")
+            return None
+
+    def stage(
+        self,
+        tx: Transaction,
+        post_id: str,
+        content: str,
+        attachment_map: Dict[str, str],
+        rendered_body: str
+    ) -> PostSource:
+        """Stage a post's source into the transaction that writes the post."""
+        source = PostSource(
+            content=content,
+            content_hash=content_hash(content),
+            attachment_map=attachment_map,
+            rendered_hash=content_hash(rendered_body),
+        )
+        tx.write(self._path(post_id), json.dumps(asdict(source), ensure_ascii=False).encode("utf-8"))
+        return source
+
+    def stage_delete(self, tx: Transaction, post_id: str) -> None:
+        """Delete a post's source when the transaction commits."""
+        tx.delete(self._path(post_id))
@@ -0,0 +1,246 @@
+"""
+On-demand request profiling.
+
+Requests are profiled when profiling is enabled in config and either carry
+the profiling header or are picked by the sampling rate. Two profilers are
+available:
+
+- ``sampling``: a background thread samples the stack of the thread that
+  runs the handler and writes collapsed stacks (``frame;frame;frame count``),
+  the input format of flamegraph.pl, speedscope and inferno. Work a handler
+  hands to the threadpool through ``follow()`` is sampled on that thread.
+- ``deterministic``: cProfile, written as a ``.prof`` stats file (snakeviz,
+  flameprof). On Python 3.12+ cProfile observes every thread.
+
+Profiles are kept in a ring directory under data_root; the oldest are
+removed once profiling_max_profiles is exceeded.
+"""
+
+import cProfile
+import functools
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Set
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import ProfileNotFoundError
+from ..utils.file_utils import atomic_write_bytes, ensure_directory_exists
+
+MODE_SAMPLING = "sampling"
+MODE_DETERMINISTIC = "deterministic"
+PROFILE_EXTENSIONS = {MODE_SAMPLING: ".folded", MODE_DETERMINISTIC: ".prof"}
+PROFILE_ID_PATTERN = re.compile(r"(\d+)-(\w+)-[0-9a-f]{8}")
+
+# Sampler of the request being profiled, for follow()
+_active_sampler: ContextVar[Optional["StackSampler"]] = ContextVar("active_sampler", default=None)
+
+
+@dataclass
+class ProfileInfo:
+    """A stored profile."""
+    profile_id: str
+    endpoint: str
+    created_at: float
+    size: int
+    format: str
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval.
+
+    While the thread has handed work to other threads (see follow()), those
+    are sampled instead.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._followed: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._labels = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self._followed) or [self.thread_id]:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    stack.reverse()
+                    self.samples[";".join(stack)] += 1
+
+    @contextmanager
+    def following(self, thread_id: int) -> Iterator[None]:
+        """Sample thread_id while the enclosed block runs."""
+        self._followed.add(thread_id)
+        try:
+            yield
+        finally:
+            self._followed.discard(thread_id)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> bytes:
+        """Samples in collapsed-stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common()).encode("utf-8")
+
+
+class ProfilingService:
+    """Decides which requests to profile and stores their profiles."""
+
+    def __init__(self, profile_dir: Optional[Path] = None):
+        self.enabled = settings.profiling_enabled
+        self.header = settings.profiling_header.lower()
+        self.sample_rate = settings.profiling_sample_rate
+        self.mode = settings.profiling_mode
+        if self.mode not in PROFILE_EXTENSIONS:
+            raise ValueError(f"Unknown profiling mode: {self.mode}")
+        self.interval = settings.profiling_sample_interval
+        self.max_profiles = settings.profiling_max_profiles
+        self.profile_dir = profile_dir or settings.data_root / "profiles"
+        self._ring_lock = threading.Lock()
+        # cProfile cannot run twice at once in one process
+        self._deterministic_lock = threading.Lock()
+
+    def should_profile(self, header_value: Optional[str]) -> bool:
+        """Whether to profile a request, given the value of the profiling header."""
+        if not self.enabled:
+            return False
+        if header_value and header_value.lower() not in ("0", "false", "no"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def capture(self, endpoint: str) -> Iterator[Optional[str]]:
+        """
+        Profile the enclosed block on the current thread and store the result.
+
+        Yields the id the profile will be stored under, or None if the
+        request cannot be profiled right now.
+        """
+        profile_id = f"{int(time.time() * 1000)}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        started = time.perf_counter()
+        if self.mode == MODE_SAMPLING:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            token = _active_sampler.set(sampler)
+            try:
+                yield profile_id
+            finally:
+                _active_sampler.reset(token)
+                sampler.stop()
+                data = sampler.collapsed()
+        else:
+            if not self._deterministic_lock.acquire(blocking=False):
+                logger.debug(f"[profiling] Skipping {endpoint}: another request is being profiled")
+                yield None
+                return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                try:
+                    yield profile_id
+                finally:
+                    profiler.disable()
+            finally:
+                self._deterministic_lock.release()
+            data = None
+
+        try:
+            path = self.profile_dir / (profile_id + PROFILE_EXTENSIONS[self.mode])
+            ensure_directory_exists(self.profile_dir)
+            if data is not None:
+                atomic_write_bytes(path, data)
+            else:
+                profiler.dump_stats(path)
+            self._trim()
+            logger.info(f"[profiling] Stored profile {profile_id} ({time.perf_counter() - started:.3f}s)")
+        except OSError as e:
+            logger.warning(f"[profiling] Failed to store profile {profile_id}: {e}")
+
+    def follow(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap func, about to be run on another thread, so that the profile of
+        the current request (if any) samples that thread while func runs.
+        """
+        sampler = _active_sampler.get()
+        if sampler is None:
+            return func
+
+        @functools.wraps(func)
+        def followed(*args: Any, **kwargs: Any) -> Any:
+            with sampler.following(threading.get_ident()):
+                return func(*args, **kwargs)
+
+        return followed
+
+    def _trim(self) -> None:
+        """Drop the oldest profiles beyond the ring size."""
+        with self._ring_lock:
+            profiles = sorted(self._profile_files())
+            for path in profiles[:max(0, len(profiles) - self.max_profiles)]:
+                path.unlink(missing_ok=True)
+
+    def _profile_files(self) -> List[Path]:
+        if not self.profile_dir.exists():
+            return []
+        return [
+            path for path in self.profile_dir.iterdir()
+            if path.suffix in PROFILE_EXTENSIONS.values() and PROFILE_ID_PATTERN.fullmatch(path.stem)
+        ]
+
+    def list_profiles(self) -> List[ProfileInfo]:
+        """List stored profiles, newest first."""
+        profiles = []
+        for path in self._profile_files():
+            match = PROFILE_ID_PATTERN.fullmatch(path.stem)
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            profiles.append(ProfileInfo(
+                profile_id=path.stem,
+                endpoint=match.group(2),
+                created_at=int(match.group(1)) / 1000,
+                size=size,
+                format=MODE_SAMPLING if path.suffix == PROFILE_EXTENSIONS[MODE_SAMPLING] else MODE_DETERMINISTIC,
+            ))
+        profiles.sort(key=lambda p: p.profile_id, reverse=True)
+        return profiles
+
+    def get_profile_file(self, profile_id: str) -> Path:
+        """Get the file of a stored profile."""
+        if PROFILE_ID_PATTERN.fullmatch(profile_id):
+            for extension in PROFILE_EXTENSIONS.values():
+                path = self.profile_dir / (profile_id + extension)
+                if path.is_file():
+                    return path
+        raise ProfileNotFoundError(profile_id)
@@ -0,0 +1,418 @@
+"""
+Full-text search service.
+
+Keeps an inverted index over post titles, tags and body that is updated
+incrementally on every upsert/delete. On disk the index is a gzip snapshot of
+per-post term frequencies plus an append-only journal of changes since the
+snapshot; postings are rebuilt in memory on load.
+
+Compaction runs in a background thread: the journal is rotated aside under
+the index lock, and the snapshot is written while searches and updates go on.
+"""
+
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from ..config import settings
+from ..utils.file_utils import ensure_directory_exists
+from ..utils.frontmatter import parse_frontmatter
+from ..utils.path_utils import get_category_from_path
+
+# Field weights applied to term frequencies (title > tags > body)
+TITLE_WEIGHT = 3
+TAGS_WEIGHT = 2
+BODY_WEIGHT = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+SNAPSHOT_FILENAME = "search_index.json.gz"
+JOURNAL_FILENAME = "search_index.journal"
+COMPACTING_FILENAME = "search_index.journal.compacting"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text into lowercase terms.
+
+    Latin words are split on non-word characters; CJK runs have no spaces, so
+    they are indexed as overlapping character bigrams.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if not _CJK_PATTERN.search(word):
+            tokens.append(word)
+            continue
+        last = 0
+        for run in _CJK_PATTERN.finditer(word):
+            if run.start() > last:
+                tokens.append(word[last:run.start()])
+            chars = run.group(0)
+            if len(chars) == 1:
+                tokens.append(chars)
+            else:
+                tokens.extend(chars[i:i + 2] for i in range(len(chars) - 1))
+            last = run.end()
+        if last < len(word):
+            tokens.append(word[last:])
+    return tokens
+
+
+@dataclass
+class IndexedDocument:
+    """Per-post data kept by the search index."""
+    post_id: str
+    title: str
+    category: str
+    tags: List[str] = field(default_factory=list)
+    terms: Dict[str, int] = field(default_factory=dict)
+    length: int = 0
+
+    def to_record(self) -> dict:
+        return {
+            "id": self.post_id,
+            "title": self.title,
+            "category": self.category,
+            "tags": self.tags,
+            "terms": self.terms,
+            "length": self.length,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "IndexedDocument":
+        return cls(
+            post_id=record["id"],
+            title=record["title"],
+            category=record["category"],
+            tags=record.get("tags", []),
+            terms=record["terms"],
+            length=record["length"],
+        )
+
+
+@dataclass
+class SearchHit:
+    """A single ranked search result."""
+    post_id: str
+    title: str
+    category: str
+    tags: List[str]
+    score: float
+
+
+def build_document(post_id: str, title: str, category: str, tags: List[str], body: str) -> IndexedDocument:
+    """Tokenize a post into an indexable document."""
+    terms: Counter = Counter()
+    for term in tokenize(title):
+        terms[term] += TITLE_WEIGHT
+    for term in tokenize(" ".join(tags)):
+        terms[term] += TAGS_WEIGHT
+    for term in tokenize(body):
+        terms[term] += BODY_WEIGHT
+    return IndexedDocument(
+        post_id=post_id,
+        title=title,
+        category=category,
+        tags=list(tags),
+        terms=dict(terms),
+        length=sum(terms.values()),
+    )
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking."""
+
+    def __init__(self, index_dir: Optional[Path] = None, content_root: Optional[Path] = None):
+        self.index_dir = index_dir or settings.data_root / "search"
+        self.content_root = content_root or settings.content_root
+        self.compact_threshold = settings.search_journal_compact_threshold
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._documents: Dict[str, IndexedDocument] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._journal_entries = 0
+        # Compactions run one at a time, off the request that filled the journal
+        self._compact_lock = threading.Lock()
+        self._compaction: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-compact")
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.index_dir / SNAPSHOT_FILENAME
+
+    @property
+    def journal_path(self) -> Path:
+        return self.index_dir / JOURNAL_FILENAME
+
+    @property
+    def compacting_path(self) -> Path:
+        """Journal entries being folded into the next snapshot."""
+        return self.index_dir / COMPACTING_FILENAME
+
+    # ------------------------------------------------------------------
+    # In-memory maintenance
+    # ------------------------------------------------------------------
+
+    def _add(self, doc: IndexedDocument) -> None:
+        self._remove(doc.post_id)
+        self._documents[doc.post_id] = doc
+        self._total_length += doc.length
+        for term, tf in doc.terms.items():
+            self._postings.setdefault(term, {})[doc.post_id] = tf
+
+    def _remove(self, post_id: str) -> None:
+        doc = self._documents.pop(post_id, None)
+        if not doc:
+            return
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rebuilt = not any(path.exists() for path in (self.snapshot_path, self.compacting_path, self.journal_path))
+            if rebuilt:
+                self._scan_content()
+            else:
+                self._load()
+            self._loaded = True
+        if rebuilt:
+            self.compact()
+
+    def _load(self) -> None:
+        if self.snapshot_path.exists():
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            for record in snapshot.get("documents", []):
+                self._add(IndexedDocument.from_record(record))
+
+        # Entries of an interrupted compaction come before the current journal
+        for journal_path in (self.compacting_path, self.journal_path):
+            if not journal_path.exists():
+                continue
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write at the tail of the journal, ignore the rest
+                        logger.warning("[search] Ignoring truncated journal entry")
+                        break
+                    self._apply_journal_entry(entry)
+                    self._journal_entries += 1
+
+        logger.info(f"[search] Loaded index with {len(self._documents)} posts, {len(self._postings)} terms")
+
+    def _apply_journal_entry(self, entry: dict) -> None:
+        if entry["op"] == "put":
+            self._add(IndexedDocument.from_record(entry["doc"]))
+        elif entry["op"] == "delete":
+            self._remove(entry["id"])
+
+    def _append_journal(self, entry: dict) -> None:
+        ensure_directory_exists(self.index_dir)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_threshold:
+            self.schedule_compaction()
+
+    def schedule_compaction(self) -> Future:
+        """Compact in the background, unless a compaction is already queued or running."""
+        with self._lock:
+            if self._compaction is None or self._compaction.done():
+                self._compaction = self._executor.submit(self.compact)
+            return self._compaction
+
+    def compact(self) -> None:
+        """
+        Write a fresh snapshot and drop the journal entries it contains.
+
+        The index lock is only held to copy the documents and rotate the
+        journal; the snapshot is written without it. Must not be called
+        while holding the index lock.
+        """
+        with self._compact_lock:
+            with self._lock:
+                ensure_directory_exists(self.index_dir)
+                # Records share the term dicts, which are never changed after a document is built
+                records = [doc.to_record() for doc in self._documents.values()]
+                self._rotate_journal()
+                self._journal_entries = 0
+
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump({"version": 1, "documents": records}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.snapshot_path)
+            # Entries written since the rotation stay in the journal
+            self.compacting_path.unlink(missing_ok=True)
+            logger.info(f"[search] Compacted index snapshot ({len(records)} posts)")
+
+    def _rotate_journal(self) -> None:
+        if not self.journal_path.exists():
+            return
+        if not self.compacting_path.exists():
+            os.replace(self.journal_path, self.compacting_path)
+            return
+        # Left over from an interrupted compaction, keep its entries first
+        with open(self.compacting_path, "ab") as dst, open(self.journal_path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        self.journal_path.unlink()
+
+    def shutdown(self) -> None:
+        """Finish background compaction and fold the remaining journal into the snapshot."""
+        self._executor.shutdown(wait=True)
+        if self._loaded and self._journal_entries:
+            self.compact()
+
+    def rebuild(self) -> None:
+        """Rebuild the whole index by scanning content_root."""
+        with self._lock:
+            self._scan_content()
+            self._loaded = True
+        self.compact()
+
+    def _scan_content(self) -> None:
+        self._documents.clear()
+        self._postings.clear()
+        self._total_length = 0
+        if self.content_root.exists():
+            for md_path in self.content_root.glob("*/*.md"):
+                self._index_file(md_path)
+
+    def _read_document(self, md_path: Path) -> Optional[IndexedDocument]:
+        """Build a document from a post file; None if unreadable or hidden from search."""
+        try:
+            fields, body = parse_frontmatter(md_path.read_text(encoding="utf-8"))
+        except OSError as e:
+            logger.warning(f"[search] Failed to read {md_path}: {e}")
+            return None
+        if fields.get("draft") is True or fields.get("searchHidden") is True:
+            return None
+        tags = fields.get("tags") or []
+        return build_document(
+            post_id=md_path.stem,
+            title=str(fields.get("title") or md_path.stem),
+            category=get_category_from_path(md_path, self.content_root) or "",
+            tags=[str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)],
+            body=body,
+        )
+
+    def _index_file(self, md_path: Path) -> None:
+        doc = self._read_document(md_path)
+        if doc:
+            self._add(doc)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def index_post(self, post_id: str, title: str, category: str, tags: List[str], body: str) -> None:
+        """Index (or re-index) a single post; only this post is re-tokenized."""
+        doc = build_document(post_id, title, category, tags, body)
+        self._ensure_loaded()
+        with self._lock:
+            self._add(doc)
+            self._append_journal({"op": "put", "doc": doc.to_record()})
+
+    def index_file(self, md_path: Path) -> None:
+        """Re-index a post from its file on disk (removing it if it is now hidden)."""
+        doc = self._read_document(md_path)
+        if doc is None:
+            self.remove_post(md_path.stem)
+            return
+        self._ensure_loaded()
+        with self._lock:
+            self._add(doc)
+            self._append_journal({"op": "put", "doc": doc.to_record()})
+
+    def set_category(self, post_id: str, category: str) -> None:
+        """Update a post's category without re-tokenizing it."""
+        self._ensure_loaded()
+        with self._lock:
+            doc = self._documents.get(post_id)
+            if not doc or doc.category == category:
+                return
+            doc.category = category
+            self._append_journal({"op": "put", "doc": doc.to_record()})
+
+    def remove_post(self, post_id: str) -> None:
+        """Remove a post from the index."""
+        self._ensure_loaded()
+        with self._lock:
+            if post_id not in self._documents:
+                return
+            self._remove(post_id)
+            self._append_journal({"op": "delete", "id": post_id})
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> Tuple[int, List[SearchHit]]:
+        """
+        Rank posts matching any query term with BM25.
+
+        Only the postings of the query terms are visited, so cost depends on
+        how common the terms are rather than on the size of the vault.
+        Returns (total_matches, hits for the requested page).
+        """
+        self._ensure_loaded()
+        terms = set(tokenize(query))
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            doc_count = len(self._documents)
+            if doc_count == 0:
+                return 0, []
+            avg_length = self._total_length / doc_count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id, tf in postings.items():
+                    length = self._documents[post_id].length
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[post_id] = scores.get(post_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+            hits = []
+            for post_id, score in top[offset:]:
+                doc = self._documents[post_id]
+                hits.append(SearchHit(
+                    post_id=post_id,
+                    title=doc.title,
+                    category=doc.category,
+                    tags=doc.tags,
+                    score=round(score, 4),
+                ))
+            return len(scores), hits
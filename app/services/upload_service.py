@@ -0,0 +1,235 @@
+"""
+Resumable upload service.
+
+Large attachments are uploaded out of band in chunks: a session is created
+for the target attachment path, chunks are appended at the current offset to
+a temp file under static_root/.uploads, and the session is finalized with a
+checksum. A later post upsert references the finished upload by id and the
+temp file is renamed into place, so the bytes are never copied again.
+
+The temp file's size is the authoritative offset, so sessions survive
+restarts and interrupted chunks simply resume from what was written.
+
+Idle sessions expire after ``upload_session_ttl``. Finalized sessions do
+not: they are kept until an upsert consumes them or the client cancels them.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import (
+    InvalidAttachmentPathError,
+    UploadNotFoundError,
+    UploadConflictError,
+    UploadChecksumError
+)
+from ..utils.file_utils import atomic_write_bytes, ensure_directory_exists, hash_file
+from ..utils.validation import validate_attachment_path_format
+
+UPLOAD_DIRNAME = ".uploads"
+
+
+@dataclass
+class UploadSession:
+    """State of a resumable upload."""
+    upload_id: str
+    path: str
+    size: int
+    sha256: Optional[str]
+    created_at: float
+    updated_at: float
+    offset: int = 0
+    completed: bool = False
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """When the idle session expires; None once finalized (kept until released)."""
+        if self.completed:
+            return None
+        return self.updated_at + settings.upload_session_ttl
+
+
+class UploadService:
+    """Service for resumable chunked uploads."""
+
+    def __init__(self):
+        self.upload_dir = settings.static_root / UPLOAD_DIRNAME
+        self._meta_lock = threading.Lock()
+        self._append_locks: Dict[str, asyncio.Lock] = {}
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.json"
+
+    def _save(self, session: UploadSession) -> None:
+        data = asdict(session)
+        data.pop("offset")  # derived from the part file
+        atomic_write_bytes(self._meta_path(session.upload_id), json.dumps(data).encode("utf-8"))
+
+    def _valid_upload_id(self, upload_id: str) -> bool:
+        try:
+            return uuid.UUID(upload_id).hex == upload_id
+        except ValueError:
+            return False
+
+    def get_session(self, upload_id: str) -> UploadSession:
+        """Load an upload session, raising UploadNotFoundError if missing or expired."""
+        if not self._valid_upload_id(upload_id):
+            raise UploadNotFoundError(upload_id)
+        meta_path = self._meta_path(upload_id)
+        part_path = self._part_path(upload_id)
+        try:
+            data = json.loads(meta_path.read_text(encoding="utf-8"))
+            offset = part_path.stat().st_size
+        except (OSError, json.JSONDecodeError):
+            raise UploadNotFoundError(upload_id)
+        session = UploadSession(**data, offset=offset)
+        if session.expires_at is not None and session.expires_at < time.time():
+            self._discard(upload_id)
+            raise UploadNotFoundError(upload_id)
+        return session
+
+    def create_session(self, att_path: str, size: int, sha256: Optional[str] = None) -> UploadSession:
+        """Create a new upload session for an attachment path."""
+        normalized_path = att_path.lower()
+        if not validate_attachment_path_format(normalized_path):
+            raise InvalidAttachmentPathError(att_path)
+        if size < 0 or size > settings.upload_max_size:
+            raise UploadConflictError(f"Upload size must be between 0 and {settings.upload_max_size} bytes")
+
+        ensure_directory_exists(self.upload_dir)
+        now = time.time()
+        session = UploadSession(
+            upload_id=uuid.uuid4().hex,
+            path=normalized_path,
+            size=size,
+            sha256=sha256.lower() if sha256 else None,
+            created_at=now,
+            updated_at=now,
+        )
+        self._part_path(session.upload_id).touch()
+        self._save(session)
+        logger.info(f"[upload] Created session {session.upload_id} for {normalized_path} ({size} bytes)")
+        return session
+
+    async def append_chunk(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """
+        Append a streamed chunk at ``offset``.
+
+        The offset must equal the bytes already received; on mismatch the
+        client should query the session and resume from its offset. Whatever
+        arrives before a disconnect is kept. File writes run in a worker
+        thread, off the event loop.
+        """
+        lock = self._append_locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            session = self.get_session(upload_id)
+            if session.completed:
+                raise UploadConflictError(f"Upload {upload_id} is already finalized")
+            if offset != session.offset:
+                raise UploadConflictError(f"Offset mismatch: expected {session.offset}, got {offset}")
+
+            written = session.offset
+            try:
+                with open(self._part_path(upload_id), "ab") as f:
+                    async for chunk in chunks:
+                        if written + len(chunk) > session.size:
+                            raise UploadConflictError(f"Upload exceeds declared size of {session.size} bytes")
+                        await asyncio.to_thread(f.write, chunk)
+                        written += len(chunk)
+            finally:
+                session.offset = written
+                session.updated_at = time.time()
+                await asyncio.to_thread(self._save, session)
+        return session
+
+    def finalize(self, upload_id: str, sha256: Optional[str] = None) -> UploadSession:
+        """Verify size and checksum and mark the upload as complete."""
+        session = self.get_session(upload_id)
+        if session.offset != session.size:
+            raise UploadConflictError(f"Upload incomplete: {session.offset}/{session.size} bytes received")
+
+        expected = (sha256 or session.sha256 or "").lower()
+        if not expected:
+            raise UploadChecksumError("A sha256 checksum is required to finalize an upload")
+        actual, _ = hash_file(self._part_path(upload_id))
+        if actual != expected:
+            raise UploadChecksumError(f"Checksum mismatch: expected {expected}, got {actual}")
+
+        session.sha256 = expected
+        session.completed = True
+        session.updated_at = time.time()
+        self._save(session)
+        logger.info(f"[upload] Finalized session {upload_id}")
+        return session
+
+    def staged_file(self, upload_id: str, att_path: str) -> Path:
+        """
+        Get the completed temp file of a finalized upload for att_path.
+
+        The caller renames it into place and then calls release().
+        """
+        session = self.get_session(upload_id)
+        if not session.completed:
+            raise UploadConflictError(f"Upload {upload_id} is not finalized")
+        if session.path != att_path.lower():
+            raise UploadConflictError(f"Upload {upload_id} was created for {session.path}, not {att_path}")
+        return self._part_path(upload_id)
+
+    def release(self, upload_id: str) -> None:
+        """Forget a consumed upload session."""
+        self._discard(upload_id)
+
+    def cancel(self, upload_id: str) -> None:
+        """Abort an upload session and delete its data."""
+        self.get_session(upload_id)
+        self._discard(upload_id)
+
+    def _discard(self, upload_id: str) -> None:
+        with self._meta_lock:
+            self._part_path(upload_id).unlink(missing_ok=True)
+            self._meta_path(upload_id).unlink(missing_ok=True)
+            self._append_locks.pop(upload_id, None)
+
+    def cleanup_expired(self) -> List[str]:
+        """Delete expired sessions and orphaned temp files (finalized sessions are kept)."""
+        if not self.upload_dir.exists():
+            return []
+        now = time.time()
+        removed = []
+        for entry in self.upload_dir.iterdir():
+            upload_id = entry.name.split(".", 1)[0]
+            if upload_id in removed:
+                continue
+            try:
+                data = json.loads(self._meta_path(upload_id).read_text(encoding="utf-8"))
+                # Finalized uploads wait for the upsert that references them
+                expired = not data.get("completed") and data["updated_at"] + settings.upload_session_ttl < now
+            except (OSError, json.JSONDecodeError, KeyError):
+                # Orphaned part file (or unreadable metadata); expire by age
+                expired = entry.stat().st_mtime + settings.upload_session_ttl < now
+            if expired:
+                self._discard(upload_id)
+                removed.append(upload_id)
+        if removed:
+            logger.info(f"[upload] Removed {len(removed)} expired upload sessions")
+        return removed
+
+    async def run_cleanup_loop(self) -> None:
+        """Periodically remove expired sessions (runs for the app's lifetime)."""
+        while True:
+            await asyncio.sleep(settings.upload_cleanup_interval)
+            try:
+                await asyncio.to_thread(self.cleanup_expired)
+            except Exception as e:
+                logger.error(f"[upload] Cleanup failed: {e}")
@@ -0,0 +1,455 @@
+"""
+Vault filesystem watcher.
+
+Posts and attachments are sometimes edited, moved or deleted directly on the
+volume (editors fixing a post, Hugo tooling). The watcher notices such
+changes and reconciles the catalog, search index and change log with what is
+on disk, so they stay correct without rescans or restarts.
+
+Events come from inotify where available (via ctypes, no extra dependency)
+and from periodic directory polling otherwise. They are reduced to a set of
+changed paths, debounced, and reconciled in batches. Reconciling is
+idempotent: a file whose hash the change log already knows is skipped, which
+makes the service's own writes cheap to observe. Paths with a journaled
+write in flight are left alone and retried in a later batch, since the
+writer records them in the change log itself once the write is applied.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+
+from ..config import settings
+from ..utils.concurrency import ReadWriteLock
+from ..utils.file_utils import ensure_directory_exists, hash_file
+from ..utils.path_utils import get_category_from_path
+from .change_log import ChangeLog
+from .post_catalog import PostCatalog, read_frontmatter_title
+from .search_service import SearchIndex
+from .write_journal import WriteJournal
+
+BACKEND_AUTO = "auto"
+BACKEND_INOTIFY = "inotify"
+BACKEND_POLLING = "polling"
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_ignored(name: str) -> bool:
+    # Temp files of atomic writes and the journal, upload staging, editor swap files
+    return name.startswith(".") or name.endswith("~")
+
+
+class InotifyBackend:
+    """Recursive inotify watches over a set of root directories."""
+
+    def __init__(self, roots: List[Path]):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self.roots = roots
+        self._watches: Dict[int, Path] = {}
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return  # Vanished before we got to it
+            # ENOSPC: fs.inotify.max_user_watches exhausted
+            raise OSError(err, f"inotify_add_watch failed for {directory}: {os.strerror(err)}")
+        self._watches[wd] = directory
+
+    def _watch_tree(self, root: Path) -> None:
+        self._watch(root)
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not _is_ignored(d)]
+            for dirname in dirnames:
+                self._watch(Path(dirpath) / dirname)
+
+    def read(self, timeout: float) -> Tuple[Set[Path], bool]:
+        """Wait for events; returns (changed paths, overflowed)."""
+        changed: Set[Path] = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, False
+
+        offset = 0
+        overflow = False
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if not name:
+                # Event on the watched directory itself (deleted or moved away)
+                changed.add(directory)
+                continue
+            name = os.fsdecode(name)
+            if _is_ignored(name):
+                continue
+            path = directory / name
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._watch_tree(path)
+                except OSError as e:
+                    logger.warning(f"[watcher] Cannot watch new directory {path}: {e}")
+        return changed, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """
+    Detects changes by periodically comparing directory listings.
+
+    Every interval walks both roots and stats every file, so each scan costs
+    O(files in the vault) in syscalls, and the listing of the previous scan
+    is kept in memory. Large vaults should use inotify or a longer
+    watcher_poll_interval; the scan time is logged to help choose one.
+    """
+
+    def __init__(self, roots: List[Path], interval: float):
+        self.roots = roots
+        self.interval = interval
+        self._slow_scan_logged = False
+        self._snapshot = self._scan()
+        self._last_scan = time.monotonic()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int, int]]:
+        started = time.perf_counter()
+        snapshot = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not _is_ignored(d)]
+                for filename in filenames:
+                    if _is_ignored(filename):
+                        continue
+                    path = Path(dirpath) / filename
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        elapsed = time.perf_counter() - started
+        logger.debug(f"[watcher] Polled {len(snapshot)} files in {elapsed:.3f}s")
+        if elapsed > self.interval / 2 and not self._slow_scan_logged:
+            self._slow_scan_logged = True
+            logger.warning(
+                f"[watcher] Polling {len(snapshot)} files took {elapsed:.3f}s of a {self.interval}s interval, "
+                f"consider inotify or a longer watcher_poll_interval"
+            )
+        return snapshot
+
+    def read(self, timeout: float) -> Tuple[Set[Path], bool]:
+        time.sleep(timeout)
+        if time.monotonic() - self._last_scan < self.interval:
+            return set(), False
+        self._last_scan = time.monotonic()
+        current = self._scan()
+        previous = self._snapshot
+        self._snapshot = current
+        changed = {path for path, sig in current.items() if previous.get(path) != sig}
+        changed.update(path for path in previous if path not in current)
+        return changed, False
+
+    def close(self) -> None:
+        pass
+
+
+class VaultWatcher:
+    """Watches content_root and static_root/media and reconciles in-memory state."""
+
+    def __init__(
+        self,
+        vault_lock: ReadWriteLock,
+        catalog: PostCatalog,
+        search_index: SearchIndex,
+        change_log: ChangeLog,
+        watch_media: bool = True,
+        journal: Optional[WriteJournal] = None
+    ):
+        self.content_root = settings.content_root
+        self.media_root = settings.static_root / "media"
+        # False with remote media storage: its attachments are in the change log but not on disk
+        self.watch_media = watch_media
+        self.vault_lock = vault_lock
+        self.catalog = catalog
+        self.search_index = search_index
+        self.change_log = change_log
+        self.journal = journal
+        self.backend_name = settings.watcher_backend
+        self.debounce = settings.watcher_debounce
+        self.max_delay = settings.watcher_max_delay
+        self.poll_interval = settings.watcher_poll_interval
+
+        self._pending: Set[Path] = set()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._backend = None
+        self.batches = 0
+        self.reconciled = 0
+
+    @property
+    def roots(self) -> List[Path]:
+        return [self.content_root, self.media_root] if self.watch_media else [self.content_root]
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _create_backend(self):
+        if self.backend_name in (BACKEND_AUTO, BACKEND_INOTIFY):
+            try:
+                return InotifyBackend(self.roots)
+            except OSError as e:
+                if self.backend_name == BACKEND_INOTIFY:
+                    raise
+                logger.warning(f"[watcher] inotify unavailable ({e}), falling back to polling")
+        return PollingBackend(self.roots, self.poll_interval)
+
+    def start(self) -> None:
+        """Start watching (runs until stop())."""
+        for root in self.roots:
+            ensure_directory_exists(root)
+        self._backend = self._create_backend()
+        logger.info(f"[watcher] Watching {', '.join(map(str, self.roots))} ({type(self._backend).__name__})")
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._watch_loop, name="vault-watcher", daemon=True),
+            threading.Thread(target=self._batch_loop, name="vault-reconciler", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the current batch to finish."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._backend:
+            self._backend.close()
+            self._backend = None
+
+    # ------------------------------------------------------------------
+    # Event collection and debouncing
+    # ------------------------------------------------------------------
+
+    def _watch_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                changed, overflow = self._backend.read(timeout=1.0)
+            except Exception as e:
+                logger.error(f"[watcher] Reading events failed: {e}")
+                self._stop.wait(self.poll_interval)
+                continue
+            if overflow:
+                logger.warning("[watcher] Event queue overflowed, rescanning the vault")
+                changed = set(self.roots)
+            if changed:
+                self.notify(changed)
+
+    def notify(self, paths: Iterable[Path]) -> None:
+        """Queue paths for reconciliation."""
+        with self._cond:
+            self._pending.update(paths)
+            self._cond.notify_all()
+
+    def _batch_loop(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                # Debounce: wait for a quiet period, but never longer than max_delay
+                first_seen = time.monotonic()
+                while not self._stop.is_set():
+                    size = len(self._pending)
+                    self._cond.wait(self.debounce)
+                    if len(self._pending) == size or time.monotonic() - first_seen >= self.max_delay:
+                        break
+                batch, self._pending = self._pending, set()
+            if batch and not self._stop.is_set():
+                try:
+                    self.reconcile(batch)
+                except Exception as e:
+                    logger.error(f"[watcher] Reconciling {len(batch)} paths failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    def _expand(self, paths: Iterable[Path]) -> Tuple[List[Path], List[Path]]:
+        """Split paths into (existing files, vanished files), expanding directories."""
+        existing: Set[Path] = set()
+        vanished: Set[Path] = set()
+        for path in paths:
+            if path.is_dir():
+                # A directory moved in, or a rescan: everything below it, plus
+                # files we knew of there that are gone now
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames[:] = [d for d in dirnames if not _is_ignored(d)]
+                    existing.update(Path(dirpath) / f for f in filenames if not _is_ignored(f))
+                vanished.update(p for p in self.change_log.known_paths_under(path) if not p.exists())
+            elif path.exists():
+                existing.add(path)
+            else:
+                known = self.change_log.known_paths_under(path)
+                if known:
+                    # A directory was deleted or moved away
+                    vanished.update(known)
+                else:
+                    vanished.add(path)
+        return sorted(existing), sorted(vanished)
+
+    def _is_post(self, path: Path) -> bool:
+        return path.suffix == ".md" and path.parent.parent == self.content_root
+
+    def _is_attachment(self, path: Path) -> bool:
+        # media/{ext}/{postId}/{file}
+        return self.watch_media and path.is_relative_to(self.media_root) and len(path.relative_to(self.media_root).parts) == 3
+
+    def _unless_pending(self, path: Path) -> ContextManager[bool]:
+        return self.journal.unless_pending(path) if self.journal else nullcontext(True)
+
+    def reconcile(self, paths: Iterable[Path]) -> None:
+        """Bring catalog, search index and change log in line with the given paths on disk."""
+        started = time.perf_counter()
+        existing, vanished = self._expand(paths)
+        updated = 0
+        deferred: List[Path] = []
+        # Shared: excludes category jobs and export snapshots, which hold the lock exclusively.
+        # Upserts hold it shared too; their paths are skipped while pending in the journal.
+        with self.vault_lock.shared():
+            # Existing files first, so a vanished path whose post reappeared
+            # elsewhere is recognized as a move rather than a delete
+            for path in existing:
+                with self._unless_pending(path) as free:
+                    if not free:
+                        deferred.append(path)
+                    elif self._is_post(path):
+                        updated += self._reconcile_post(path)
+                    elif self._is_attachment(path):
+                        updated += self._reconcile_attachment(path)
+            for path in vanished:
+                with self._unless_pending(path) as free:
+                    if not free:
+                        deferred.append(path)
+                    elif self._is_post(path):
+                        updated += self._reconcile_deleted_post(path)
+                    elif self._is_attachment(path):
+                        self.change_log.record_attachment_delete(path.parent.name, path)
+                        updated += 1
+        self.batches += 1
+        self.reconciled += updated
+        if deferred:
+            # Usually the write is recorded by then and the retry is a no-op
+            logger.debug(f"[watcher] Retrying {len(deferred)} paths with writes in flight")
+            self.notify(deferred)
+        if updated:
+            logger.info(
+                f"[watcher] Reconciled {updated} out-of-band changes "
+                f"({len(existing)} present, {len(vanished)} removed) in {time.perf_counter() - started:.3f}s"
+            )
+
+    def _reconcile_post(self, path: Path) -> int:
+        try:
+            file_hash, _ = hash_file(path)
+        except OSError:
+            return 0
+        if self.change_log.known_hash(path) == file_hash:
+            return 0  # Our own write, or already reconciled
+
+        post_id = path.stem
+        category = get_category_from_path(path, self.content_root) or ""
+        previous = self.catalog.get(post_id)
+        self.catalog.update(post_id, read_frontmatter_title(path) or post_id, category)
+        self.search_index.index_file(path)
+
+        old_path = self.content_root / previous.category / path.name if previous else None
+        if old_path and old_path != path and not old_path.exists():
+            self.change_log.record_post_move(post_id, old_path, path)
+        else:
+            self.change_log.record_post_write(post_id, path)
+        return 1
+
+    def _reconcile_deleted_post(self, path: Path) -> int:
+        post_id = path.stem
+        # No-op if the delete (or a move away) was already recorded
+        self.change_log.record_post_delete(post_id, path)
+        entry = self.catalog.get(post_id)
+        if not entry or entry.category != get_category_from_path(path, self.content_root):
+            return 0
+        self.catalog.remove(post_id)
+        self.search_index.remove_post(post_id)
+        return 1
+
+    def _reconcile_attachment(self, path: Path) -> int:
+        try:
+            file_hash, _ = hash_file(path)
+        except OSError:
+            return 0
+        if self.change_log.known_hash(path) == file_hash:
+            return 0
+        self.change_log.record_attachment_write(path.parent.name, path)
+        return 1
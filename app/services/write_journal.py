@@ -0,0 +1,452 @@
+"""
+Write-ahead intent journal.
+
+A post upsert touches several files (the markdown file, N attachments,
+possibly an old path after a category change). To keep them consistent
+across crashes every file is first staged as a temp file next to its
+target, then a single intent record describing all renames/deletes is
+appended to the journal and made durable, and only then are the renames
+applied. After a crash, recovery rolls every recorded intent forward (the
+staged files are complete by construction) and removes temp files of
+transactions that never reached their intent.
+
+A transaction is committed once its intent is durable. If logging the
+intent fails, the transaction is rolled back and its staged files removed.
+If applying it fails afterwards, the caller still gets the error, but the
+intent is kept and the next recovery completes the write: the files never
+end up half updated, though they may change after a failed request.
+
+From just before its intent is logged until its after-commit hooks have run,
+a transaction's target paths are "pending". Writers record their change
+log entries in those hooks, so the vault watcher (see unless_pending())
+never mistakes a service write for an out-of-band edit.
+
+Durability modes:
+
+- ``none``: no flushing at all; protects against process crashes only.
+- ``batched``: concurrent commits are grouped; one flush per group fsyncs
+  the staged files of the group, their directories and the journal, so
+  the journal is synced once per group rather than once per transaction.
+- ``full``: every staged file, the journal and the target directories are
+  fsynced for each transaction.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set
+from loguru import logger
+
+from ..config import settings
+from ..exceptions import FileOperationError
+from ..utils.file_utils import ensure_directory_exists
+
+JOURNAL_FILENAME = "write.journal"
+
+DURABILITY_NONE = "none"
+DURABILITY_BATCHED = "batched"
+DURABILITY_FULL = "full"
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_BATCHED, DURABILITY_FULL)
+
+
+def _fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _apply_op(op: dict) -> None:
+    """Apply one journaled operation; safe to repeat during recovery."""
+    kind = op["op"]
+    if kind == "replace":
+        src = Path(op["src"])
+        if src.exists():
+            ensure_directory_exists(Path(op["dst"]).parent)
+            os.replace(src, op["dst"])
+    elif kind == "delete":
+        Path(op["path"]).unlink(missing_ok=True)
+    elif kind == "rmtree":
+        shutil.rmtree(op["path"], ignore_errors=True)
+
+
+class Transaction:
+    """
+    A group of file operations applied atomically with respect to crashes.
+
+    Staging methods may be called from several threads at once (e.g. to
+    write attachments in parallel); commit/abort must come after all of them.
+    """
+
+    def __init__(self, journal: "WriteJournal"):
+        self.journal = journal
+        self.tx_id = uuid.uuid4().hex
+        self.ops: List[dict] = []
+        self._owned_temps: List[Path] = []
+        self._after_commit: List[Callable[[], None]] = []
+        self._began = False
+        self._pending = False
+        self._lock = threading.Lock()
+        self._directories: Set[Path] = set()
+
+    def _temp_path(self, target: Path) -> Path:
+        return target.with_name(f".{target.name}.{self.tx_id[:12]}.tmp")
+
+    def _ensure_directory(self, directory: Path) -> None:
+        # Each directory is created once per transaction, however many files go into it
+        with self._lock:
+            if directory not in self._directories:
+                ensure_directory_exists(directory)
+                self._directories.add(directory)
+
+    def write(self, target: Path, data: bytes) -> Path:
+        """Stage new content for target."""
+        tmp_path = self._temp_path(target)
+        self.journal._begin(self, tmp_path)
+        self._ensure_directory(target.parent)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                if self.journal.durability == DURABILITY_FULL:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            raise FileOperationError(f"Failed to stage {target}: {e}")
+        with self._lock:
+            self._owned_temps.append(tmp_path)
+            self.ops.append({"op": "replace", "src": str(tmp_path), "dst": str(target)})
+        return target
+
+    def adopt(self, staged: Path, target: Path) -> Path:
+        """Use an already complete file (e.g. a finished upload) as the new content of target."""
+        if self.journal.durability == DURABILITY_FULL:
+            _fsync_path(staged)
+        with self._lock:
+            self.ops.append({"op": "replace", "src": str(staged), "dst": str(target)})
+        return target
+
+    def delete(self, target: Path) -> None:
+        """Delete target when the transaction commits."""
+        with self._lock:
+            self.ops.append({"op": "delete", "path": str(target)})
+
+    def delete_tree(self, target: Path) -> None:
+        """Delete a directory tree when the transaction commits."""
+        with self._lock:
+            self.ops.append({"op": "rmtree", "path": str(target)})
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the transaction has been applied."""
+        with self._lock:
+            self._after_commit.append(callback)
+
+    @property
+    def targets(self) -> List[Path]:
+        """Paths the transaction replaces or deletes."""
+        return [Path(op.get("dst") or op["path"]) for op in self.ops]
+
+    def abort(self) -> None:
+        """Discard staged files; nothing has been applied."""
+        for tmp_path in self._owned_temps:
+            tmp_path.unlink(missing_ok=True)
+        self.journal._finish(self, applied=False)
+
+    def commit(self) -> None:
+        """Make the intent durable, then apply all operations."""
+        if not self.ops:
+            self.journal._finish(self, applied=False)
+            self._run_after_commit()
+            return
+        self.journal._register_pending(self)
+        try:
+            self._commit()
+        finally:
+            self.journal._release_pending(self)
+
+    def _commit(self) -> None:
+        try:
+            self.journal._log_intent(self)
+        except BaseException:
+            # The intent did not become durable, so nothing will be replayed: roll back
+            self.abort()
+            raise
+        applied = False
+        try:
+            for op in self.ops:
+                _apply_op(op)
+            if self.journal.durability == DURABILITY_FULL:
+                for directory in {target.parent for target in self.targets}:
+                    if directory.exists():
+                        _fsync_path(directory)
+            applied = True
+        finally:
+            if applied:
+                self.journal._finish(self, applied=True)
+            else:
+                # The intent is durable, so the transaction counts as committed even
+                # though the caller sees the error: recover() rolls it forward
+                self.journal._abandon(self)
+        self._run_after_commit()
+
+    def _run_after_commit(self) -> None:
+        for callback in self._after_commit:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"[journal] after-commit hook failed for {self.tx_id}: {e}")
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+class WriteJournal:
+    """Intent journal with group commit."""
+
+    def __init__(self, journal_dir: Optional[Path] = None, durability: Optional[str] = None):
+        self.journal_dir = journal_dir or settings.data_root / "journal"
+        self.durability = durability or settings.journal_durability
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown journal durability mode: {self.durability}")
+        self.group_commit_window = settings.journal_group_commit_window
+        self.checkpoint_bytes = settings.journal_checkpoint_bytes
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._active = 0
+        self._abandoned: Dict[str, List[dict]] = {}  # tx_id -> ops of intents that failed to apply
+
+        # Target paths of transactions between intent and after-commit hooks
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[Path, int] = {}
+
+        # Group commit state
+        self._sync_cond = threading.Condition()
+        self._written_seq = 0
+        self._synced_seq = 0
+        self._sync_pending: Set[Path] = set()  # staged files of intents not yet flushed
+        self._flushing = False
+        self.group_flushes = 0
+        self.committed_transactions = 0
+
+    @property
+    def journal_path(self) -> Path:
+        return self.journal_dir / JOURNAL_FILENAME
+
+    def transaction(self) -> Transaction:
+        """Start a new transaction (use as a context manager)."""
+        return Transaction(self)
+
+    # ------------------------------------------------------------------
+    # Pending paths
+    # ------------------------------------------------------------------
+
+    def _register_pending(self, tx: Transaction) -> None:
+        with self._pending_lock:
+            for path in tx.targets:
+                self._pending[path] = self._pending.get(path, 0) + 1
+            tx._pending = True
+
+    def _release_pending(self, tx: Transaction) -> None:
+        with self._pending_lock:
+            if not tx._pending:
+                return
+            tx._pending = False
+            for path in tx.targets:
+                if self._pending[path] == 1:
+                    del self._pending[path]
+                else:
+                    self._pending[path] -= 1
+
+    @contextmanager
+    def unless_pending(self, path: Path) -> Iterator[bool]:
+        """
+        Yield whether ``path`` is free of in-flight service writes.
+
+        While the block runs no transaction touching the vault can log its
+        intent, so a free path stays free; keep the block short.
+        """
+        with self._pending_lock:
+            # A pending directory (rmtree) covers everything below it
+            yield not any(path == pending or path.is_relative_to(pending) for pending in self._pending)
+
+    # ------------------------------------------------------------------
+    # Journal records
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        if self._file is None:
+            ensure_directory_exists(self.journal_dir)
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        return self._file
+
+    def _append(self, record: dict) -> int:
+        """Append a record (caller holds _lock); returns its sequence number."""
+        f = self._open()
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+        self._written_seq += 1
+        return self._written_seq
+
+    def _begin(self, tx: Transaction, tmp_path: Path) -> None:
+        # Record temp files before creating them so recovery can remove
+        # leftovers of transactions that never reached their intent.
+        with self._lock:
+            if not tx._began:
+                tx._began = True
+                self._active += 1
+            self._append({"tx": tx.tx_id, "type": "stage", "path": str(tmp_path)})
+
+    def _log_intent(self, tx: Transaction) -> None:
+        with self._lock:
+            if not tx._began:
+                tx._began = True
+                self._active += 1
+            seq = self._append({"tx": tx.tx_id, "type": "intent", "ops": tx.ops})
+            if self.durability == DURABILITY_BATCHED:
+                self._sync_pending.update(Path(op["src"]) for op in tx.ops if op["op"] == "replace")
+            if self.durability == DURABILITY_FULL:
+                os.fsync(self._file.fileno())
+        if self.durability == DURABILITY_BATCHED:
+            self._group_sync(seq)
+
+    def _finish(self, tx: Transaction, applied: bool) -> None:
+        with self._lock:
+            if not tx._began:
+                return
+            try:
+                self._append({"tx": tx.tx_id, "type": "done" if applied else "abort"})
+            finally:
+                tx._began = False
+                self._active -= 1
+            if applied:
+                self.committed_transactions += 1
+            if self._active == 0 and self._file.tell() >= self.checkpoint_bytes:
+                self._checkpoint()
+
+    def _abandon(self, tx: Transaction) -> None:
+        """Stop tracking a transaction whose commit failed, without finishing its intent."""
+        with self._lock:
+            if not tx._began:
+                return
+            tx._began = False
+            self._active -= 1
+            self._abandoned[tx.tx_id] = tx.ops
+        logger.error(f"[journal] Transaction {tx.tx_id} failed to apply; it will be rolled forward on recovery")
+
+    def _checkpoint(self) -> None:
+        """Truncate the journal; only called with no transaction in flight."""
+        self._file.truncate(0)
+        self._file.seek(0)
+        # Intents that failed to apply must survive until recovery replays them
+        for tx_id, ops in self._abandoned.items():
+            self._append({"tx": tx_id, "type": "intent", "ops": ops})
+        if self._abandoned and self.durability != DURABILITY_NONE:
+            os.fsync(self._file.fileno())
+        logger.debug("[journal] Checkpointed write journal")
+
+    def _group_sync(self, seq: int) -> None:
+        """
+        Wait until record ``seq`` is durable.
+
+        The first committer to arrive becomes the leader: it waits a short
+        window for others to append their intents, then flushes the staged
+        files of the whole group and the journal in one pass.
+        """
+        with self._sync_cond:
+            while self._synced_seq < seq:
+                if self._flushing:
+                    self._sync_cond.wait()
+                    continue
+                self._flushing = True
+                self._sync_cond.release()
+                try:
+                    if self.group_commit_window > 0:
+                        time.sleep(self.group_commit_window)
+                    with self._lock:
+                        target = self._written_seq
+                        files, self._sync_pending = self._sync_pending, set()
+                    try:
+                        self._flush(files)
+                    except OSError:
+                        with self._lock:
+                            self._sync_pending.update(files)
+                        raise
+                finally:
+                    self._sync_cond.acquire()
+                    self._flushing = False
+                self._synced_seq = max(self._synced_seq, target)
+                self.group_flushes += 1
+                self._sync_cond.notify_all()
+
+    def _flush(self, files: Set[Path]) -> None:
+        """Make staged files, their directory entries and the journal durable, in that order."""
+        for path in [*files, *{path.parent for path in files}]:
+            try:
+                _fsync_path(path)
+            except FileNotFoundError:
+                # Staged by a transaction that was rolled back after a failed flush
+                continue
+        os.fsync(self._file.fileno())
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def recover(self) -> None:
+        """Roll forward committed intents and remove orphaned staged files."""
+        if not self.journal_path.exists():
+            return
+        staged = {}
+        intents = {}
+        finished = set()
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn tail write: the intent was never made durable
+                    break
+                tx_id = record["tx"]
+                if record["type"] == "stage":
+                    staged.setdefault(tx_id, []).append(record["path"])
+                elif record["type"] == "intent":
+                    intents[tx_id] = record["ops"]
+                else:
+                    finished.add(tx_id)
+
+        replayed = rolled_back = 0
+        for tx_id, ops in intents.items():
+            if tx_id in finished:
+                continue
+            for op in ops:
+                _apply_op(op)
+            replayed += 1
+        for tx_id, paths in staged.items():
+            if tx_id in intents or tx_id in finished:
+                continue
+            for path in paths:
+                Path(path).unlink(missing_ok=True)
+            rolled_back += 1
+
+        if replayed or rolled_back:
+            logger.warning(f"[journal] Recovery replayed {replayed} and rolled back {rolled_back} transactions")
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.journal_path.unlink(missing_ok=True)
+            self._abandoned.clear()
@@ -0,0 +1,3 @@
+"""
+Pluggable storage backends.
+"""
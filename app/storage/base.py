@@ -0,0 +1,152 @@
+"""
+Storage backend interface.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, List, Optional
+
+
+@dataclass
+class ObjectStat:
+    """Metadata of a stored object."""
+    key: str
+    size: int
+    mtime: float
+    etag: str
+
+
+class StorageBackend(ABC):
+    """
+    Key/value file storage addressed by relative posix keys (``media/png/...``).
+
+    All operations are coroutines. Backends that hold connection pools keep
+    them on a private event loop thread, so callers on any thread (including
+    the synchronous upsert pipeline) go through submit()/blocking()/run().
+    blocking() waits on the calling thread and must not be used from an event
+    loop; coroutines await run() or stream() instead.
+    """
+
+    # Chunk size of read_range()
+    read_chunk_size = 1024 * 1024
+
+    # Whether keys map to files on the local filesystem (see local_path())
+    is_local = False
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    async def write(self, key: str, data: bytes) -> None:
+        """Create or overwrite an object (readers may observe a partial write)."""
+
+    @abstractmethod
+    async def replace(self, key: str, data: bytes) -> None:
+        """Atomically replace an object: readers see either the old or the new content."""
+
+    @abstractmethod
+    async def put_file(self, key: str, source: Path) -> None:
+        """Atomically store the content of a local file (local backends rename the source into place)."""
+
+    @abstractmethod
+    async def move(self, src_key: str, dst_key: str) -> None:
+        """Move an object to a new key."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete an object; returns False if it did not exist."""
+
+    @abstractmethod
+    async def list(self, prefix: str = "") -> List[ObjectStat]:
+        """List every object whose key starts with prefix."""
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[ObjectStat]:
+        """Get object metadata, or None if it does not exist."""
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        """Read a whole object; raises FileNotFoundError if it does not exist."""
+
+    @abstractmethod
+    def read_range(self, key: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Read ``length`` bytes (or up to the end) from ``start`` in chunks of at
+        most read_chunk_size; raises FileNotFoundError if the object does not exist.
+        """
+
+    async def close(self) -> None:
+        """Release connections."""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of a key for local backends, None otherwise."""
+        return None
+
+    # ------------------------------------------------------------------
+    # Event loop bridge
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._loop_thread = threading.Thread(
+                        target=loop.run_forever, name=f"storage-{type(self).__name__}", daemon=True
+                    )
+                    self._loop_thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule an operation on the backend's loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def blocking(self, coro: Awaitable[Any]) -> Any:
+        """Run an operation and wait for its result (from synchronous code)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self.submit(coro).result()
+        coro.close()
+        raise RuntimeError("StorageBackend.blocking() would stall a running event loop, await run() instead")
+
+    async def run(self, coro: Awaitable[Any]) -> Any:
+        """Run an operation from another event loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def stream(self, key: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Iterate read_range() from another event loop, one chunk per round trip."""
+        chunks = self.read_range(key, start, length)
+
+        async def next_chunk() -> Optional[bytes]:
+            try:
+                return await chunks.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        try:
+            while (chunk := await self.run(next_chunk())) is not None:
+                yield chunk
+        finally:
+            await self.run(chunks.aclose())
+
+    def shutdown(self) -> None:
+        """Close connections and stop the backend's loop."""
+        if self._loop is None:
+            return
+        self.blocking(self.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
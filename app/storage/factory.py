@@ -0,0 +1,33 @@
+"""
+Storage backend factory.
+"""
+
+from pathlib import Path
+
+from ..config import settings
+from .base import StorageBackend
+from .local import LocalStorage
+from .memory import MemoryStorage
+from .s3 import S3Storage
+
+STORAGE_BACKENDS = ("local", "memory", "s3")
+
+
+def create_storage(backend: str, root: Path) -> StorageBackend:
+    """Create a storage backend by name; ``root`` is used by the local backend."""
+    if backend == "local":
+        return LocalStorage(root)
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "s3":
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+            max_pool_connections=settings.s3_max_pool_connections
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
+
@@ -0,0 +1,121 @@
+"""
+Local filesystem storage backend.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from ..exceptions import FileOperationError
+from ..utils.file_utils import atomic_write_bytes, ensure_directory_exists, generate_etag
+from .base import ObjectStat, StorageBackend
+
+
+class LocalStorage(StorageBackend):
+    """Objects are files below a root directory."""
+
+    is_local = True
+
+    def __init__(self, root: Path):
+        super().__init__()
+        self.root = root
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        # Reject keys escaping the root (e.g. ".." segments)
+        if not path.is_relative_to(self.root.resolve()):
+            raise FileOperationError(f"Storage key escapes the storage root: {key}")
+        return path
+
+    def _stat(self, key: str, path: Path) -> Optional[ObjectStat]:
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            return None
+        return ObjectStat(key=key, size=stat_result.st_size, mtime=stat_result.st_mtime, etag=generate_etag(stat_result))
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self.local_path(key)
+        ensure_directory_exists(path.parent)
+        path.write_bytes(data)
+
+    def _replace(self, key: str, data: bytes) -> None:
+        path = self.local_path(key)
+        ensure_directory_exists(path.parent)
+        atomic_write_bytes(path, data)
+
+    def _put_file(self, key: str, source: Path) -> None:
+        path = self.local_path(key)
+        ensure_directory_exists(path.parent)
+        os.replace(source, path)
+
+    def _move(self, src_key: str, dst_key: str) -> None:
+        dst_path = self.local_path(dst_key)
+        ensure_directory_exists(dst_path.parent)
+        os.replace(self.local_path(src_key), dst_path)
+
+    def _delete(self, key: str) -> bool:
+        try:
+            self.local_path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _list(self, prefix: str) -> List[ObjectStat]:
+        # Walk only the deepest directory the prefix names
+        base_key = prefix.rpartition("/")[0]
+        base = self.local_path(base_key) if base_key else self.root
+        objects = []
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue
+                path = Path(dirpath) / filename
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix):
+                    stat = self._stat(key, path)
+                    if stat:
+                        objects.append(stat)
+        return objects
+
+    async def write(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, key, data)
+
+    async def replace(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._replace, key, data)
+
+    async def put_file(self, key: str, source: Path) -> None:
+        await asyncio.to_thread(self._put_file, key, source)
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        await asyncio.to_thread(self._move, src_key, dst_key)
+
+    async def delete(self, key: str) -> bool:
+        return await asyncio.to_thread(self._delete, key)
+
+    async def list(self, prefix: str = "") -> List[ObjectStat]:
+        return await asyncio.to_thread(self._list, prefix)
+
+    async def stat(self, key: str) -> Optional[ObjectStat]:
+        return await asyncio.to_thread(self._stat, key, self.local_path(key))
+
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.local_path(key).read_bytes)
+
+    async def read_range(self, key: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self.local_path(key), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = self.read_chunk_size if remaining is None else min(self.read_chunk_size, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
@@ -0,0 +1,62 @@
+"""
+In-memory storage backend (tests and benchmarks).
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .base import ObjectStat, StorageBackend
+
+
+class MemoryStorage(StorageBackend):
+    """Objects are kept in a dict; nothing touches the disk."""
+
+    def __init__(self):
+        super().__init__()
+        self._objects: Dict[str, Tuple[bytes, float]] = {}
+
+    def _object_stat(self, key: str) -> Optional[ObjectStat]:
+        item = self._objects.get(key)
+        if item is None:
+            return None
+        data, mtime = item
+        return ObjectStat(key=key, size=len(data), mtime=mtime, etag=f'"{hashlib.md5(data).hexdigest()}"')
+
+    async def write(self, key: str, data: bytes) -> None:
+        self._objects[key] = (bytes(data), time.time())
+
+    async def replace(self, key: str, data: bytes) -> None:
+        # Single dict assignment: already atomic
+        await self.write(key, data)
+
+    async def put_file(self, key: str, source: Path) -> None:
+        await self.write(key, source.read_bytes())
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        try:
+            self._objects[dst_key] = self._objects.pop(src_key)
+        except KeyError:
+            raise FileNotFoundError(src_key)
+
+    async def delete(self, key: str) -> bool:
+        return self._objects.pop(key, None) is not None
+
+    async def list(self, prefix: str = "") -> List[ObjectStat]:
+        return [self._object_stat(key) for key in sorted(self._objects) if key.startswith(prefix)]
+
+    async def stat(self, key: str) -> Optional[ObjectStat]:
+        return self._object_stat(key)
+
+    async def read(self, key: str) -> bytes:
+        try:
+            return self._objects[key][0]
+        except KeyError:
+            raise FileNotFoundError(key)
+
+    async def read_range(self, key: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        data = await self.read(key)
+        end = len(data) if length is None else min(len(data), start + length)
+        for offset in range(start, end, self.read_chunk_size):
+            yield data[offset:min(end, offset + self.read_chunk_size)]
@@ -0,0 +1,155 @@
+"""
+S3-compatible storage backend (AWS S3, MinIO, R2, ...).
+
+Requires the optional ``aiobotocore`` dependency. One client with a pooled
+HTTP connection pool is created lazily on the backend's event loop and
+shared by all operations.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from .base import ObjectStat, StorageBackend
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+    from botocore.exceptions import ClientError
+except ImportError:  # optional dependency
+    get_session = None
+
+_NOT_FOUND_CODES = ("404", "NoSuchKey", "NotFound")
+
+
+class S3Storage(StorageBackend):
+    """Objects live in an S3 bucket, optionally below a key prefix."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        max_pool_connections: int = 32
+    ):
+        if get_session is None:
+            raise RuntimeError("S3 storage requires the 'aiobotocore' package (install the 's3' extra)")
+        super().__init__()
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.max_pool_connections = max_pool_connections
+        self._client = None
+        self._client_context = None
+        self._client_lock: Optional[asyncio.Lock] = None
+
+    async def _get_client(self):
+        if self._client is not None:
+            return self._client
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                self._client_context = get_session().create_client(
+                    "s3",
+                    endpoint_url=self.endpoint_url,
+                    region_name=self.region,
+                    aws_access_key_id=self.access_key,
+                    aws_secret_access_key=self.secret_key,
+                    config=AioConfig(max_pool_connections=self.max_pool_connections),
+                )
+                self._client = await self._client_context.__aenter__()
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _to_stat(self, key: str, size: int, last_modified, etag: str) -> ObjectStat:
+        return ObjectStat(key=key, size=size, mtime=last_modified.timestamp(), etag=etag)
+
+    async def write(self, key: str, data: bytes) -> None:
+        client = await self._get_client()
+        await client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    async def replace(self, key: str, data: bytes) -> None:
+        # A PUT becomes visible all at once
+        await self.write(key, data)
+
+    async def put_file(self, key: str, source: Path) -> None:
+        client = await self._get_client()
+        with open(source, "rb") as f:
+            await client.put_object(Bucket=self.bucket, Key=self._key(key), Body=f)
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        client = await self._get_client()
+        await client.copy_object(
+            Bucket=self.bucket,
+            Key=self._key(dst_key),
+            CopySource={"Bucket": self.bucket, "Key": self._key(src_key)},
+        )
+        await client.delete_object(Bucket=self.bucket, Key=self._key(src_key))
+
+    async def delete(self, key: str) -> bool:
+        if await self.stat(key) is None:
+            return False
+        client = await self._get_client()
+        await client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return True
+
+    async def list(self, prefix: str = "") -> List[ObjectStat]:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        objects = []
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get("Contents", []):
+                objects.append(self._to_stat(
+                    item["Key"][len(self.prefix):], item["Size"], item["LastModified"], item["ETag"]
+                ))
+        return objects
+
+    async def stat(self, key: str) -> Optional[ObjectStat]:
+        client = await self._get_client()
+        try:
+            head = await client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _NOT_FOUND_CODES:
+                return None
+            raise
+        return self._to_stat(key, head["ContentLength"], head["LastModified"], head["ETag"])
+
+    async def read(self, key: str) -> bytes:
+        client = await self._get_client()
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _NOT_FOUND_CODES:
+                raise FileNotFoundError(key)
+            raise
+        async with response["Body"] as stream:
+            return await stream.read()
+
+    async def read_range(self, key: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        client = await self._get_client()
+        # Only the requested bytes leave the bucket
+        end = "" if length is None else start + length - 1
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _NOT_FOUND_CODES:
+                raise FileNotFoundError(key)
+            raise
+        async with response["Body"] as stream:
+            while chunk := await stream.read(self.read_chunk_size):
+                yield chunk
+
+    async def close(self) -> None:
+        if self._client_context is not None:
+            await self._client_context.__aexit__(None, None, None)
+            self._client = None
+            self._client_context = None
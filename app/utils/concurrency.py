@@ -0,0 +1,79 @@
+"""
+Concurrency utility functions.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """
+    Lock allowing many shared holders or a single exclusive holder.
+
+    Writers of individual posts take the lock shared so they do not block
+    each other; operations needing a point-in-time view of the whole vault
+    take it exclusive. Exclusive waiters block new shared holders so they
+    cannot be starved, and shared holders that had to wait are let in when
+    the exclusive holder releases, before any writer can take the lock
+    again, so jobs taking it exclusively batch after batch cannot starve
+    them either.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+        self._shared_waiting = 0
+        self._handoff = 0  # waiting shared holders admitted by the last exclusive release
+        self._releases = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Hold the lock in shared mode."""
+        with self._cond:
+            if self._exclusive or self._exclusive_waiting:
+                # Wait for the next exclusive release, which admits us
+                self._shared_waiting += 1
+                releases = self._releases
+                while self._releases == releases:
+                    self._cond.wait()
+                self._handoff -= 1
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._shared -= 1
+                if self._shared == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Hold the lock in exclusive mode."""
+        with self._cond:
+            self._exclusive_waiting += 1
+            try:
+                while self._exclusive or self._shared or self._handoff:
+                    self._cond.wait()
+            except BaseException:
+                # Shared holders may be waiting on us only
+                self._admit_shared()
+                raise
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._admit_shared()
+
+    def _admit_shared(self) -> None:
+        """Let in every waiting shared holder (caller holds _cond)."""
+        self._releases += 1
+        self._handoff += self._shared_waiting
+        self._shared_waiting = 0
+        self._cond.notify_all()
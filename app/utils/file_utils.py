@@ -2,12 +2,15 @@
 File utility functions.
 """
 
-import base64
+import hashlib
+import os
 import shutil
+import uuid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from loguru import logger
 from ..exceptions import FileOperationError
+from .frontmatter import render_frontmatter
 
 
 def ensure_directory_exists(path: Path) -> None:
@@ -18,12 +21,28 @@ def ensure_directory_exists(path: Path) -> None:
         raise FileOperationError(f"Failed to create directory {path}: {e}")
 
 
+def atomic_write_bytes(file_path: Path, data: bytes) -> None:
+    """
+    Write bytes to a temporary file and atomically replace the target.
+    
+    Readers (and hard-linked export snapshots) never observe a partially
+    written file.
+    """
+    tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def write_text_file(file_path: Path, content: str, encoding: str = "utf-8") -> None:
     """Write text content to file."""
     try:
         ensure_directory_exists(file_path.parent)
-        with open(file_path, "w", encoding=encoding) as f:
-            f.write(content)
+        atomic_write_bytes(file_path, content.encode(encoding))
         logger.info(f"Wrote text file: {file_path}")
     except Exception as e:
         raise FileOperationError(f"Failed to write text file {file_path}: {e}")
@@ -33,20 +52,27 @@ def write_binary_file(file_path: Path, data: bytes) -> None:
     """Write binary data to file."""
     try:
         ensure_directory_exists(file_path.parent)
-        with open(file_path, "wb") as f:
-            f.write(data)
+        atomic_write_bytes(file_path, data)
         logger.info(f"Wrote binary file: {file_path}")
     except Exception as e:
         raise FileOperationError(f"Failed to write binary file {file_path}: {e}")
 
 
-def decode_base64_and_write(file_path: Path, base64_data: str) -> None:
-    """Decode base64 data and write to file."""
-    try:
-        decoded_data = base64.b64decode(base64_data)
-        write_binary_file(file_path, decoded_data)
-    except Exception as e:
-        raise FileOperationError(f"Failed to decode and write base64 data to {file_path}: {e}")
+def hash_file(file_path: Path) -> Tuple[str, int]:
+    """Compute the sha256 hex digest and size of a file."""
+    with open(file_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return digest, os.fstat(f.fileno()).st_size
+
+
+def generate_etag(stat_result: os.stat_result) -> str:
+    """
+    Generate a strong ETag from file metadata.
+    
+    Files are only ever replaced atomically, so a new inode / mtime / size
+    triple means new content.
+    """
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
 
 
 def delete_file(file_path: Path) -> bool:
@@ -76,11 +102,5 @@ def delete_directory(dir_path: Path) -> bool:
 
 
 def generate_frontmatter(data: Dict[str, Any]) -> str:
-    """Generate frontmatter string from data dictionary."""
-    frontmatter = ["---"]
-    for k, v in data.items():
-        if k not in ("content", "attachments", "filename"):
-            value = v if v is not None else ""
-            frontmatter.append(f"{k}: {value}")
-    frontmatter.append("---\n")
-    return "\n".join(frontmatter) 
\ No newline at end of file
+    """Generate YAML frontmatter string from post data."""
+    return render_frontmatter(data)
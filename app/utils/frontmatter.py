@@ -0,0 +1,229 @@
+"""
+YAML frontmatter rendering and parsing.
+
+The renderer is compiled once from a pydantic schema's fields into a fixed
+sequence of per-field emitters, so rendering a post is a single pass over
+known keys with no type inspection. Strings are always emitted as YAML
+double-quoted scalars using only JSON-compatible escapes, which lets the
+parser read our own output back with ``json.loads`` per value and fall back
+to PyYAML only for hand-edited frontmatter.
+"""
+
+import json
+import re
+import typing
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+import yaml
+from pydantic import BaseModel
+
+# Fields of the request schema that are not frontmatter
+EXCLUDED_FIELDS = ("content", "attachments")
+
+_ESCAPES = {
+    "\\": "\\\\",
+    '"': '\\"',
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+}
+_NEEDS_ESCAPE = re.compile(r'[\\"\x00-\x1f\x7f\u0085\u2028\u2029]')
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([Tt ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([Zz]|[+-]\d{2}:?\d{2})?)?$")
+_LINE_PATTERN = re.compile(r"^([A-Za-z_][\w-]*):(?: (.*))?$")
+
+
+def _escape_char(match: "re.Match[str]") -> str:
+    char = match.group(0)
+    return _ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+
+def quote_string(value: str) -> str:
+    """Emit a YAML double-quoted scalar (also a valid JSON string)."""
+    return '"' + _NEEDS_ESCAPE.sub(_escape_char, value) + '"'
+
+
+def _emit_str(value: Any) -> str:
+    if value is None:
+        return '""'
+    return quote_string(str(value))
+
+
+def _is_iso_date(text: str) -> bool:
+    # The pattern only checks the shape; "2024-13-45" must not reach YAML unquoted
+    if not _DATE_PATTERN.match(text):
+        return False
+    try:
+        if len(text) == 10:
+            date.fromisoformat(text)
+        else:
+            datetime.fromisoformat(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _emit_date(value: Any) -> str:
+    # Unquoted ISO dates are parsed as timestamps by Hugo; anything else is a string
+    text = "" if value is None else str(value)
+    if _is_iso_date(text):
+        return text
+    return quote_string(text)
+
+
+def _emit_bool(value: Any) -> str:
+    return "true" if value else "false"
+
+
+def _emit_list(value: Any) -> str:
+    if not value:
+        return "[]"
+    if isinstance(value, str):
+        value = [value]
+    return "[" + ", ".join(quote_string(str(item)) for item in value) + "]"
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _emitter_for(name: str, annotation: Any) -> Callable[[Any], str]:
+    annotation = _unwrap_optional(annotation)
+    if annotation is bool:
+        return _emit_bool
+    if typing.get_origin(annotation) in (list, List):
+        return _emit_list
+    if name == "date":
+        return _emit_date
+    return _emit_str
+
+
+class FrontmatterRenderer:
+    """Frontmatter emitter specialized for one schema's fields."""
+
+    def __init__(self, fields: Iterable[Tuple[str, Callable[[Any], str]]]):
+        self._fields = tuple((f"{name}: ", name, emit) for name, emit in fields)
+
+    @classmethod
+    def compile(cls, schema: Type[BaseModel], exclude: Iterable[str] = EXCLUDED_FIELDS) -> "FrontmatterRenderer":
+        """Build a renderer from a pydantic model's declared fields (in declaration order)."""
+        excluded = set(exclude)
+        return cls(
+            (name, _emitter_for(name, field.annotation))
+            for name, field in schema.model_fields.items()
+            if name not in excluded
+        )
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """Render a complete frontmatter block (including delimiters)."""
+        get = data.get
+        lines = ["---"]
+        lines.extend(prefix + emit(get(name)) for prefix, name, emit in self._fields)
+        lines.append("---\n")
+        return "\n".join(lines)
+
+    def render_field(self, name: str, value: Any) -> str:
+        """Render a single `key: value` line."""
+        for prefix, field_name, emit in self._fields:
+            if field_name == name:
+                return prefix + emit(value)
+        return f"{name}: {_emit_str(value)}"
+
+
+_post_renderer: Optional[FrontmatterRenderer] = None
+
+
+def get_post_renderer() -> FrontmatterRenderer:
+    """Get the renderer compiled from PostRequestSchema (compiled on first use)."""
+    global _post_renderer
+    if _post_renderer is None:
+        from ..schemas.post import PostRequestSchema
+        _post_renderer = FrontmatterRenderer.compile(PostRequestSchema)
+    return _post_renderer
+
+
+def render_frontmatter(data: Dict[str, Any]) -> str:
+    """Render post frontmatter from request data."""
+    return get_post_renderer().render(data)
+
+
+def _parse_value(raw: str) -> Any:
+    if not raw:
+        return None
+    first = raw[0]
+    if first == '"' or (first == "[" and raw[1:2] in ('"', "]")):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            pass
+    elif raw in ("true", "True"):
+        return True
+    elif raw in ("false", "False"):
+        return False
+    elif first not in "'[{&*!|>%@`":
+        # Plain scalar: keep as text (dates stay strings, like the rest of the service expects)
+        return raw
+    return yaml.safe_load(raw)
+
+
+def split_frontmatter(text: str) -> Tuple[Optional[str], str]:
+    """Split a post into its raw frontmatter header and body."""
+    if not text.startswith("---"):
+        return None, text
+    end = text.find("\n---", 3)
+    if end == -1:
+        return None, text
+    body_start = text.find("\n", end + 4)
+    body = text[body_start + 1:] if body_start != -1 else ""
+    return text[4:end], body
+
+
+def parse_frontmatter_header(header: str) -> Dict[str, Any]:
+    """Parse a frontmatter header; fast path for our own output, PyYAML otherwise."""
+    fields: Dict[str, Any] = {}
+    for line in header.split("\n"):
+        if not line:
+            continue
+        match = _LINE_PATTERN.match(line)
+        if not match:
+            # Block scalars, nested mappings, comments...: let PyYAML handle it
+            try:
+                loaded = yaml.safe_load(header)
+            except yaml.YAMLError:
+                return fields
+            return loaded if isinstance(loaded, dict) else {}
+        try:
+            fields[match.group(1)] = _parse_value((match.group(2) or "").strip())
+        except yaml.YAMLError:
+            fields[match.group(1)] = match.group(2)
+    return fields
+
+
+def parse_frontmatter(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split a post into its parsed frontmatter fields and body."""
+    header, body = split_frontmatter(text)
+    if header is None:
+        return {}, text
+    return parse_frontmatter_header(header), body
+
+
+def replace_frontmatter_field(text: str, key: str, value: Any) -> str:
+    """Replace (or add) a single field in a post's frontmatter, leaving the body untouched."""
+    header, _ = split_frontmatter(text)
+    if header is None:
+        return text
+    end = 4 + len(header)
+    new_line = get_post_renderer().render_field(key, value)
+    lines = header.split("\n")
+    for i, line in enumerate(lines):
+        match = _LINE_PATTERN.match(line)
+        if match and match.group(1) == key:
+            lines[i] = new_line
+            break
+    else:
+        lines.append(new_line)
+    return "---\n" + "\n".join(lines) + text[end:]
@@ -0,0 +1,84 @@
+"""
+JSON decoding that keeps large string values as views of the input.
+
+``loads_with_views`` parses a JSON document from bytes like ``json.loads``,
+except that long, escape-free ASCII values of one key (base64 attachment
+data) come back as ``memoryview`` slices of the input instead of ``str``
+copies. Those values are located with ``bytes.find`` and checked with
+``bytes.translate`` (no per-character Python work), swapped for short
+placeholders, and the rest of the document, now small, goes through the
+C JSON decoder as usual.
+"""
+
+import json
+import re
+import uuid
+from typing import Any, List
+
+# Printable ASCII other than the quote and the escape character
+_PLAIN_CHARS = bytes(c for c in range(0x20, 0x80) if c not in b'"\\')
+_CHECK_CHUNK = 1 << 20
+
+_KEY_SEPARATOR = re.compile(rb'[ \t\n\r]*:[ \t\n\r]*"')
+
+
+def _is_plain(data: bytes, start: int, end: int) -> bool:
+    """Whether data[start:end] is printable ASCII without quotes or escapes."""
+    for offset in range(start, end, _CHECK_CHUNK):
+        if data[offset:min(offset + _CHECK_CHUNK, end)].translate(None, _PLAIN_CHARS):
+            return False
+    return True
+
+
+def _is_escaped(data: bytes, quote: int) -> bool:
+    """Whether the quote at data[quote] is preceded by an odd number of backslashes."""
+    run = quote
+    while run > 0 and data[run - 1] == 0x5C:
+        run -= 1
+    return (quote - run) % 2 == 1
+
+
+def loads_with_views(data: bytes, key: str, min_view: int = 64 * 1024) -> Any:
+    """
+    Parse a JSON document, returning long ASCII values of key as memoryviews.
+
+    key must be plain ASCII. The views reference data, which must not be
+    modified while they are in use.
+    """
+    token = f'"{key}"'.encode("ascii")
+    views: List[memoryview] = []
+    pieces: List[bytes] = []
+    # Random per call, so no string in the document can pass for a placeholder
+    marker = uuid.uuid4().hex
+    copied = 0
+    pos = data.find(token)
+    while pos != -1:
+        # An unescaped quote followed by `key":` can only open an object key
+        separator = None if _is_escaped(data, pos) else _KEY_SEPARATOR.match(data, pos + len(token))
+        if separator is None:
+            pos = data.find(token, pos + 1)
+            continue
+        start = separator.end()
+        end = data.find(b'"', start)
+        if end == -1:
+            break
+        if end - start >= min_view and _is_plain(data, start, end):
+            pieces.append(data[copied:start])
+            pieces.append(f"\\u0000{marker}:{len(views)}".encode("ascii"))
+            views.append(memoryview(data)[start:end])
+            copied = end
+        pos = data.find(token, end + 1)
+
+    if not views:
+        return json.loads(data)
+    pieces.append(data[copied:])
+
+    prefix = f"\x00{marker}:"
+
+    def restore(obj: dict) -> dict:
+        value = obj.get(key)
+        if type(value) is str and value.startswith(prefix):
+            obj[key] = views[int(value[len(prefix):])]
+        return obj
+
+    return json.loads(b"".join(pieces), object_hook=restore)
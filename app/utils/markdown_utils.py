@@ -0,0 +1,156 @@
+"""
+Markdown utility functions.
+
+Obsidian specific syntax (embeds, wikilinks, heading anchors) is rewritten in
+a single left-to-right pass over the content so that large notes stay linear
+in their size.
+"""
+
+import re
+import unicodedata
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Fence opening/closing candidates; fenced blocks are found in one pass over
+# these lines, so stray unclosed fences cannot make the scan quadratic.
+_FENCE_LINE_PATTERN = re.compile(r"^(`{3,}|~{3,})([^\n]*)", re.MULTILINE)
+
+# One compiled pattern, tried at every position outside fenced blocks,
+# matches the tokens we care about. Code spans are matched (and emitted
+# unchanged) so that wikilink-looking text inside code is never rewritten.
+_TOKEN_PATTERN = re.compile(
+    r"(?P<code>`[^`\n]+`)"
+    r"|(?P<embed>!?)\[\[(?P<target>[^\[\]\n|#]*)(?:#(?P<heading>[^\[\]\n|]*))?(?:\|(?P<alias>[^\[\]\n]*))?\]\]"
+)
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+)(?:\s*x\s*(\d+))?\s*$")
+_ANCHOR_STRIP_PATTERN = re.compile(r"[^\w\- ]+")
+
+LinkResolver = Callable[[str], Optional[str]]
+
+
+def _split_fenced_blocks(content: str) -> Iterator[Tuple[str, bool]]:
+    """
+    Split content into (segment, is_fenced_code) pieces.
+
+    A fence is closed by a line of at least as many of the same fence
+    characters and nothing else; an unclosed fence runs to the end of the
+    content, as in CommonMark.
+    """
+    pos = 0
+    open_mark = None
+    block_start = 0
+    for match in _FENCE_LINE_PATTERN.finditer(content):
+        mark, rest = match.group(1), match.group(2)
+        if open_mark is None:
+            yield content[pos:match.start()], False
+            open_mark = mark
+            block_start = match.start()
+        elif mark[0] == open_mark[0] and len(mark) >= len(open_mark) and not rest.strip():
+            yield content[block_start:match.end()], True
+            pos = match.end()
+            open_mark = None
+    if open_mark is None:
+        yield content[pos:], False
+    else:
+        yield content[block_start:], True
+
+
+def anchorize(heading: str) -> str:
+    """Convert a heading into the anchor id Hugo generates for it."""
+    text = unicodedata.normalize("NFKC", heading).strip().lower()
+    text = _ANCHOR_STRIP_PATTERN.sub("", text)
+    return text.replace(" ", "-")
+
+
+def _shortcode_param(value: str) -> str:
+    """Quote a value as a Hugo shortcode parameter."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class ObsidianMarkdownTransformer:
+    """
+    Single-pass transformer for Obsidian flavoured markdown.
+
+    - ``![[file.png]]`` / ``![[file.png|300]]`` / ``![[file.png|300x200]]``
+      become image references using the attachment map. Sized embeds use
+      Hugo's ``figure`` shortcode, since goldmark drops raw ``<img>`` HTML
+      unless ``markup.goldmark.renderer.unsafe`` is enabled.
+    - ``[[Note]]`` / ``[[Note|alias]]`` / ``[[Note#Heading]]`` become links
+      resolved through ``resolve_link`` (title -> post URL).
+    - ``![[Note#Heading]]`` note embeds cannot be transcluded by Hugo, so they
+      are rendered as links to the embedded note/heading.
+    - ``[[#Heading]]`` becomes a link to an anchor in the current post.
+
+    Tokens that cannot be resolved are left untouched.
+    """
+
+    def __init__(self, attachment_map: Dict[str, str], resolve_link: Optional[LinkResolver] = None):
+        self.attachment_map = attachment_map
+        self.resolve_link = resolve_link
+
+    def transform(self, content: str) -> str:
+        """Transform the given markdown content."""
+        if "[[" not in content:
+            return content
+        return "".join(
+            segment if is_code or "[[" not in segment else _TOKEN_PATTERN.sub(self._replace, segment)
+            for segment, is_code in _split_fenced_blocks(content)
+        )
+
+    def _replace(self, match: "re.Match[str]") -> str:
+        if match.group("code") is not None:
+            return match.group(0)
+
+        target = match.group("target").strip()
+        heading = match.group("heading")
+        alias = match.group("alias")
+        is_embed = bool(match.group("embed"))
+
+        if is_embed and heading is None:
+            image_path = self.attachment_map.get(target)
+            if image_path:
+                return self._render_image(target, image_path, alias)
+
+        return self._render_link(match.group(0), target, heading, alias)
+
+    def _render_image(self, name: str, path: str, hint: Optional[str]) -> str:
+        size = _SIZE_PATTERN.match(hint) if hint else None
+        if size:
+            width, height = size.group(1), size.group(2)
+            params = f'src={_shortcode_param(path)} alt={_shortcode_param(name)} width="{width}"'
+            if height:
+                params += f' height="{height}"'
+            return f"{{{{< figure {params} >}}}}"
+        alt = hint.strip() if hint else ""
+        return f"![{alt}]({path})"
+
+    def _render_link(self, original: str, target: str, heading: Optional[str], alias: Optional[str]) -> str:
+        anchor = f"#{anchorize(heading)}" if heading else ""
+
+        if not target:
+            # Link to a heading in the current post
+            if not anchor:
+                return original
+            url = anchor
+        else:
+            resolved = self.resolve_link(target) if self.resolve_link else None
+            if not resolved:
+                return original
+            url = resolved + anchor
+
+        if alias and alias.strip():
+            text = alias.strip()
+        elif target and heading:
+            text = f"{target} > {heading.strip()}"
+        else:
+            text = target or heading.strip()
+        return f"[{text}]({url})"
+
+
+def render_obsidian_markdown(
+    content: str,
+    attachment_map: Dict[str, str],
+    resolve_link: Optional[LinkResolver] = None
+) -> str:
+    """Convert Obsidian syntax in content to Hugo compatible markdown."""
+    return ObsidianMarkdownTransformer(attachment_map, resolve_link).transform(content)
@@ -0,0 +1,90 @@
+"""
+Text patch application (unified diffs and splice operations).
+"""
+
+import re
+from typing import List, Sequence, Tuple
+
+from ..exceptions import PatchConflictError
+
+_HUNK_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NO_NEWLINE_MARKER = "\\"
+
+
+def apply_splices(text: str, ops: Sequence[Tuple[int, int, str]]) -> str:
+    """
+    Apply (offset, delete, insert) splices to text.
+
+    Offsets are code point positions in the original text; ops must be
+    sorted and must not overlap.
+    """
+    parts: List[str] = []
+    pos = 0
+    for offset, delete, insert in ops:
+        if offset < pos:
+            raise PatchConflictError(f"Splice at offset {offset} overlaps the previous one")
+        if offset + delete > len(text):
+            raise PatchConflictError(f"Splice at offset {offset} deleting {delete} runs past the end of the content")
+        parts.append(text[pos:offset])
+        parts.append(insert)
+        pos = offset + delete
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def apply_unified_diff(text: str, diff: str) -> str:
+    """
+    Apply a unified diff (``diff -u`` / ``git diff`` output for one file) to text.
+
+    Hunks are applied at their stated positions without fuzz: the caller has
+    already checked that the diff was made against this exact text, so any
+    mismatching context or removed line is a conflict.
+    """
+    lines = text.splitlines(keepends=True)
+    diff_lines = diff.splitlines(keepends=True)
+    out: List[str] = []
+    pos = 0
+    i = 0
+    while i < len(diff_lines):
+        match = _HUNK_PATTERN.match(diff_lines[i])
+        i += 1
+        if not match:
+            # File headers (diff --git, index, ---, +++) before the first hunk
+            continue
+
+        old_start = int(match.group(1))
+        old_len = int(match.group(2)) if match.group(2) is not None else 1
+        new_len = int(match.group(4)) if match.group(4) is not None else 1
+        # A pure insertion names the line after which it goes
+        start = old_start - 1 if old_len else old_start
+        if start < pos or start > len(lines):
+            raise PatchConflictError(f"Hunk at line {old_start} is out of order or out of range")
+        out.extend(lines[pos:start])
+        pos = start
+
+        old_seen = new_seen = 0
+        while (old_seen < old_len or new_seen < new_len) and i < len(diff_lines):
+            line = diff_lines[i]
+            i += 1
+            tag, body = (line[:1], line[1:]) if line not in ("\n", "\r\n") else (" ", line)
+            if i < len(diff_lines) and diff_lines[i].startswith(_NO_NEWLINE_MARKER):
+                body = body.rstrip("\r\n")
+                i += 1
+            if tag in (" ", "-"):
+                if pos >= len(lines) or lines[pos] != body:
+                    raise PatchConflictError(f"Diff does not apply at line {pos + 1}")
+                pos += 1
+                old_seen += 1
+                if tag == " ":
+                    out.append(body)
+                    new_seen += 1
+            elif tag == "+":
+                out.append(body)
+                new_seen += 1
+            else:
+                raise PatchConflictError(f"Malformed diff line: {line.rstrip()!r}")
+        if old_seen != old_len or new_seen != new_len:
+            raise PatchConflictError(f"Hunk at line {old_start} is truncated")
+
+    out.extend(lines[pos:])
+    return "".join(out)
@@ -3,9 +3,42 @@ Validation utility functions.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from ..exceptions import MissingRequiredFieldError, InvalidAttachmentPathError
 
+ATTACHMENT_PATH_PATTERN = re.compile(r"media/([a-z0-9]+)/([^/]+)/([^/]+)-(\d{13})\.([a-z0-9]+)")
+
+
+class AttachmentPath:
+    """Components of a media/{ext}/{postId}/{postId}-{timestamp}.{ext} attachment path."""
+    
+    __slots__ = ("path", "ext", "post_id", "timestamp", "file_ext")
+    
+    def __init__(self, path: str, ext: str, post_id: str, timestamp: str, file_ext: str):
+        self.path = path  # Normalized (lowercase)
+        self.ext = ext
+        self.post_id = post_id
+        self.timestamp = timestamp
+        self.file_ext = file_ext
+    
+    def storage_key(self, post_id: str) -> str:
+        """Key of the attachment when stored under post_id (relative to static_root)."""
+        return f"media/{self.ext}/{post_id}/{post_id}-{self.timestamp}.{self.file_ext}"
+    
+    def blog_path(self, post_id: str) -> str:
+        """URL of the attachment on the blog when stored under post_id."""
+        return f"/blog/{self.storage_key(post_id)}"
+
+
+def parse_attachment_path(path: str) -> Optional[AttachmentPath]:
+    """Parse an attachment path; None if it does not have the expected format."""
+    normalized = path.lower()
+    match = ATTACHMENT_PATH_PATTERN.fullmatch(normalized)
+    if not match:
+        return None
+    ext, post_id, _, timestamp, file_ext = match.groups()
+    return AttachmentPath(normalized, ext, post_id, timestamp, file_ext)
+
 
 def validate_required_frontmatter_fields(data: Dict[str, Any]) -> None:
     """Validate that all required frontmatter fields are present."""
@@ -23,20 +56,18 @@ def validate_required_frontmatter_fields(data: Dict[str, Any]) -> None:
 
 def validate_attachment_path_format(path: str) -> bool:
     """Validate attachment path format."""
-    pattern = r"media/([a-z0-9]+)/([^/]+)/([^/]+)-(\d{13})\.([a-z0-9]+)"
-    return bool(re.match(pattern, path.lower()))
+    return bool(ATTACHMENT_PATH_PATTERN.fullmatch(path.lower()))
 
 
 def extract_attachment_path_components(path: str) -> Dict[str, str]:
     """Extract components from attachment path."""
-    pattern = r"media/([a-z0-9]+)/([^/]+)/([^/]+)-(\d{13})\.([a-z0-9]+)"
-    match = re.match(pattern, path.lower())
-    if not match:
+    parsed = parse_attachment_path(path)
+    if parsed is None:
         raise InvalidAttachmentPathError(f"Invalid attachment path format: {path}")
     
     return {
-        "ext": match.group(1),
-        "post_id": match.group(2),
-        "timestamp": match.group(4),
-        "file_ext": match.group(5)
+        "ext": parsed.ext,
+        "post_id": parsed.post_id,
+        "timestamp": parsed.timestamp,
+        "file_ext": parsed.file_ext
     } 
\ No newline at end of file
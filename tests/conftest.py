@@ -0,0 +1,48 @@
+"""
+Shared test setup.
+
+Settings are read once when app.config is imported, so the vault roots are
+pointed at a scratch directory before any test imports the app.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TEST_ROOT = Path(tempfile.mkdtemp(prefix="obsidian-sync-tests-"))
+
+os.environ.update({
+    "OBSIDIAN_SYNC_CONTENT_ROOT": str(TEST_ROOT / "content"),
+    "OBSIDIAN_SYNC_STATIC_ROOT": str(TEST_ROOT / "static"),
+    "OBSIDIAN_SYNC_DATA_ROOT": str(TEST_ROOT / "data"),
+    "OBSIDIAN_SYNC_WATCHER_ENABLED": "false",
+    "OBSIDIAN_SYNC_LOG_LEVEL": "WARNING",
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    """Fresh content_root/static_root/data_root for services constructed in the test."""
+    from app.config import settings
+
+    roots = {
+        "content_root": tmp_path / "content",
+        "static_root": tmp_path / "static",
+        "data_root": tmp_path / "data",
+    }
+    for name, path in roots.items():
+        path.mkdir()
+        monkeypatch.setattr(settings, name, path)
+    return settings
+
+
+def post_payload(title: str, **fields) -> dict:
+    """Minimal body of POST /api/posts."""
+    return {"title": title, "date": "2024-01-01T00:00:00+08:00", "categories": "Blog", **fields}
@@ -0,0 +1,111 @@
+"""
+Tests for request body admission control.
+"""
+
+import asyncio
+
+import httpx
+
+from app.middleware.admission import AdmissionControlMiddleware, MemoryBudget
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    async def scenario():
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(80)
+        admitted = []
+
+        async def request(name, amount):
+            assert await budget.acquire(amount, timeout=5)
+            admitted.append(name)
+
+        large = asyncio.create_task(request("large", 60))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(request("small", 10))
+        await asyncio.sleep(0)
+        # There is room for the small request, but it queued behind the large one
+        assert (budget.waiting, admitted) == (2, [])
+        assert not budget.try_acquire(10)
+
+        await budget.release(80)
+        await asyncio.gather(large, small)
+        assert admitted == ["large", "small"]
+        assert budget.in_use == 70
+
+    run(scenario())
+
+
+def test_timed_out_waiter_lets_the_queue_move_on():
+    async def scenario():
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(50)
+
+        large = asyncio.create_task(budget.acquire(100, timeout=0.01))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(budget.acquire(40, timeout=5))
+
+        assert not await large
+        assert await small
+        assert (budget.in_use, budget.waiting) == (90, 0)
+
+    run(scenario())
+
+
+def test_cancelled_waiter_is_withdrawn():
+    async def scenario():
+        budget = MemoryBudget(100)
+        assert budget.try_acquire(100)
+        waiter = asyncio.create_task(budget.acquire(10, timeout=5))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert budget.waiting == 0
+        await budget.release(100)
+        assert budget.in_use == 0
+        assert not await budget.acquire(101, timeout=5)
+
+    run(scenario())
+
+
+async def echo(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def post(app, **kwargs):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/", **kwargs)
+    return run(send())
+
+
+def test_middleware_rejects_oversized_and_busy_requests():
+    budget = MemoryBudget(100)
+    app = AdmissionControlMiddleware(echo, budget=budget, max_body_size=150, wait_timeout=0.01)
+
+    assert post(app, content=b"x" * 50).content == b"x" * 50
+    assert post(app, content=b"x" * 200).status_code == 413
+
+    assert budget.try_acquire(60)
+    busy = post(app, content=b"x" * 50)
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+
+    async def chunks():
+        yield b"x" * 30
+        yield b"x" * 30
+    assert post(app, content=chunks()).status_code == 503
+    assert (budget.admitted, budget.rejected_too_large, budget.rejected_busy) == (2, 1, 2)
+    assert budget.in_use == 60
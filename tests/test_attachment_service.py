@@ -0,0 +1,60 @@
+"""
+Tests for parallel attachment staging.
+"""
+
+import base64
+import threading
+
+import pytest
+
+from app.exceptions import AttachmentWriteError
+from app.schemas.post_record import AttachmentRecord
+from app.services.attachment_service import AttachmentService
+from app.services.write_journal import WriteJournal
+
+
+def record(number, data=None):
+    path = f"media/png/new/new-{1700000000000 + number}.png"
+    payload = data if data is not None else base64.b64encode(bytes([number]) * 100).decode()
+    return AttachmentRecord(f"image-{number}.png", path, payload, None)
+
+
+def make_journal(settings) -> WriteJournal:
+    return WriteJournal(journal_dir=settings.data_root / "journal", durability="none")
+
+
+def test_attachments_are_staged_in_parallel(vault, monkeypatch):
+    service = AttachmentService()
+    attachments = service.validate_attachments([record(number) for number in range(4)])
+    decode = service._decode
+    barrier = threading.Barrier(4, timeout=5)
+
+    def decode_together(att_path, att_data):
+        # Only passes if all four decodes run at the same time
+        barrier.wait()
+        return decode(att_path, att_data)
+
+    monkeypatch.setattr(service, "_decode", decode_together)
+
+    with make_journal(vault).transaction() as tx:
+        results = service.stage_attachments(tx, attachments, "post")
+
+    assert [result.key for result in results] == [
+        f"media/png/post/post-{1700000000000 + number}.png" for number in range(4)
+    ]
+    for number, result in enumerate(results):
+        assert result.size == 100
+        assert result.target.read_bytes() == bytes([number]) * 100
+
+
+def test_one_failure_aborts_every_attachment(vault):
+    service = AttachmentService()
+    attachments = service.validate_attachments([record(0), record(1, data="not base64!"), record(2)])
+
+    with pytest.raises(AttachmentWriteError) as error:
+        with make_journal(vault).transaction() as tx:
+            service.stage_attachments(tx, attachments, "post")
+
+    assert [result.ok for result in error.value.results] == [True, False, True]
+    # Staged temp files are removed with the aborted transaction
+    assert [path for path in vault.static_root.rglob("*") if path.is_file()] == []
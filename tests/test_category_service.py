@@ -0,0 +1,126 @@
+"""
+Tests for bulk category rename/merge jobs.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.exceptions import InvalidCategoryNameError
+from app.services.category_service import JOB_COMPLETED, JOB_RUNNING, CategoryService
+from app.services.change_log import OP_MOVE, ChangeLog
+from app.services.post_catalog import PostCatalog
+from app.services.search_service import SearchIndex
+from app.services.write_journal import WriteJournal
+from app.utils.concurrency import ReadWriteLock
+from app.utils.frontmatter import parse_frontmatter
+
+
+def write_post(settings, category, post_id, title=None):
+    path = settings.content_root / category / f"{post_id}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f'---\ntitle: "{title or post_id}"\ncategories: "{category}"\n---\nBody of {post_id}\n')
+    return path
+
+
+def make_service(settings) -> CategoryService:
+    return CategoryService(
+        vault_lock=ReadWriteLock(),
+        catalog=PostCatalog(),
+        search_index=SearchIndex(),
+        change_log=ChangeLog(),
+        journal=WriteJournal(journal_dir=settings.data_root / "journal", durability="none"),
+    )
+
+
+def wait_for(job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None:
+        assert time.monotonic() < deadline, "category job did not finish"
+        time.sleep(0.005)
+    return job
+
+
+def test_rename_moves_and_rewrites_posts(vault):
+    for index in range(5):
+        write_post(vault, "old", f"post-{index}")
+    service = make_service(vault)
+    service.change_log.cursor  # bootstrap the log with the posts as they are
+
+    job = wait_for(service.start_rename("old", "New Name"))
+
+    assert job.status == JOB_COMPLETED
+    assert (job.total, job.done, job.failed) == (5, 5, 0)
+    assert not (vault.content_root / "old").exists()
+    for index in range(5):
+        fields, body = parse_frontmatter((vault.content_root / "new_name" / f"post-{index}.md").read_text())
+        assert fields["categories"] == "New Name"
+        assert body == f"Body of post-{index}\n"
+        assert service.catalog.get(f"post-{index}").category == "new_name"
+    changes, _, _ = service.change_log.changes_since(0, 100)
+    assert sum(1 for entry in changes if entry.op == OP_MOVE) == 5
+
+
+def test_merge_into_existing_category(vault):
+    write_post(vault, "a", "from-a")
+    write_post(vault, "b", "in-b")
+    service = make_service(vault)
+
+    job = wait_for(service.start_rename("a", "b"))
+
+    assert job.merged
+    assert sorted(path.name for path in (vault.content_root / "b").iterdir()) == ["from-a.md", "in-b.md"]
+
+
+def test_links_to_moved_posts_are_rewritten(vault):
+    write_post(vault, "old", "target")
+    referrer = write_post(vault, "blog", "referrer")
+    referrer.write_text(referrer.read_text() + "[Target](/blog/old/target/#intro) [Other](/blog/old/other/)\n")
+    service = make_service(vault)
+
+    wait_for(service.start_rename("old", "new"))
+
+    assert "[Target](/blog/new/target/#intro) [Other](/blog/old/other/)" in referrer.read_text()
+
+
+@pytest.mark.parametrize("name", ["", "  ", "../outside", "a/b", ".hidden", "..", "a\\b"])
+def test_rejects_names_outside_content_root(vault, name):
+    write_post(vault, "blog", "post")
+    service = make_service(vault)
+    with pytest.raises(InvalidCategoryNameError):
+        service.start_rename("blog", name)
+
+
+def test_vault_lock_is_released_between_batches(vault, monkeypatch):
+    for index in range(60):
+        write_post(vault, "old", f"post-{index:02d}")
+    monkeypatch.setattr(vault, "category_batch_size", 5)
+    service = make_service(vault)
+    stage_post = service._stage_post
+
+    def slow_stage_post(*args):
+        time.sleep(0.01)
+        return stage_post(*args)
+
+    monkeypatch.setattr(service, "_stage_post", slow_stage_post)
+    job = service.start_rename("old", "new")
+    while job.done == 0:
+        time.sleep(0.001)
+
+    # An upsert takes the lock shared; it must get in while the job is still running
+    acquired = threading.Event()
+
+    def upsert():
+        with service.vault_lock.shared():
+            acquired.set()
+
+    thread = threading.Thread(target=upsert)
+    thread.start()
+    assert acquired.wait(timeout=2.0)
+    assert job.status == JOB_RUNNING
+    assert 0 < job.done < job.total
+    thread.join()
+
+    wait_for(job)
+    assert job.done == 60
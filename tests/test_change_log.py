@@ -0,0 +1,84 @@
+"""
+Tests for the change log and cursor paging.
+"""
+
+import pytest
+
+from app.exceptions import CursorExpiredError
+from app.services.change_log import OP_ADD, OP_DELETE, OP_MODIFY, ChangeLog
+
+
+def write_post(settings, post_id, body="Body"):
+    path = settings.content_root / "blog" / f"{post_id}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body)
+    return path
+
+
+def page_through(log, since, limit):
+    pages = []
+    while True:
+        page, since, has_more = log.changes_since(since, limit)
+        pages.append([entry.seq for entry in page])
+        if not has_more:
+            return pages, since
+
+
+def test_cursor_paging(vault):
+    log = ChangeLog()
+    start = log.cursor
+    for number in range(5):
+        log.record_post_write(f"post-{number}", write_post(vault, f"post-{number}"))
+
+    pages, cursor = page_through(log, start, limit=2)
+
+    assert pages == [[start + 1, start + 2], [start + 3, start + 4], [start + 5]]
+    assert cursor == log.cursor
+    assert log.changes_since(cursor, 2) == ([], cursor, False)
+    # The log is persisted, a restarted service pages the same way
+    assert page_through(ChangeLog(), start, limit=2) == (pages, cursor)
+
+
+def test_only_content_changes_are_recorded(vault):
+    log = ChangeLog()
+    cursor = log.cursor
+    path = write_post(vault, "post")
+    log.record_post_write("post", path)
+    log.record_post_write("post", path)
+    path.write_text("Edited")
+    log.record_post_write("post", path)
+
+    assert [entry.op for entry in log.changes_since(cursor, 10)[0]] == [OP_ADD, OP_MODIFY]
+
+
+def test_compaction_keeps_the_latest_entry_per_path(vault):
+    log = ChangeLog()
+    cursor = log.cursor
+    path = write_post(vault, "post")
+    for number in range(3):
+        path.write_text(f"Version {number}")
+        log.record_post_write("post", path)
+    log.record_post_write("other", write_post(vault, "other"))
+
+    log.compact()
+
+    page, next_cursor, has_more = log.changes_since(cursor, 10)
+    assert [(entry.postId, entry.seq) for entry in page] == [("post", cursor + 3), ("other", cursor + 4)]
+    assert (next_cursor, has_more) == (log.cursor, False)
+
+
+def test_cursors_behind_dropped_tombstones_expire(vault):
+    log = ChangeLog()
+    path = write_post(vault, "post")
+    log.record_post_write("post", path)
+    before_delete = log.cursor
+    path.unlink()
+    log.record_post_delete("post", path)
+    assert [entry.op for entry in log.changes_since(before_delete, 10)[0]] == [OP_DELETE]
+
+    log.tombstone_retention = -1
+    log.compact()
+
+    with pytest.raises(CursorExpiredError):
+        log.changes_since(before_delete, 10)
+    assert log.changes_since(log.cursor, 10)[0] == []
@@ -0,0 +1,70 @@
+"""
+Tests for the vault read/write lock.
+"""
+
+import random
+import threading
+import time
+
+from app.utils.concurrency import ReadWriteLock
+
+
+def test_exclusive_holder_excludes_everyone():
+    lock = ReadWriteLock()
+    state = {"shared": 0, "exclusive": 0}
+    violations = []
+    guard = threading.Lock()
+
+    def reader():
+        for _ in range(200):
+            with lock.shared():
+                with guard:
+                    state["shared"] += 1
+                    if state["exclusive"]:
+                        violations.append("shared during exclusive")
+                time.sleep(random.random() / 10000)
+                with guard:
+                    state["shared"] -= 1
+
+    def writer():
+        for _ in range(100):
+            with lock.exclusive():
+                with guard:
+                    state["exclusive"] += 1
+                    if state["shared"] or state["exclusive"] > 1:
+                        violations.append("exclusive not alone")
+                time.sleep(random.random() / 10000)
+                with guard:
+                    state["exclusive"] -= 1
+
+    threads = [threading.Thread(target=reader) for _ in range(6)] + [threading.Thread(target=writer) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+        assert not thread.is_alive(), "deadlock"
+    assert violations == []
+
+
+def test_waiting_reader_gets_in_between_exclusive_batches():
+    lock = ReadWriteLock()
+    batches = []
+    entered_at = []
+    started = threading.Event()
+
+    def batched_job():
+        for batch in range(20):
+            with lock.exclusive():
+                started.set()
+                time.sleep(0.005)
+                batches.append(batch)
+
+    job = threading.Thread(target=batched_job)
+    job.start()
+    started.wait()
+    with lock.shared():
+        entered_at.append(len(batches))
+    job.join()
+
+    # Let in after the batch it waited for, not after the whole job
+    assert entered_at[0] <= 2
@@ -0,0 +1,96 @@
+"""
+Tests for vault export snapshots.
+"""
+
+import io
+import json
+import os
+import tarfile
+import threading
+
+from app.services.export_service import MANIFEST_NAME, ExportService
+from app.utils.concurrency import ReadWriteLock
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def read_archive(service, snapshot):
+    data = b"".join(service.stream_archive(snapshot))
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        return {member.name: tar.extractfile(member).read().decode() for member in tar.getmembers()}
+
+
+def test_snapshot_lives_under_data_root(vault):
+    write(vault.content_root / "blog" / "post.md", "post")
+    write(vault.static_root / "media" / "png" / "post" / "a.png", "image")
+    service = ExportService(vault_lock=ReadWriteLock())
+
+    snapshot = service.create_snapshot()
+
+    assert snapshot.directory.parent == vault.data_root / "snapshots"
+    assert not (vault.content_root / ".snapshots").exists()
+    assert not (vault.static_root / ".snapshots").exists()
+    files = read_archive(service, snapshot)
+    assert files["content/blog/post.md"] == "post"
+    assert files["static/media/png/post/a.png"] == "image"
+    assert not snapshot.directory.exists()
+
+
+def test_incremental_export_lists_but_skips_old_files(vault):
+    old = vault.content_root / "blog" / "old.md"
+    write(old, "old")
+    os.utime(old, (1000, 1000))
+    write(vault.content_root / "blog" / "new.md", "new")
+    service = ExportService(vault_lock=ReadWriteLock())
+
+    files = read_archive(service, service.create_snapshot(since=2000))
+
+    assert "content/blog/old.md" not in files
+    assert files["content/blog/new.md"] == "new"
+    manifest = json.loads(files[MANIFEST_NAME])
+    assert {entry["path"]: entry["included"] for entry in manifest["files"]} == {
+        "content/blog/new.md": True,
+        "content/blog/old.md": False,
+    }
+
+
+def test_writes_during_linking_end_up_in_one_point_in_time(vault, monkeypatch):
+    blog = vault.content_root / "blog"
+    for name in ("a", "b", "c"):
+        write(blog / f"{name}.md", f"{name} v1")
+    lock = ReadWriteLock()
+    service = ExportService(vault_lock=lock)
+    link = service._link
+    writer_done = threading.Event()
+
+    def upsert_while_linking():
+        # Only possible if linking does not hold the vault lock
+        with lock.exclusive():
+            write(blog / "b.md", "b v2")
+            (blog / "c.md").unlink()
+            write(blog / "d.md", "d v1")
+        writer_done.set()
+
+    def link_with_concurrent_writes(source, target):
+        if not writer_done.is_set():
+            writer = threading.Thread(target=upsert_while_linking)
+            writer.start()
+            writer.join(timeout=2.0)
+            assert writer_done.is_set(), "vault lock held while linking"
+        link(source, target)
+
+    monkeypatch.setattr(service, "_link", link_with_concurrent_writes)
+    snapshot = service.create_snapshot()
+
+    files = read_archive(service, snapshot)
+    del files[MANIFEST_NAME]
+    assert files == {
+        "content/blog/a.md": "a v1",
+        "content/blog/b.md": "b v2",
+        "content/blog/d.md": "d v1",
+    }
@@ -0,0 +1,87 @@
+"""
+Tests for frontmatter quoting and parsing.
+"""
+
+import pytest
+import yaml
+
+from app.utils.frontmatter import (
+    parse_frontmatter,
+    parse_frontmatter_header,
+    quote_string,
+    render_frontmatter,
+    replace_frontmatter_field,
+    split_frontmatter,
+)
+
+TRICKY = [
+    "plain",
+    "key: value # not a comment",
+    'She said "hi"',
+    "back\\slash",
+    "line\nbreak\ttab\r",
+    "null",
+    "yes",
+    "- not a list",
+    "@at `tick` *star &amp !bang |pipe >gt %pct",
+    "[not, a, list]",
+    "{not: a map}",
+    "'single'",
+    "nel\u0085 ls\u2028 ps\u2029 bell\x07 del\x7f",
+    "中文標題",
+    "",
+]
+
+
+@pytest.mark.parametrize("value", TRICKY)
+def test_quoted_strings_round_trip_through_yaml_and_our_parser(value):
+    line = f"title: {quote_string(value)}"
+
+    assert yaml.safe_load(line) == {"title": value}
+    assert parse_frontmatter_header(line) == {"title": value}
+
+
+def test_rendered_post_frontmatter_round_trips():
+    data = {
+        "title": 'A "quoted": title',
+        "date": "2024-01-01T08:00:00+08:00",
+        "tags": ["c#", "a: b", "中文"],
+        "categories": "Blog",
+        "draft": True,
+        "description": None,
+    }
+    header, body = split_frontmatter(render_frontmatter(data) + "Body\n")
+
+    parsed = parse_frontmatter_header(header)
+    assert body == "Body\n"
+    assert {name: parsed[name] for name in ("title", "date", "tags", "categories", "draft")} == {
+        **{name: data[name] for name in ("title", "date", "tags", "categories")}, "draft": True
+    }
+    assert parsed["description"] == ""
+    assert yaml.safe_load(header)["title"] == data["title"]
+
+
+@pytest.mark.parametrize("value, emitted", [
+    ("2024-01-01", "date: 2024-01-01"),
+    ("2024-01-01T08:00:00+08:00", "date: 2024-01-01T08:00:00+08:00"),
+    ("2024-13-45", 'date: "2024-13-45"'),
+    ("yesterday", 'date: "yesterday"'),
+])
+def test_only_valid_iso_dates_are_unquoted(value, emitted):
+    assert f"\n{emitted}\n" in render_frontmatter({"date": value})
+
+
+def test_hand_edited_frontmatter_falls_back_to_yaml():
+    fields, body = parse_frontmatter("---\ntitle: Hello\ntags:\n  - a\n  - b\n---\nBody")
+
+    assert fields == {"title": "Hello", "tags": ["a", "b"]}
+    assert body == "Body"
+
+
+def test_replace_field_leaves_the_rest_untouched():
+    text = "---\ntitle: \"Old\"\n# keep me\ndraft: false\n---\nBody\n"
+
+    replaced = replace_frontmatter_field(text, "title", 'New "one"')
+
+    assert replaced == "---\ntitle: \"New \\\"one\\\"\"\n# keep me\ndraft: false\n---\nBody\n"
+    assert replace_frontmatter_field(text, "draft", True).endswith("draft: true\n---\nBody\n")
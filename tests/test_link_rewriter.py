@@ -0,0 +1,48 @@
+"""
+Tests for relinking posts after a linked post changes category.
+"""
+
+from app.schemas.post import PostPatchSchema, PostRequestSchema
+from app.schemas.post_record import PostRecord
+from app.services.change_log import ChangeLog
+from app.services.post_catalog import PostCatalog
+from app.services.post_service import PostService
+from app.services.search_service import SearchIndex
+from app.services.write_journal import WriteJournal
+from app.utils.concurrency import ReadWriteLock
+
+
+def make_service(settings) -> PostService:
+    return PostService(
+        catalog=PostCatalog(),
+        search_index=SearchIndex(),
+        vault_lock=ReadWriteLock(),
+        change_log=ChangeLog(),
+        journal=WriteJournal(journal_dir=settings.data_root / "journal", durability="none"),
+    )
+
+
+def upsert(service, title, categories, content="", post_id=None):
+    return service.upsert_post(PostRecord.from_schema(PostRequestSchema(
+        title=title, date="2024-01-01T00:00:00+08:00", categories=categories, content=content, postId=post_id
+    )))
+
+
+def test_referring_posts_follow_a_category_move(vault):
+    service = make_service(vault)
+    target = upsert(service, "Target", "Old").postId
+    referrer = upsert(service, "Referrer", "Blog", "See [[Target]].").postId
+    referrer_path = vault.content_root / "blog" / f"{referrer}.md"
+    assert f"(/blog/old/{target}/)" in referrer_path.read_text()
+
+    upsert(service, "Target", "New", post_id=target)
+    service.link_rewriter._executor.submit(lambda: None).result()  # wait for the rewrite
+
+    assert f"(/blog/new/{target}/)" in referrer_path.read_text()
+    # The stored render was updated with the file, so content patches still apply
+    source = service.sources.load(referrer)
+    patched = service.patch_post(referrer, PostPatchSchema(
+        baseHash=source.content_hash, ops=[{"offset": 0, "insert": "Also: "}]
+    ))
+    assert patched.status == "success"
+    assert f"Also: See [Target](/blog/new/{target}/)." in referrer_path.read_text()
@@ -0,0 +1,39 @@
+"""
+Tests for Obsidian markdown rendering.
+"""
+
+from app.utils.markdown_utils import render_obsidian_markdown
+
+ATTACHMENTS = {"photo.png": "/blog/media/png/post-1/photo.png"}
+
+
+def resolve(title):
+    return {"Other Post": "/blog/notes/post-2/"}.get(title)
+
+
+def test_sized_embeds_render_as_figure_shortcodes():
+    rendered = render_obsidian_markdown("![[photo.png|300x200]] ![[photo.png|40]]", ATTACHMENTS, resolve)
+
+    assert rendered == (
+        '{{< figure src="/blog/media/png/post-1/photo.png" alt="photo.png" width="300" height="200" >}} '
+        '{{< figure src="/blog/media/png/post-1/photo.png" alt="photo.png" width="40" >}}'
+    )
+    assert "<img" not in rendered
+
+
+def test_shortcode_parameters_are_escaped():
+    rendered = render_obsidian_markdown('![[say "hi".png|10]]', {'say "hi".png': "/a.png"}, resolve)
+
+    assert rendered == '{{< figure src="/a.png" alt="say \\"hi\\".png" width="10" >}}'
+
+
+def test_plain_embeds_and_wikilinks():
+    rendered = render_obsidian_markdown("![[photo.png]] see [[Other Post]] and [[Missing]]", ATTACHMENTS, resolve)
+
+    assert rendered == "![](/blog/media/png/post-1/photo.png) see [Other Post](/blog/notes/post-2/) and [[Missing]]"
+
+
+def test_code_is_left_untouched():
+    text = "```\n![[photo.png|300]] [[Other Post]]\n```\n`[[Other Post]]`"
+
+    assert render_obsidian_markdown(text, ATTACHMENTS, resolve) == text
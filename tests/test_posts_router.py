@@ -0,0 +1,70 @@
+"""
+Tests for the post endpoints.
+"""
+
+import asyncio
+
+import httpx
+
+from app.dependencies import write_journal
+from app.main import app
+
+from .conftest import post_payload
+
+
+async def send_all(requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.request(method, url, **kwargs) for method, url, kwargs in requests))
+
+
+def test_upsert_patch_and_delete():
+    [created] = asyncio.run(send_all([("POST", "/api/posts", {"json": post_payload("Lifecycle", content="Hello")})]))
+    assert created.status_code == 200
+    post = created.json()
+
+    [patched] = asyncio.run(send_all([(
+        "PATCH", f"/api/posts/{post['postId']}",
+        {"json": {"baseHash": post["contentHash"], "ops": [{"offset": 5, "insert": ", world"}]}}
+    )]))
+    assert patched.status_code == 200
+    assert patched.json()["contentHash"] != post["contentHash"]
+
+    deleted, missing = asyncio.run(send_all([
+        ("DELETE", f"/api/posts/{post['postId']}", {}),
+        ("DELETE", "/api/posts/does-not-exist", {}),
+    ]))
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+
+
+def test_concurrent_upserts_share_group_commits(monkeypatch):
+    # Upserts run off the event loop, so they can meet in one commit window
+    monkeypatch.setattr(write_journal, "group_commit_window", 0.05)
+    commits = write_journal.committed_transactions
+    flushes = write_journal.group_flushes
+
+    responses = asyncio.run(send_all([
+        ("POST", "/api/posts", {"json": post_payload(f"Concurrent {index}")}) for index in range(20)
+    ]))
+
+    assert [response.status_code for response in responses] == [200] * 20
+    commits = write_journal.committed_transactions - commits
+    flushes = write_journal.group_flushes - flushes
+    assert commits == 20
+    assert flushes < commits
+
+
+def test_patch_rejects_diff_and_ops_together():
+    [created] = asyncio.run(send_all([("POST", "/api/posts", {"json": post_payload("Both deltas", content="Hello")})]))
+    post = created.json()
+
+    [patched] = asyncio.run(send_all([(
+        "PATCH", f"/api/posts/{post['postId']}",
+        {"json": {
+            "baseHash": post["contentHash"],
+            "diff": "@@ -1 +1 @@\n-Hello\n+Hi\n",
+            "ops": [{"offset": 5, "insert": "!"}],
+        }}
+    )]))
+    assert patched.status_code == 422
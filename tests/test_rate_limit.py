@@ -0,0 +1,120 @@
+"""
+Tests for per-client token buckets and round-robin scheduling.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.middleware.rate_limit import ClientState, FairScheduler, RateLimiter, RateLimitMiddleware, TokenBucket
+
+
+def make_state() -> ClientState:
+    return ClientState(requests=TokenBucket(1, 1), body_bytes=TokenBucket(1, 1))
+
+
+def test_token_bucket_refills_and_carries_debt():
+    bucket = TokenBucket(rate=2, capacity=4)
+    start = bucket.updated
+
+    bucket.consume(4, start)
+    assert not bucket.available(start)
+    assert bucket.retry_after() == 0.5
+    assert bucket.available(start + 0.5)
+
+    # A large body puts the bucket in debt, repaid by refill before the next request
+    bucket.consume(10, start + 0.5)
+    assert bucket.retry_after() == 5.0
+    assert not bucket.available(start + 5.4)
+    assert bucket.available(start + 5.5)
+    assert bucket.level(start + 100) == 4
+
+
+def test_limiter_charges_requests_and_bytes():
+    limiter = RateLimiter(
+        requests_per_second=1, request_burst=2, bytes_per_second=100, byte_burst=1000,
+        max_concurrency=1, max_queued_per_client=1
+    )
+    state = limiter.client("a", 0.0)
+    state.requests.updated = state.body_bytes.updated = 0.0
+
+    assert limiter.check(state, 5000, 0.0) is None
+    # Request tokens remain, but the upload drained the byte bucket
+    assert limiter.check(state, 10, 0.0) == pytest.approx(40.01)
+    assert limiter.check(state, 0, 0.0) is None
+    assert limiter.check(state, 0, 0.0) == 1.0
+
+
+def test_slots_are_handed_out_round_robin():
+    async def scenario():
+        scheduler = FairScheduler(slots=1)
+        states = {name: make_state() for name in "abc"}
+        order = []
+
+        async def request(name):
+            await scheduler.acquire(name, states[name])
+            order.append(name)
+
+        await request("a")
+        tasks = []
+        for name in ["a", "a", "a", "b", "c"]:
+            tasks.append(asyncio.create_task(request(name)))
+            await asyncio.sleep(0)
+        assert scheduler.waiting == 5
+
+        while len(order) < 6:
+            scheduler.release(states[order[-1]])
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        # The busy client only delays its own queue
+        assert order == ["a", "a", "b", "c", "a", "a"]
+        assert scheduler.in_use == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def scenario():
+        scheduler = FairScheduler(slots=1)
+        a, b = make_state(), make_state()
+        await scheduler.acquire("a", a)
+        waiter = asyncio.create_task(scheduler.acquire("b", b))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release(a)
+
+        assert (scheduler.in_use, scheduler.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+async def ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_middleware_limits_each_client_separately():
+    limiter = RateLimiter(
+        requests_per_second=0.01, request_burst=2, bytes_per_second=1000, byte_burst=1000,
+        max_concurrency=4, max_queued_per_client=4
+    )
+    app = RateLimitMiddleware(ok, limiter)
+
+    async def send_all():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = [await client.get("/", headers={"X-API-Key": "one"}) for _ in range(3)]
+            other = await client.get("/", headers={"X-API-Key": "two"})
+            return first, other
+
+    first, other = asyncio.run(send_all())
+
+    assert [response.status_code for response in first] == [200, 200, 429]
+    assert int(first[2].headers["Retry-After"]) >= 1
+    assert other.status_code == 200
+    totals, clients = limiter.stats()
+    assert (totals["admitted"], totals["limited"], totals["clients"]) == (3, 1, 2)
+    assert all("one" not in client["client"] for client in clients)
@@ -0,0 +1,99 @@
+"""
+Tests for attachments kept in remote media storage.
+"""
+
+import asyncio
+import base64
+import hashlib
+
+import httpx
+import pytest
+
+from app.dependencies import change_log, post_service
+from app.main import app
+from app.storage.memory import MemoryStorage
+
+from .conftest import post_payload
+
+PNG = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def remote_storage(monkeypatch):
+    storage = MemoryStorage()
+    storage.read_chunk_size = 100
+    monkeypatch.setattr(post_service.attachment_service, "media_storage", storage)
+    yield storage
+    storage.shutdown()
+
+
+async def send(method, url, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, url, **kwargs)
+
+
+def upsert_with_attachment(title):
+    created = asyncio.run(send("POST", "/api/posts", json=post_payload(title)))
+    post_id = created.json()["postId"]
+    attachment = {
+        "name": "image.png",
+        "path": f"media/png/{post_id}/{post_id}-1700000000000.png",
+        "data": base64.b64encode(PNG).decode(),
+    }
+    response = asyncio.run(send("POST", "/api/posts", json=post_payload(
+        title, postId=post_id, content="![[image.png]]", attachments=[attachment]
+    )))
+    assert response.status_code == 200
+    return post_id, f"media/png/{post_id}/{post_id}-1700000000000.png"
+
+
+def test_blocking_refuses_to_stall_an_event_loop(remote_storage):
+    async def on_loop():
+        with pytest.raises(RuntimeError):
+            remote_storage.blocking(remote_storage.stat("media/x"))
+
+    asyncio.run(on_loop())
+    assert remote_storage.blocking(remote_storage.stat("media/x")) is None
+
+
+def test_remote_attachments_are_recorded_and_deleted_by_key(remote_storage):
+    post_id, key = upsert_with_attachment("Remote post")
+    _, other = upsert_with_attachment("Other post")
+
+    manifest, _ = change_log.manifest()
+    entry = next(entry for entry in manifest if entry.path == f"static/{key}")
+    assert (entry.hash, entry.size) == (hashlib.sha256(PNG).hexdigest(), len(PNG))
+
+    response = asyncio.run(send("DELETE", f"/api/posts/{post_id}"))
+    assert response.status_code == 200
+    assert remote_storage.blocking(remote_storage.stat(key)) is None
+    assert remote_storage.blocking(remote_storage.stat(other)) is not None
+    assert change_log.attachment_keys(post_id) == []
+
+
+def test_remote_download_streams_and_honours_range(remote_storage):
+    _, key = upsert_with_attachment("Ranged post")
+    url = f"/api/attachments/{key}"
+
+    full = asyncio.run(send("GET", url))
+    assert full.status_code == 200
+    assert full.content == PNG
+    etag = full.headers["etag"]
+
+    partial = asyncio.run(send("GET", url, headers={"Range": "bytes=250-349"}))
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 250-349/{len(PNG)}"
+    assert partial.content == PNG[250:350]
+
+    suffix = asyncio.run(send("GET", url, headers={"Range": "bytes=-10", "If-Range": etag}))
+    assert suffix.status_code == 206
+    assert suffix.content == PNG[-10:]
+
+    stale = asyncio.run(send("GET", url, headers={"Range": "bytes=0-9", "If-Range": '"old"'}))
+    assert stale.status_code == 200
+    assert stale.content == PNG
+
+    beyond = asyncio.run(send("GET", url, headers={"Range": f"bytes={len(PNG)}-"}))
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(PNG)}"
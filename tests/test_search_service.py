@@ -0,0 +1,88 @@
+"""
+Tests for the full-text search index.
+"""
+
+from app.services.search_service import SearchIndex, tokenize
+
+
+def make_index(settings) -> SearchIndex:
+    return SearchIndex(index_dir=settings.data_root / "search")
+
+
+def ranked(index, query):
+    return [hit.post_id for hit in index.search(query)[1]]
+
+
+def test_tokenize_splits_words_and_cjk_bigrams():
+    assert tokenize("Hello, World_2") == ["hello", "world", "2"]
+    assert tokenize("全文檢索 API") == ["全文", "文檢", "檢索", "api"]
+
+
+def test_bm25_ranking(vault):
+    index = make_index(vault)
+    index.index_post("in-title", "Python tips", "blog", [], "Some notes.")
+    index.index_post("in-body", "Notes", "blog", [], "A short python note.")
+    index.index_post("long-body", "Notes", "blog", [], "python " + "filler " * 200)
+    index.index_post("unrelated", "Cooking", "blog", [], "Rice and beans.")
+
+    # Title terms are weighted higher, long bodies are length-normalised
+    assert ranked(index, "python") == ["in-title", "in-body", "long-body"]
+    # Rarer terms weigh more: "rice" (1 post) beats "notes" (3 posts)
+    assert ranked(index, "rice notes")[0] == "unrelated"
+
+
+def test_paging_and_removal(vault):
+    index = make_index(vault)
+    for number in range(5):
+        index.index_post(f"post-{number}", f"Post {number}", "blog", ["shared"], "x " * (number + 1))
+
+    total, page = index.search("shared", offset=2, limit=2)
+    assert total == 5
+    assert len(page) == 2
+
+    index.remove_post("post-0")
+    assert index.search("shared")[0] == 4
+
+
+def test_compaction_runs_in_the_background(vault):
+    index = make_index(vault)
+    index.compact_threshold = 3
+    for number in range(3):
+        index.index_post(f"post-{number}", f"Post {number}", "blog", [], "body")
+
+    index.schedule_compaction().result()
+    assert index.snapshot_path.exists()
+    assert not index.compacting_path.exists()
+
+    index.index_post("post-3", "Post 3", "blog", [], "body")
+    reloaded = make_index(vault)
+    assert reloaded.search("post")[0] == 4
+
+
+def test_interrupted_compaction_is_replayed_before_the_journal(vault):
+    index = make_index(vault)
+    index.index_post("post", "Before", "blog", [], "body")
+    index.compact()
+    index.index_post("post", "Middle", "blog", [], "body")
+    # Crash after the journal was rotated, before the snapshot was replaced
+    index.journal_path.replace(index.compacting_path)
+    index.index_post("post", "After", "blog", [], "body")
+
+    reloaded = make_index(vault)
+    assert [hit.title for hit in reloaded.search("body")[1]] == ["After"]
+
+    reloaded.compact()
+    assert not reloaded.compacting_path.exists()
+    assert not reloaded.journal_path.exists()
+    assert [hit.title for hit in make_index(vault).search("body")[1]] == ["After"]
+
+
+def test_shutdown_folds_the_journal_into_the_snapshot(vault):
+    index = make_index(vault)
+    index.index_post("post", "Title", "blog", [], "body")
+    assert index.journal_path.exists()
+
+    index.shutdown()
+
+    assert not index.journal_path.exists()
+    assert make_index(vault).search("title")[0] == 1
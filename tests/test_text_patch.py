@@ -0,0 +1,53 @@
+"""
+Tests for unified diff and splice application.
+"""
+
+import difflib
+
+import pytest
+
+from app.exceptions import PatchConflictError
+from app.utils.text_patch import apply_splices, apply_unified_diff
+
+BASE = "line one\nline two\nline three\n"
+
+
+def make_diff(old: str, new: str) -> str:
+    return "".join(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True), "a", "b"))
+
+
+def test_splices_use_offsets_in_the_original_text():
+    assert apply_splices("Hello world", [(0, 5, "Goodbye"), (6, 0, "cruel "), (11, 0, "!")]) == "Goodbye cruel world!"
+
+
+def test_splices_use_code_point_offsets():
+    assert apply_splices("日本語", [(1, 1, "x")]) == "日x語"
+
+
+@pytest.mark.parametrize("ops", [[(5, 0, "a"), (4, 0, "b")], [(0, 3, ""), (2, 0, "x")], [(10, 2, "")]])
+def test_overlapping_or_out_of_range_splices_conflict(ops):
+    with pytest.raises(PatchConflictError):
+        apply_splices("Hello world", ops)
+
+
+@pytest.mark.parametrize("new", [
+    "line one\nline 2\nline three\n",
+    "line zero\nline one\nline two\nline three\n",
+    "line one\nline three\n",
+    "line one\nline two\nline three\nline four",
+    "",
+])
+def test_unified_diff_round_trips(new):
+    assert apply_unified_diff(BASE, make_diff(BASE, new)) == new
+
+
+def test_diff_against_other_text_conflicts():
+    diff = make_diff(BASE, "line one\nline 2\nline three\n")
+    with pytest.raises(PatchConflictError):
+        apply_unified_diff(BASE.replace("two", "deux"), diff)
+
+
+def test_truncated_hunk_conflicts():
+    diff = make_diff(BASE, "line one\nline 2\nline three\n")
+    with pytest.raises(PatchConflictError):
+        apply_unified_diff(BASE, diff.rsplit("\n", 2)[0] + "\n")
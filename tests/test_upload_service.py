@@ -0,0 +1,73 @@
+"""
+Tests for resumable uploads.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from app.exceptions import UploadChecksumError, UploadConflictError, UploadNotFoundError
+from app.services.upload_service import UploadService
+
+PATH = "media/bin/post/post-1700000000000.bin"
+DATA = bytes(range(256)) * 4
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def append(service, upload_id, offset, *chunks):
+    return asyncio.run(service.append_chunk(upload_id, offset, stream(*chunks)))
+
+
+def test_chunks_append_at_the_current_offset(vault):
+    service = UploadService()
+    session = service.create_session(PATH, len(DATA))
+
+    assert append(service, session.upload_id, 0, DATA[:100], DATA[100:300]).offset == 300
+    with pytest.raises(UploadConflictError):
+        append(service, session.upload_id, 100, DATA[100:200])
+    # Resuming reports the offset from the part file, e.g. after a restart
+    assert UploadService().get_session(session.upload_id).offset == 300
+    assert append(service, session.upload_id, 300, DATA[300:]).offset == len(DATA)
+
+    with pytest.raises(UploadChecksumError):
+        service.finalize(session.upload_id, hashlib.sha256(b"other").hexdigest())
+    finalized = service.finalize(session.upload_id, hashlib.sha256(DATA).hexdigest())
+    assert finalized.completed
+    assert service.staged_file(session.upload_id, PATH).read_bytes() == DATA
+
+
+def test_bytes_before_an_oversized_chunk_are_kept(vault):
+    service = UploadService()
+    session = service.create_session(PATH, 150)
+
+    with pytest.raises(UploadConflictError):
+        append(service, session.upload_id, 0, DATA[:100], DATA[100:200])
+    assert service.get_session(session.upload_id).offset == 100
+
+    with pytest.raises(UploadConflictError):
+        service.finalize(session.upload_id, hashlib.sha256(DATA[:150]).hexdigest())
+
+
+def test_finalized_uploads_do_not_expire(vault, monkeypatch):
+    service = UploadService()
+    idle = service.create_session(PATH, 10)
+    finalized = service.create_session(PATH, 10)
+    append(service, finalized.upload_id, 0, DATA[:10])
+    service.finalize(finalized.upload_id, hashlib.sha256(DATA[:10]).hexdigest())
+
+    monkeypatch.setattr(vault, "upload_session_ttl", -1)
+
+    assert service.cleanup_expired() == [idle.upload_id]
+    with pytest.raises(UploadNotFoundError):
+        service.get_session(idle.upload_id)
+    session = service.get_session(finalized.upload_id)
+    assert session.expires_at is None
+
+    service.release(finalized.upload_id)
+    with pytest.raises(UploadNotFoundError):
+        service.get_session(finalized.upload_id)
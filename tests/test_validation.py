@@ -0,0 +1,31 @@
+"""
+Tests for attachment path validation.
+"""
+
+import pytest
+
+from app.utils.validation import parse_attachment_path, validate_attachment_path_format
+
+VALID = "media/png/post-1/post-1-1700000000000.png"
+
+
+def test_parses_attachment_paths():
+    location = parse_attachment_path(VALID.upper())
+
+    assert (location.path, location.ext, location.post_id, location.timestamp, location.file_ext) == (
+        VALID, "png", "post-1", "1700000000000", "png"
+    )
+    assert location.storage_key("post-2") == "media/png/post-2/post-2-1700000000000.png"
+    assert validate_attachment_path_format(VALID)
+
+
+@pytest.mark.parametrize("path", [
+    VALID + "/../../../config.py",
+    VALID + ".exe",
+    VALID + "\n",
+    "static/" + VALID,
+    "media/png/post-1/post-1-170000000000.png",
+])
+def test_rejects_anything_but_the_whole_path(path):
+    assert parse_attachment_path(path) is None
+    assert not validate_attachment_path_format(path)
@@ -0,0 +1,96 @@
+"""
+Tests for reconciling out-of-band vault changes.
+"""
+
+from app.services.change_log import OP_ADD, OP_DELETE, OP_MODIFY, OP_MOVE, ChangeLog
+from app.services.post_catalog import PostCatalog
+from app.services.search_service import SearchIndex
+from app.services.vault_watcher import PollingBackend, VaultWatcher
+from app.services.write_journal import WriteJournal
+from app.utils.concurrency import ReadWriteLock
+
+from .test_category_service import write_post
+
+
+def make_watcher(settings):
+    journal = WriteJournal(journal_dir=settings.data_root / "journal", durability="none")
+    return VaultWatcher(
+        vault_lock=ReadWriteLock(),
+        catalog=PostCatalog(),
+        search_index=SearchIndex(),
+        change_log=ChangeLog(),
+        journal=journal
+    )
+
+
+def ops_since(watcher, cursor):
+    changes, _, _ = watcher.change_log.changes_since(cursor, 100)
+    return [(entry.op, entry.path) for entry in changes]
+
+
+def test_reconciles_edits_moves_and_deletes(vault):
+    edited = write_post(vault, "blog", "edited")
+    moved = write_post(vault, "blog", "moved")
+    deleted = write_post(vault, "blog", "deleted")
+    watcher = make_watcher(vault)
+    # Loaded at startup in the app
+    watcher.catalog.entries()
+    cursor = watcher.change_log.cursor
+
+    write_post(vault, "blog", "edited", title="Edited by hand")
+    new_path = write_post(vault, "notes", "moved")
+    moved.unlink()
+    deleted.unlink()
+    watcher.reconcile([edited, moved, new_path, deleted])
+
+    assert ops_since(watcher, cursor) == [
+        (OP_MODIFY, "content/blog/edited.md"),
+        (OP_MOVE, "content/notes/moved.md"),
+        (OP_DELETE, "content/blog/deleted.md"),
+    ]
+    assert watcher.catalog.get("edited").title == "Edited by hand"
+    assert watcher.catalog.get("moved").category == "notes"
+    assert watcher.catalog.get("deleted") is None
+
+    # Reconciling is idempotent
+    cursor = watcher.change_log.cursor
+    watcher.reconcile([edited, new_path, deleted])
+    assert ops_since(watcher, cursor) == []
+
+
+def test_skips_paths_with_a_write_in_flight(vault):
+    watcher = make_watcher(vault)
+    watcher.change_log.cursor
+    target = vault.content_root / "blog" / "post.md"
+    seen_in_hook = []
+
+    def record_like_post_service():
+        # The watcher fires between the rename and the writer recording it
+        watcher.reconcile([target])
+        seen_in_hook.append(ops_since(watcher, 0))
+        watcher.change_log.record_post_write("post", target)
+
+    with watcher.journal.transaction() as tx:
+        tx.write(target, b'---\ntitle: "Post"\n---\nbody\n')
+        tx.after_commit(record_like_post_service)
+
+    assert seen_in_hook == [[]]
+    assert watcher._pending == {target}
+
+    # The retry finds the write already recorded
+    watcher.reconcile(watcher._pending)
+    assert ops_since(watcher, 0) == [(OP_ADD, "content/blog/post.md")]
+
+
+def test_polling_backend_reports_changed_and_removed_files(vault):
+    kept = write_post(vault, "blog", "kept")
+    removed = write_post(vault, "blog", "removed")
+    backend = PollingBackend([vault.content_root], interval=0)
+
+    write_post(vault, "blog", "kept", title="Changed")
+    removed.unlink()
+    added = write_post(vault, "blog", "added")
+
+    changed, overflow = backend.read(timeout=0)
+    assert changed == {kept, removed, added}
+    assert not overflow
@@ -0,0 +1,170 @@
+"""
+Tests for the write-ahead intent journal.
+"""
+
+import threading
+
+import pytest
+
+from app.services import write_journal as journal_module
+from app.services.write_journal import (
+    DURABILITY_BATCHED,
+    DURABILITY_NONE,
+    WriteJournal,
+)
+
+
+def make_journal(tmp_path, durability=DURABILITY_BATCHED, window=0.0) -> WriteJournal:
+    journal = WriteJournal(journal_dir=tmp_path / "journal", durability=durability)
+    journal.group_commit_window = window
+    return journal
+
+
+def staged_files(directory):
+    return sorted(path.name for path in directory.iterdir() if path.name.endswith(".tmp"))
+
+
+def test_commit_replaces_and_deletes(tmp_path):
+    journal = make_journal(tmp_path)
+    old = tmp_path / "vault" / "old.md"
+    old.parent.mkdir()
+    old.write_text("old")
+
+    with journal.transaction() as tx:
+        tx.write(tmp_path / "vault" / "new.md", b"new")
+        tx.delete(old)
+
+    assert (tmp_path / "vault" / "new.md").read_bytes() == b"new"
+    assert not old.exists()
+    assert staged_files(tmp_path / "vault") == []
+    assert journal.committed_transactions == 1
+
+
+def test_exception_in_block_discards_staged_files(tmp_path):
+    journal = make_journal(tmp_path)
+    target = tmp_path / "vault" / "post.md"
+
+    with pytest.raises(RuntimeError):
+        with journal.transaction() as tx:
+            tx.write(target, b"data")
+            raise RuntimeError("validation failed")
+
+    assert not target.exists()
+    assert staged_files(target.parent) == []
+    assert journal._active == 0
+
+
+def test_concurrent_commits_share_group_flushes(tmp_path):
+    journal = make_journal(tmp_path, window=0.05)
+    barrier = threading.Barrier(16)
+
+    def commit(index):
+        with journal.transaction() as tx:
+            tx.write(tmp_path / "vault" / f"{index}.md", b"x")
+            barrier.wait()
+
+    threads = [threading.Thread(target=commit, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert journal.committed_transactions == 16
+    assert journal.group_flushes < journal.committed_transactions
+
+
+def test_recover_rolls_forward_logged_intent(tmp_path):
+    journal = make_journal(tmp_path)
+    target = tmp_path / "vault" / "post.md"
+    target.parent.mkdir()
+    target.write_text("before")
+    removed = tmp_path / "vault" / "moved-away.md"
+    removed.write_text("old path")
+
+    # Crash between making the intent durable and applying it
+    tx = journal.transaction()
+    tx.write(target, b"after")
+    tx.delete(removed)
+    journal._log_intent(tx)
+
+    make_journal(tmp_path).recover()
+
+    assert target.read_bytes() == b"after"
+    assert not removed.exists()
+    assert staged_files(target.parent) == []
+
+
+def test_recover_removes_files_staged_without_intent(tmp_path):
+    journal = make_journal(tmp_path)
+    target = tmp_path / "vault" / "post.md"
+
+    # Crash while staging, before the intent was written
+    tx = journal.transaction()
+    tx.write(target, b"never committed")
+
+    make_journal(tmp_path).recover()
+
+    assert not target.exists()
+    assert staged_files(target.parent) == []
+
+
+def test_recover_ignores_torn_tail(tmp_path):
+    journal = make_journal(tmp_path, durability=DURABILITY_NONE)
+    target = tmp_path / "vault" / "post.md"
+    tx = journal.transaction()
+    tx.write(target, b"data")
+    journal._file.write('{"tx": "abc", "type": "int')
+    journal._file.flush()
+
+    make_journal(tmp_path).recover()
+
+    assert not target.exists()
+
+
+def test_failed_intent_rolls_back(tmp_path, monkeypatch):
+    journal = make_journal(tmp_path)
+    target = tmp_path / "vault" / "post.md"
+
+    def failing_sync(seq):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(journal, "_group_sync", failing_sync)
+    with pytest.raises(OSError):
+        with journal.transaction() as tx:
+            tx.write(target, b"data")
+
+    assert journal._active == 0
+    assert staged_files(target.parent) == []
+    make_journal(tmp_path).recover()
+    assert not target.exists()
+
+
+def test_failed_apply_is_completed_by_recovery(tmp_path, monkeypatch):
+    journal = make_journal(tmp_path)
+    first = tmp_path / "vault" / "first.md"
+    second = tmp_path / "vault" / "second.md"
+    apply_op = journal_module._apply_op
+    calls = []
+
+    def failing_apply(op):
+        calls.append(op)
+        if len(calls) == 2:
+            raise OSError("I/O error")
+        apply_op(op)
+
+    monkeypatch.setattr(journal_module, "_apply_op", failing_apply)
+    with pytest.raises(OSError):
+        with journal.transaction() as tx:
+            tx.write(first, b"1")
+            tx.write(second, b"2")
+    monkeypatch.setattr(journal_module, "_apply_op", apply_op)
+
+    assert journal._active == 0
+    assert first.exists() and not second.exists()
+
+    # A checkpoint in the meantime must not lose the unfinished intent
+    journal._checkpoint()
+    make_journal(tmp_path).recover()
+
+    assert second.read_bytes() == b"2"
+    assert staged_files(second.parent) == []